@@ -26,7 +26,6 @@ def extract_frames(video_path, output_dir):
         'ffmpeg',
         '-i', video_path,  # 输入视频路径
         '-vf', 'fps=1,format=yuv420p',  # 设置每秒提取一帧，并指定颜色格式
-        '-compression_level', '0',  # 设置无损压缩
         os.path.join(output_dir, f'{video_name}-%3d.png')  # 输出文件路径和格式，包含视频名
     ]
     
@@ -12,6 +12,79 @@ class Settings:
     OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'output')
     MUSIC_DIR = os.path.join(os.path.dirname(PROJECT_ROOT), 'audio')  # 使用已有的音频文件夹
     
+    # 媒体探测缓存（SQLite，按 路径+大小+修改时间 失效）
+    PROBE_CACHE_ENABLED = os.environ.get('VIDEO_CLIPS_PROBE_CACHE', '1') != '0'
+    PROBE_CACHE_PATH = os.path.join(TEMP_DIR, 'probe_cache.sqlite3')
+    PROBE_CACHE_MAX_ENTRIES = 50000
+    PROBE_MAX_WORKERS = os.cpu_count() or 4  # 批量探测的默认并发数
+    PROBE_COALESCE_WINDOW = 2.0  # 同一文件按需探测的合并窗口（秒）
+    NATIVE_PROBE_FORMATS = ['.mp4', '.mov', '.m4v', '.m4a', '.3gp']  # 可进程内解析的容器
+    
+    # 任务清单逐条完成时的最短写盘间隔（秒），期间的变更在 flush() 或下次写盘时一并写入
+    JOB_MANIFEST_SAVE_INTERVAL = 2.0
+    
+    # 关键帧索引（.npy，按文件身份缓存）
+    KEYFRAME_INDEX_DIR = os.path.join(TEMP_DIR, 'keyframes')
+    KEYFRAME_GOP_PROBE_WINDOW = 30.0  # 估计 GOP 时只读取开头的秒数（未建完整索引时）
+    
+    # FFmpeg 运行器
+    FFMPEG_STDERR_LIMIT = 64 * 1024  # 仅保留 stderr 末尾的字节数
+    
+    # 单进程多输出切割时每个 ffmpeg 进程的最大输出数
+    SPLIT_MAX_OUTPUTS_PER_PASS = 64
+    # segment 复用器实际切点与计划切点的最大允许偏差（秒），超出则改用单进程多输出切割
+    SEGMENT_CUT_TOLERANCE = 0.05
+    
+    # 并行重编码：所有 ffmpeg 编码进程的总线程预算与默认进程数
+    ENCODE_CPU_BUDGET = os.cpu_count() or 4
+    SPLIT_WORKERS = max(1, (os.cpu_count() or 2) // 4)
+    SPLIT_FILES_IN_FLIGHT = 2  # GUI 批量切割时同时处理的源文件数
+    
+    # 智能切割：源编码 -> 重编码首尾 GOP 使用的编码器（需与源编码一致才能拼接）
+    SMART_CUT_ENCODERS = {
+        'h264': 'libx264',
+        'hevc': 'libx265',
+    }
+    
+    # 镜头切割：代理画面宽度、场景变化阈值与片段时长范围（秒）
+    SCENE_PROXY_WIDTH = 320
+    SCENE_THRESHOLD = 0.3
+    SCENE_MIN_DURATION = 2.0
+    SCENE_MAX_DURATION = 15.0
+    
+    # 静音感知切割：PCM 采样率、RMS 窗口（秒）、静音阈值（dBFS）与切点容差（秒）
+    AUDIO_ENVELOPE_DIR = os.path.join(TEMP_DIR, 'envelopes')
+    SILENCE_SAMPLE_RATE = 16000
+    SILENCE_WINDOW = 0.05
+    SILENCE_THRESHOLD_DB = -40.0
+    SILENCE_TOLERANCE = 2.0
+    
+    # 切割计划成本估算：拷贝吞吐（字节/CPU秒）与重编码成本（CPU秒/百万像素帧）
+    SPLIT_COST_COPY_BYTES_PER_CPU_SECOND = 200 * 1024 * 1024
+    SPLIT_COST_ENCODE_CPU_PER_MPIX_FRAME = 0.06
+    
+    # 稀疏抽帧：间隔 >= 平均 GOP × 该倍数时自动改用逐点 seek；每个进程串接的 seek 数与并行进程数
+    SPARSE_SEEK_GOP_RATIO = 2.0
+    SPARSE_SEEKS_PER_PROCESS = 16
+    SPARSE_EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+    
+    # MoviePy 抽帧时并行编码图片的线程数
+    FRAME_ENCODE_WORKERS = min(4, os.cpu_count() or 1)
+    
+    # 分片并行抽帧的默认分片数（进程数）
+    EXTRACT_SHARDS = max(1, (os.cpu_count() or 2) // 2)
+    
+    # 抽帧感知哈希去重：dHash 边长与视为重复的最大汉明距离
+    FRAME_HASH_SIZE = 8
+    FRAME_DEDUP_DISTANCE = 6
+    
+    # 指定时间点抽帧：相邻时间点间隔超过该值（秒）时拆成独立的 seek + 解码区段，各区段并行
+    EXTRACT_AT_GROUP_GAP = 20.0
+    
+    # 缩略图拼图（contact sheet）：每张图的 列×行 与单格宽度（像素）
+    CONTACT_SHEET_GRID = (5, 5)
+    CONTACT_SHEET_TILE_WIDTH = 320
+    
     # 默认参数
     DEFAULT_FRAME_INTERVAL = 1.0  # 抽帧间隔（秒）
     DEFAULT_SEGMENT_DURATION = 8  # 默认切割时长（秒）
@@ -20,7 +93,7 @@ class Settings:
     # 支持的文件格式
     SUPPORTED_VIDEO_FORMATS = ['.mp4', '.avi', '.mov', '.mkv', '.MOV']
     SUPPORTED_AUDIO_FORMATS = ['.mp3', '.wav', '.m4a']
-    SUPPORTED_IMAGE_FORMATS = ['.png', '.jpg', '.jpeg']
+    SUPPORTED_IMAGE_FORMATS = ['.png', '.jpg', '.jpeg', '.webp', '.avif']
     
     # 视频输出质量
     VIDEO_CODEC = 'libx264'
@@ -10,6 +10,7 @@ import threading
 import traceback
 import queue
 from queue import Queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
@@ -31,6 +32,7 @@ from modules.sliding_strip_composer import SlidingStripComposer
 from modules.stt_transcriber import transcribe_to_files
 from modules.audio_extractor import extract_audio, ExtractOptions
 from utils.video_utils import VideoUtils
+from utils.ffmpeg_runner import FFmpegRunner, FFmpegCancelled
 
 
 class VideoClipsMainWindow(QMainWindow):
@@ -50,6 +52,8 @@ class VideoClipsMainWindow(QMainWindow):
         self.worker_thread = None
         self.cancel_flag = threading.Event()
         self._queue = Queue()
+        # 停止后所有后台 ffmpeg 调用（含片段之间即将启动的下一个）都直接取消
+        FFmpegRunner.bind_cancel_event(self.cancel_flag)
 
         # 业务模块初始化
         self.extractor = FrameExtractor()
@@ -632,8 +636,8 @@ class VideoClipsMainWindow(QMainWindow):
             return f"{m:02d}:{s:02d}"
 
     def _gather_info(self, path: str) -> Dict:
-        """收集文件信息，优先 ffprobe，失败则回退 moviepy"""
-        info = self.vutils.get_video_info(path, method='ffprobe') or \
+        """收集文件信息，优先进程内解析/ffprobe，失败则回退 moviepy"""
+        info = self.vutils.get_video_info(path, method='auto') or \
                self.vutils.get_video_info(path, method='moviepy') or {}
         name = os.path.basename(path)
         size = os.path.getsize(path) if os.path.exists(path) else 0
@@ -987,6 +991,8 @@ class VideoClipsMainWindow(QMainWindow):
                     )
                     self._queue.put(('log', f'完成抽帧 {len(result)} 张: {name}'))
                 self._queue.put(('done', None))
+            except FFmpegCancelled:
+                self._queue.put(('log', '🛑 任务已取消'))
             except Exception:
                 self._queue.put(('error', traceback.format_exc()))
 
@@ -1018,6 +1024,14 @@ class VideoClipsMainWindow(QMainWindow):
             overlap = float(self.split_overlap.text() or '0.0')
         except Exception:
             overlap = 0.0
+        try:
+            workers = max(1, int(self.split_workers.text() or '1'))
+        except Exception:
+            workers = 1
+        try:
+            files_in_flight = max(1, int(self.split_files_in_flight.text() or '1'))
+        except Exception:
+            files_in_flight = 1
         outdir_root = self.split_output.text().strip() or os.path.join(self.settings.OUTPUT_DIR, 'segments')
         try:
             r_n = int(self.split_random_count.text() or '8')
@@ -1033,20 +1047,59 @@ class VideoClipsMainWindow(QMainWindow):
             r_max = 10.0
 
         def work():
+            # 多文件并发：每个文件的进度取 0-100，总进度为所有文件的平均值
+            file_progress = {fp: 0.0 for fp in files}
+            progress_lock = threading.Lock()
+
+            def make_progress(fp, name):
+                def cb(percent, message=''):
+                    with progress_lock:
+                        file_progress[fp] = max(0.0, min(100.0, float(percent)))
+                        overall = sum(file_progress.values()) / len(files)
+                    self._queue.put(('progress', (overall, f"[{name}] {message}" if message else '')))
+                return cb
+
+            def split_one(fp):
+                if self.cancel_flag.is_set():
+                    return None
+                name = os.path.splitext(os.path.basename(fp))[0]
+                outdir = os.path.join(outdir_root, name)
+                os.makedirs(outdir, exist_ok=True)
+                self._queue.put(('log', f'切割: {fp} -> {outdir} ({method})'))
+                cb = make_progress(fp, name)
+                if method == 'ffmpeg':
+                    result = self.splitter.split_video_ffmpeg(fp, segment_duration=seg_dur, overlap=overlap, output_dir=outdir, progress_callback=cb)
+                elif method == 'segment':
+                    result = self.splitter.split_video_single_pass(fp, segment_duration=seg_dur, overlap=overlap, output_dir=outdir, progress_callback=cb)
+                elif method == 'smart':
+                    result = self.splitter.split_video_smart(fp, segment_duration=seg_dur, overlap=overlap, output_dir=outdir, progress_callback=cb)
+                elif method == 'scene':
+                    result = self.splitter.split_video_scene(fp, output_dir=outdir, progress_callback=cb, workers=workers)
+                elif method == 'silence':
+                    result = self.splitter.split_video_silence(fp, segment_duration=seg_dur, output_dir=outdir, progress_callback=cb, workers=workers)
+                elif method in ('random', 'random_single'):
+                    result = self.splitter.split_video_random(fp, num_segments=r_n, min_duration=r_min, max_duration=r_max, output_dir=outdir, progress_callback=cb, workers=workers, single_pass=method == 'random_single')
+                else:
+                    result = self.splitter.split_video_equal(fp, segment_duration=seg_dur, output_dir=outdir, overlap=overlap, progress_callback=cb, workers=workers)
+                cb(100)
+                self._queue.put(('log', f'完成切割 {len(result)} 段: {name}'))
+                return result
+
             try:
-                for fp in files:
-                    name = os.path.splitext(os.path.basename(fp))[0]
-                    outdir = os.path.join(outdir_root, name)
-                    os.makedirs(outdir, exist_ok=True)
-                    self._queue.put(('log', f'切割: {fp} -> {outdir} ({method})'))
-                    if method == 'ffmpeg':
-                        result = self.splitter.split_video_ffmpeg(fp, segment_duration=seg_dur, overlap=overlap, output_dir=outdir)
-                    elif method == 'random':
-                        result = self.splitter.split_video_random(fp, num_segments=r_n, min_duration=r_min, max_duration=r_max, output_dir=outdir, progress_callback=self._progress_callback_factory(f"[{name}] "))
-                    else:
-                        result = self.splitter.split_video_equal(fp, segment_duration=seg_dur, output_dir=outdir, overlap=overlap, progress_callback=self._progress_callback_factory(f"[{name}] "))
-                    self._queue.put(('log', f'完成切割 {len(result)} 段: {name}'))
+                with ThreadPoolExecutor(max_workers=max(1, min(files_in_flight, len(files)))) as executor:
+                    futures = [executor.submit(split_one, fp) for fp in files]
+                    try:
+                        for future in as_completed(futures):
+                            future.result()
+                    except BaseException:
+                        # 任一文件失败或取消：不再启动排队中的文件，并终止其他文件正在运行的 ffmpeg
+                        for future in futures:
+                            future.cancel()
+                        FFmpegRunner.cancel_all()
+                        raise
                 self._queue.put(('done', None))
+            except FFmpegCancelled:
+                self._queue.put(('log', '🛑 任务已取消'))
             except Exception:
                 self._queue.put(('error', traceback.format_exc()))
 
@@ -1076,11 +1129,13 @@ class VideoClipsMainWindow(QMainWindow):
             try:
                 self._queue.put(('log', f'宫格: {layout}, {method}, 输出: {out_file}'))
                 if method == 'ffmpeg':
-                    result = self.gridder.create_grid_ffmpeg(files, layout=layout, output_path=out_file, duration=duration)
+                    result = self.gridder.create_grid_ffmpeg(files, layout=layout, output_path=out_file, duration=duration, progress_callback=self._progress_callback_factory('[grid] '))
                 else:
                     result = self.gridder.create_grid_moviepy(files, layout=layout, output_path=out_file, duration=duration, sync=sync, target_size=target_size, progress_callback=self._progress_callback_factory('[grid] '))
                 self._queue.put(('log', f'宫格创建成功: {result}'))
                 self._queue.put(('done', None))
+            except FFmpegCancelled:
+                self._queue.put(('log', '🛑 任务已取消'))
             except Exception:
                 self._queue.put(('error', traceback.format_exc()))
 
@@ -1121,6 +1176,8 @@ class VideoClipsMainWindow(QMainWindow):
                 )
                 self._queue.put(('log', f'时长组合成功: {result}'))
                 self._queue.put(('done', None))
+            except FFmpegCancelled:
+                self._queue.put(('log', '🛑 任务已取消'))
             except Exception:
                 self._queue.put(('error', traceback.format_exc()))
 
@@ -1179,7 +1236,8 @@ class VideoClipsMainWindow(QMainWindow):
                                 music_volume=mvol,
                                 video_volume=vvol,
                                 fade_duration=max(fin, fout),
-                                music_start_offset=offset
+                                music_start_offset=offset,
+                                progress_callback=self._progress_callback_factory('[audio] ')
                             )
                         else:
                             out_path = self.mixer.add_music_to_video_moviepy(
@@ -1194,6 +1252,8 @@ class VideoClipsMainWindow(QMainWindow):
                             )
                         self._queue.put(('log', f'完成：{out_path}'))
                 self._queue.put(('done', None))
+            except FFmpegCancelled:
+                self._queue.put(('log', '🛑 任务已取消'))
             except Exception:
                 self._queue.put(('error', traceback.format_exc()))
 
@@ -1230,6 +1290,8 @@ class VideoClipsMainWindow(QMainWindow):
                 )
                 self._queue.put(('log', f'滑动合成成功: {result}'))
                 self._queue.put(('done', None))
+            except FFmpegCancelled:
+                self._queue.put(('log', '🛑 任务已取消'))
             except Exception:
                 self._queue.put(('error', traceback.format_exc()))
 
@@ -1238,6 +1300,8 @@ class VideoClipsMainWindow(QMainWindow):
     def stop_task(self):
         """停止当前任务"""
         self.cancel_flag.set()
+        # 终止所有正在运行的 FFmpeg 进程
+        FFmpegRunner.cancel_all()
         self.log_message('🛑 用户请求停止任务')
     
     def get_selected_files(self):
@@ -1333,12 +1397,12 @@ class VideoClipsMainWindow(QMainWindow):
         format_layout = QHBoxLayout()
         format_layout.addWidget(QLabel('🖼️ 图片格式:'))
         self.extract_format = QComboBox()
-        self.extract_format.addItems(['png', 'jpg'])
+        self.extract_format.addItems(['png', 'jpg', 'webp', 'avif'])
         format_layout.addWidget(self.extract_format)
         
         format_layout.addWidget(QLabel('⚙️ 方法:'))
         self.extract_method = QComboBox()
-        self.extract_method.addItems(['auto', 'ffmpeg', 'moviepy'])
+        self.extract_method.addItems(['auto', 'ffmpeg', 'keyframes', 'sparse', 'scene', 'sharded', 'contact_sheet', 'moviepy'])
         self.extract_method.setCurrentText('ffmpeg')
         format_layout.addWidget(self.extract_method)
         layout.addLayout(format_layout)
@@ -1387,7 +1451,7 @@ class VideoClipsMainWindow(QMainWindow):
         method_layout = QHBoxLayout()
         method_layout.addWidget(QLabel('⚙️ 方法:'))
         self.split_method = QComboBox()
-        self.split_method.addItems(['ffmpeg', 'equal', 'random'])
+        self.split_method.addItems(['ffmpeg', 'segment', 'smart', 'scene', 'silence', 'equal', 'random', 'random_single'])
         self.split_method.setCurrentText('ffmpeg')
         method_layout.addWidget(self.split_method)
         
@@ -1395,6 +1459,18 @@ class VideoClipsMainWindow(QMainWindow):
         self.split_overlap = QLineEdit('0.0')
         self.split_overlap.setMaximumWidth(60)
         method_layout.addWidget(self.split_overlap)
+        
+        method_layout.addWidget(QLabel('⚡ 并行数:'))
+        self.split_workers = QLineEdit(str(self.settings.SPLIT_WORKERS))
+        self.split_workers.setToolTip('equal/random 方法同时运行的 ffmpeg 编码进程数')
+        self.split_workers.setMaximumWidth(50)
+        method_layout.addWidget(self.split_workers)
+        
+        method_layout.addWidget(QLabel('📂 并行文件:'))
+        self.split_files_in_flight = QLineEdit(str(self.settings.SPLIT_FILES_IN_FLIGHT))
+        self.split_files_in_flight.setToolTip('同时切割的源文件数（与每个文件内的并行数分开设置）')
+        self.split_files_in_flight.setMaximumWidth(50)
+        method_layout.addWidget(self.split_files_in_flight)
         layout.addLayout(method_layout)
         
         # 随机参数
@@ -1846,12 +1922,14 @@ class VideoClipsMainWindow(QMainWindow):
                         start_sec=start_sec,
                         duration_sec=duration_sec,
                     )
-                    result_path = extract_audio(fp, out_path, opt)
+                    result_path = extract_audio(fp, out_path, opt, progress_callback=self._progress_callback_factory(f"[{name}] "))
 
                     self._queue.put(('log', f'完成: {result_path}'))
                     percent = idx / max(1, total) * 100.0
                     self._queue.put(('progress', (percent, f"完成 {idx}/{total}: {name}")))
                 self._queue.put(('done', None))
+            except FFmpegCancelled:
+                self._queue.put(('log', '🛑 任务已取消'))
             except Exception:
                 self._queue.put(('error', traceback.format_exc()))
 
@@ -1920,6 +1998,8 @@ class VideoClipsMainWindow(QMainWindow):
                     percent = idx / max(1, total) * 100.0
                     self._queue.put(('progress', (percent, f"完成 {idx}/{total}: {name}")))
                 self._queue.put(('done', None))
+            except FFmpegCancelled:
+                self._queue.put(('log', '🛑 任务已取消'))
             except Exception:
                 self._queue.put(('error', traceback.format_exc()))
 
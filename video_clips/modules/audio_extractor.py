@@ -7,10 +7,14 @@ from __future__ import annotations
 
 import os
 import shutil
-import subprocess
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Callable
+
+from utils.ffmpeg_runner import FFmpegRunner
+
+
+_runner = FFmpegRunner()
 
 
 def ensure_ffmpeg() -> None:
@@ -77,7 +81,12 @@ def build_ffmpeg_cmd(input_path: str, output_path: str, opt: ExtractOptions) ->
     return cmd
 
 
-def extract_audio(input_path: str, output_path: str, opt: Optional[ExtractOptions] = None) -> str:
+def _run(cmd: List[str], opt: ExtractOptions, progress_callback: Optional[Callable]):
+    return _runner.run(cmd, duration=opt.duration_sec, progress_callback=progress_callback, check=False)
+
+
+def extract_audio(input_path: str, output_path: str, opt: Optional[ExtractOptions] = None,
+                  progress_callback: Optional[Callable] = None) -> str:
     """从视频中提取音频并保存到 output_path，返回输出文件路径。"""
     ensure_ffmpeg()
     opt = opt or ExtractOptions()
@@ -91,7 +100,7 @@ def extract_audio(input_path: str, output_path: str, opt: Optional[ExtractOption
 
     # 第一次尝试：按用户要求格式编码
     cmd = build_ffmpeg_cmd(str(in_p), str(out_p), opt)
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    proc = _run(cmd, opt, progress_callback)
     if proc.returncode == 0:
         return str(out_p)
 
@@ -110,7 +119,7 @@ def extract_audio(input_path: str, output_path: str, opt: Optional[ExtractOption
             duration_sec=opt.duration_sec,
         )
         cmd2 = build_ffmpeg_cmd(str(in_p), str(out_m4a), opt_aac)
-        proc2 = subprocess.run(cmd2, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        proc2 = _run(cmd2, opt_aac, progress_callback)
         if proc2.returncode == 0:
             return str(out_m4a)
 
@@ -124,7 +133,7 @@ def extract_audio(input_path: str, output_path: str, opt: Optional[ExtractOption
             duration_sec=opt.duration_sec,
         )
         cmd3 = build_ffmpeg_cmd(str(in_p), str(out_wav), opt_wav)
-        proc3 = subprocess.run(cmd3, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        proc3 = _run(cmd3, opt_wav, progress_callback)
         if proc3.returncode == 0:
             return str(out_wav)
 
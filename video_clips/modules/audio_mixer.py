@@ -8,6 +8,8 @@ import subprocess
 from typing import List, Optional, Callable, Tuple
 from moviepy.editor import VideoFileClip, AudioFileClip, CompositeAudioClip
 from config.settings import Settings
+from utils.video_utils import VideoUtils
+from utils.ffmpeg_runner import FFmpegRunner
 
 
 class AudioMixer:
@@ -15,6 +17,8 @@ class AudioMixer:
     
     def __init__(self):
         self.settings = Settings()
+        self.vutils = VideoUtils()
+        self.runner = FFmpegRunner()
     
     def get_audio_files(self, music_dir: str = None) -> List[str]:
         """
@@ -65,14 +69,9 @@ class AudioMixer:
         # 根据视频时长筛选合适的音乐
         suitable_music = []
         for audio_file in audio_files:
-            try:
-                with AudioFileClip(audio_file) as audio:
-                    audio_duration = audio.duration
-                    # 选择时长大于视频的音乐
-                    if audio_duration >= duration:
-                        suitable_music.append(audio_file)
-            except:
-                continue
+            # 选择时长大于视频的音乐（时长走探测缓存）
+            if self.vutils.get_video_duration(audio_file) >= duration:
+                suitable_music.append(audio_file)
         
         if suitable_music:
             selected = random.choice(suitable_music)
@@ -116,8 +115,7 @@ class AudioMixer:
         
         # 随机选择音乐
         if music_path is None:
-            with VideoFileClip(video_path) as temp_video:
-                video_duration = temp_video.duration
+            video_duration = self.vutils.get_video_duration(video_path)
             music_path = self.select_random_music(duration=video_duration)
             
             if music_path is None:
@@ -238,7 +236,8 @@ class AudioMixer:
                                   music_volume: float = 0.3,
                                   video_volume: float = 0.7,
                                   fade_duration: float = 2.0,
-                                  music_start_offset: float = 0.0) -> str:
+                                  music_start_offset: float = 0.0,
+                                  progress_callback: Optional[Callable] = None) -> str:
         """
         使用FFmpeg为视频添加背景音乐 (更高效)
         
@@ -250,6 +249,7 @@ class AudioMixer:
             video_volume: 原视频音量
             fade_duration: 淡入淡出时长
             music_start_offset: 音乐开始偏移时间
+            progress_callback: 进度回调函数
             
         Returns:
             str: 输出文件路径
@@ -260,15 +260,10 @@ class AudioMixer:
         # 随机选择音乐
         if music_path is None:
             # 获取视频时长
-            cmd = [
-                'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1', video_path
-            ]
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                video_duration = float(result.stdout.strip())
+            video_duration = self.vutils.get_video_duration(video_path)
+            if video_duration > 0:
                 music_path = self.select_random_music(duration=video_duration)
-            except:
+            else:
                 music_path = self.select_random_music()
             
             if music_path is None:
@@ -313,7 +308,11 @@ class AudioMixer:
         print(f"执行FFmpeg音乐混合: {' '.join(cmd[:8])}...")
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            self.runner.run(
+                cmd,
+                duration=self.vutils.get_video_duration(video_path),
+                progress_callback=progress_callback
+            )
             print(f"FFmpeg音乐配对成功: {output_path}")
             return output_path
             
@@ -353,7 +352,7 @@ class AudioMixer:
             fade_duration = max(fade_in_duration, fade_out_duration)
             return self.add_music_to_video_ffmpeg(
                 video_path, music_path, output_path, music_volume, video_volume, 
-                fade_duration, music_start_offset
+                fade_duration, music_start_offset, progress_callback
             )
         else:  # moviepy
             return self.add_music_to_video_moviepy(
@@ -456,19 +455,16 @@ class AudioMixer:
         total_duration = 0
         
         for audio_file in audio_files:
-            try:
-                with AudioFileClip(audio_file) as audio:
-                    duration = audio.duration
-                    durations.append(duration)
-                    total_duration += duration
-                
-                # 统计格式
-                ext = os.path.splitext(audio_file)[1].lower()
-                formats[ext] = formats.get(ext, 0) + 1
-                
-            except Exception as e:
-                print(f"分析音频文件失败 {audio_file}: {e}")
+            duration = self.vutils.get_video_duration(audio_file)
+            if duration <= 0:
+                print(f"分析音频文件失败 {audio_file}")
                 continue
+            durations.append(duration)
+            total_duration += duration
+            
+            # 统计格式
+            ext = os.path.splitext(audio_file)[1].lower()
+            formats[ext] = formats.get(ext, 0) + 1
         
         stats = {
             "total": len(audio_files),
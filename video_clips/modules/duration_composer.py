@@ -15,6 +15,7 @@ except ImportError:
     HAS_TRANSITIONS = False
     print("Warning: MoviePy transition effects not available. Using basic transitions.")
 from config.settings import Settings
+from utils.video_utils import VideoUtils
 
 
 class DurationComposer:
@@ -22,6 +23,7 @@ class DurationComposer:
     
     def __init__(self):
         self.settings = Settings()
+        self.vutils = VideoUtils()
     
     def _select_clips_for_duration(self, 
                                   video_paths: List[str], 
@@ -41,16 +43,14 @@ class DurationComposer:
         if not video_paths:
             raise ValueError("视频片段列表为空")
         
-        # 获取每个视频的时长信息
+        # 获取每个视频的时长信息（走探测缓存）
         video_info = []
         for path in video_paths:
-            try:
-                with VideoFileClip(path) as clip:
-                    duration = clip.duration
-                    video_info.append((path, duration))
-            except:
+            duration = self.vutils.get_video_duration(path)
+            if duration <= 0:
                 print(f"无法获取视频信息: {path}")
                 continue
+            video_info.append((path, duration))
         
         if not video_info:
             raise ValueError("没有有效的视频片段")
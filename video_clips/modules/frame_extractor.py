@@ -3,17 +3,37 @@
 从视频中提取帧图片，支持自定义时间间隔和输出格式；实现基于 FFmpeg 与 MoviePy。
 """
 import os
+import json
+import math
+import shutil
+import tempfile
+import threading
 import subprocess
-from typing import Optional, Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Callable, Tuple
 
 try:
     from moviepy.editor import VideoFileClip
+    from PIL import Image
     HAS_MOVIEPY = True
 except ImportError:
     HAS_MOVIEPY = False
     print("提示: MoviePy 未安装，将仅使用 FFmpeg 进行抽帧。")
 
 from config.settings import Settings
+from utils.video_utils import VideoUtils
+from utils.ffmpeg_runner import FFmpegRunner
+from utils.scene_detector import get_scene_detector
+from utils.job_manifest import JobManifest
+from utils.frame_times import parse_frame_log, map_to_selected
+
+try:
+    import numpy as np
+    from utils.keyframe_index import get_keyframe_index
+    from utils.image_hash import dhash_images, dedup_indices, pil_can_read
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 
 
 class FrameExtractor:
@@ -21,13 +41,64 @@ class FrameExtractor:
 
     def __init__(self):
         self.settings = Settings()
+        self.vutils = VideoUtils()
+        self.runner = FFmpegRunner()
+        self.keyframes = get_keyframe_index() if HAS_NUMPY else None
+        self.scenes = get_scene_detector()
+
+    # 图片格式 -> 质量档位对应的 ffmpeg 编码参数
+    QUALITY_ARGS = {
+        'jpg': {'high': ['-q:v', '2'], 'medium': ['-q:v', '5'], 'low': ['-q:v', '10']},
+        'webp': {
+            'high': ['-c:v', 'libwebp', '-quality', '90'],
+            'medium': ['-c:v', 'libwebp', '-quality', '75'],
+            'low': ['-c:v', 'libwebp', '-quality', '50'],
+        },
+        'avif': {
+            'high': ['-c:v', 'libaom-av1', '-still-picture', '1', '-crf', '20', '-cpu-used', '6'],
+            'medium': ['-c:v', 'libaom-av1', '-still-picture', '1', '-crf', '30', '-cpu-used', '6'],
+            'low': ['-c:v', 'libaom-av1', '-still-picture', '1', '-crf', '40', '-cpu-used', '6'],
+        },
+    }
+
+    # Pillow 保存参数（MoviePy 路径）
+    PIL_QUALITY = {'high': 90, 'medium': 75, 'low': 50}
+
+    # 只能逐帧单独输出的格式：avif 由单文件 avif 复用器写出，image2 的 %04d 序列不可用
+    SINGLE_FRAME_FORMATS = ('avif',)
+
+    @classmethod
+    def _require_sequence_format(cls, image_format: str, method: str) -> None:
+        """基于 %04d 序列输出的方法不支持逐帧格式"""
+        if image_format.lower() in cls.SINGLE_FRAME_FORMATS:
+            raise ValueError(f"{method} 不支持 {image_format} 输出（只能逐帧写出），请改用 'sparse' 方法")
+
+    @classmethod
+    def _quality_args(cls, image_format: str, quality: str = 'high') -> list:
+        """输出图片的编码参数；png 无损，无额外参数"""
+        fmt = image_format.lower()
+        presets = cls.QUALITY_ARGS.get('jpg' if fmt == 'jpeg' else fmt)
+        if not presets:
+            return []
+        return list(presets.get(quality, presets['high']))
+
+    @staticmethod
+    def _collect_numbered(pattern: str, start: int = 1) -> list:
+        """按序号逐个探测 image2 输出（%04d 连续编号），避免列举并排序整个输出目录"""
+        files = []
+        k = start
+        while os.path.exists(pattern % k):
+            files.append(pattern % k)
+            k += 1
+        return files
 
     def extract_frames_ffmpeg(self,
                               video_path: str,
                               output_dir: str,
                               interval: float = 1.0,
                               image_format: str = 'png',
-                              quality: str = 'high') -> list:
+                              quality: str = 'high',
+                              progress_callback: Optional[Callable] = None) -> list:
         """
         使用 FFmpeg 提取视频帧（高效、无重编码）
 
@@ -37,12 +108,14 @@ class FrameExtractor:
             interval: 提取间隔（秒）
             image_format: 输出图片格式
             quality: 输出质量 ('high', 'medium', 'low')
+            progress_callback: 进度回调函数
 
         Returns:
             list: 输出的图片文件路径列表
         """
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        self._require_sequence_format(image_format, 'ffmpeg')
 
         os.makedirs(output_dir, exist_ok=True)
 
@@ -56,24 +129,23 @@ class FrameExtractor:
             '-y'  # 覆盖输出文件
         ]
 
-        # 根据质量设置参数（仅 jpg 有效）
-        if image_format.lower() in ('jpg', 'jpeg'):
-            quality_map = {'high': 2, 'medium': 5, 'low': 10}
-            cmd.extend(['-q:v', str(quality_map.get(quality, 2))])
+        # 根据格式与质量设置编码参数
+        cmd.extend(self._quality_args(image_format, quality))
 
         cmd.append(output_pattern)
 
         print(f"执行 FFmpeg 命令: {' '.join(cmd)}")
 
         try:
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
+            self.runner.run(
+                cmd,
+                duration=self.vutils.get_video_duration(video_path),
+                progress_callback=progress_callback
+            )
             print("FFmpeg 提取完成!")
 
             # 收集生成的文件
-            extracted_files = []
-            for file in sorted(os.listdir(output_dir)):
-                if file.startswith(f"{video_name}_frame_") and file.endswith(f'.{image_format}'):
-                    extracted_files.append(os.path.join(output_dir, file))
+            extracted_files = self._collect_numbered(output_pattern)
 
             print(f"共提取 {len(extracted_files)} 帧到: {output_dir}")
             return extracted_files
@@ -81,14 +153,853 @@ class FrameExtractor:
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"FFmpeg 提取失败: {e.stderr}")
 
-    def extract_frames_moviepy(self,
+    def extract_frames_keyframes(self,
+                                 video_path: str,
+                                 output_dir: str,
+                                 interval: Optional[float] = None,
+                                 image_format: str = 'png',
+                                 quality: str = 'high',
+                                 progress_callback: Optional[Callable] = None) -> list:
+        """
+        只解码关键帧的快速抽帧（时间点为近似值）
+
+        使用 -skip_frame nokey 让解码器跳过所有非关键帧，-vsync vfr 按实际帧输出。
+        指定 interval 时，每个 interval 区间只保留其中第一个关键帧（即各间隔点之后最近的关键帧）。
+
+        Args:
+            video_path: 输入视频路径
+            output_dir: 输出目录
+            interval: 采样间隔（秒）；为 None 或 <= 0 时输出全部关键帧
+            image_format: 输出图片格式
+            quality: 输出质量 ('high', 'medium', 'low')
+            progress_callback: 进度回调函数
+
+        Returns:
+            list: 输出的图片文件路径列表
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        self._require_sequence_format(image_format, 'keyframes')
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        output_pattern = os.path.join(output_dir, f"{video_name}_key_%04d.{image_format}")
+
+        cmd = ['ffmpeg', '-skip_frame', 'nokey', '-i', video_path, '-an', '-sn']
+        if interval and interval > 0:
+            # 关键帧所在的间隔桶编号大于上一个已选帧的桶编号时选中
+            cmd.extend(['-vf', f"select='isnan(prev_selected_t)+gt(floor(t/{interval}),floor(prev_selected_t/{interval}))'"])
+        cmd.extend(['-vsync', 'vfr', '-y'])
+        cmd.extend(self._quality_args(image_format, quality))
+
+        cmd.append(output_pattern)
+
+        print(f"执行 FFmpeg 命令: {' '.join(cmd)}")
+
+        try:
+            self.runner.run(
+                cmd,
+                duration=self.vutils.get_video_duration(video_path),
+                progress_callback=progress_callback
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"FFmpeg 关键帧提取失败: {e.stderr}")
+
+        extracted_files = self._collect_numbered(output_pattern)
+
+        print(f"共提取 {len(extracted_files)} 个关键帧到: {output_dir}")
+        return extracted_files
+
+    def extract_frames_sparse(self,
+                              video_path: str,
+                              output_dir: str,
+                              interval: float = 30.0,
+                              image_format: str = 'png',
+                              quality: str = 'high',
+                              progress_callback: Optional[Callable] = None,
+                              workers: int = None,
+                              manifest: Optional[JobManifest] = None) -> list:
+        """
+        基于输入端 seek 的稀疏抽帧：每个时间点只解码其所在 GOP，适合大间隔
+
+        同一 ffmpeg 进程串接多个 -ss T -i src 输入（每个输出 -frames:v 1），
+        按 Settings.SPARSE_SEEKS_PER_PROCESS 分批并由少量进程并行执行。
+
+        Args:
+            video_path: 输入视频路径
+            output_dir: 输出目录
+            interval: 提取间隔（秒）
+            image_format: 输出图片格式
+            quality: 输出质量 ('high', 'medium', 'low')
+            progress_callback: 进度回调函数
+            workers: 并行进程数，默认 Settings.SPARSE_EXTRACT_WORKERS
+            manifest: 任务清单；清单中已完成的时间点直接跳过（续做中断的任务）
+
+        Returns:
+            list: 输出的图片文件路径列表（按时间排序）
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        duration = self.vutils.get_video_duration(video_path)
+        timestamps = [i * interval for i in range(int(duration // interval) + 1) if i * interval < duration]
+
+        jobs = [
+            (t, os.path.join(output_dir, f"{video_name}_frame_{i:04d}_t{t:.1f}s.{image_format}"))
+            for i, t in enumerate(timestamps)
+        ]
+        print(f"开始稀疏抽帧: {video_path}")
+        print(f"视频时长: {duration:.2f}秒, 将提取 {len(timestamps)} 帧")
+        if manifest is not None:
+            manifest.plan({os.path.basename(path): path for _, path in jobs})
+            pending = [(t, path) for t, path in jobs if not manifest.is_done(os.path.basename(path))]
+            if len(pending) < len(jobs):
+                print(f"清单中已完成 {len(jobs) - len(pending)} 帧，继续提取剩余 {len(pending)} 帧")
+            try:
+                self._extract_at_seek(video_path, pending, image_format, quality, workers, progress_callback, manifest)
+            finally:
+                manifest.flush()
+            extracted_files = manifest.completed()
+            if len(extracted_files) == len(jobs):
+                manifest.record({}, complete=True)
+        else:
+            extracted_files = self._extract_at_seek(video_path, jobs, image_format, quality, workers, progress_callback)
+        print(f"稀疏抽帧完成! 共提取 {len(extracted_files)} 帧到: {output_dir}")
+        return extracted_files
+
+    def _extract_at_seek(self,
+                         video_path: str,
+                         jobs: List[Tuple[float, str]],
+                         image_format: str = 'png',
+                         quality: str = 'high',
+                         workers: int = None,
+                         progress_callback: Optional[Callable] = None,
+                         manifest: Optional[JobManifest] = None) -> list:
+        """
+        按时间点逐个 seek 取帧：每批串接多个 -ss T -i src 输入，批次由少量进程并行执行
+
+        Args:
+            jobs: [(时间点, 输出路径)]
+            manifest: 任务清单；每批完成后把写出的图片登记为完成
+
+        Returns:
+            list: 成功写出的图片路径（按路径排序）
+        """
+        workers = workers or self.settings.SPARSE_EXTRACT_WORKERS
+        quality_args = self._quality_args(image_format, quality)
+        if image_format.lower() == 'avif':
+            # 每个输出一帧，由 avif 复用器写成完整的 AVIF 文件
+            quality_args += ['-f', 'avif']
+
+        batch_size = max(1, self.settings.SPARSE_SEEKS_PER_PROCESS)
+        batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+
+        def extract_batch(batch):
+            cmd = ['ffmpeg', '-y']
+            for t, _ in batch:
+                cmd.extend(['-ss', f"{t:.3f}", '-i', video_path])
+            for k, (_, output_path) in enumerate(batch):
+                cmd.extend(['-map', f'{k}:v:0', '-frames:v', '1'] + quality_args + [output_path])
+            self.runner.run(cmd)
+            written = [output_path for _, output_path in batch if os.path.exists(output_path)]
+            if manifest is not None:
+                manifest.record({os.path.basename(path): path for path in written})
+            return written
+
+        extracted_files = []
+        done = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(extract_batch, batch): batch for batch in batches}
+            try:
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    try:
+                        extracted_files.extend(future.result())
+                    except subprocess.CalledProcessError as e:
+                        print(f"抽帧批次失败 ({batch[0][0]:.1f}s-{batch[-1][0]:.1f}s): {e.stderr}")
+                    done += len(batch)
+                    if progress_callback:
+                        progress_callback(done / len(jobs) * 100, f"已提取 {done}/{len(jobs)} 帧")
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        extracted_files.sort()
+        return extracted_files
+
+    def extract_at(self,
+                   video_path: str,
+                   timestamps: List[float],
+                   output_dir: str = None,
+                   image_format: str = 'png',
+                   quality: str = 'high',
+                   progress_callback: Optional[Callable] = None,
+                   workers: int = None) -> list:
+        """
+        按给定时间点列表抽帧（字幕时间、精彩标记等），每个时间点取 t >= 该时间的第一帧
+
+        时间点排序后按 Settings.EXTRACT_AT_GROUP_GAP 切成若干区段；每个区段只运行一次 ffmpeg：
+        输入端 seek 到区段起点，用一个 select 表达式一次解码选出区段内全部目标帧，
+        同时以 framecrc 记录选中帧的时间戳，据此把图片映射回各个请求。区段之间并行执行。
+        日志输出沿用输入流的时间基（-enc_time_base -1），记录的时间与 select 比较的时间一致，
+        不会被编码器按帧率取整。
+
+        Args:
+            video_path: 输入视频路径
+            timestamps: 时间点列表（秒），可无序、可重复
+            output_dir: 输出目录，默认 OUTPUT_DIR/frames/{视频名}
+            image_format: 输出图片格式
+            quality: 输出质量 ('high', 'medium', 'low')
+            progress_callback: 进度回调函数
+            workers: 并行区段数，默认 Settings.SPARSE_EXTRACT_WORKERS
+
+        Returns:
+            list: 按请求顺序排列的图片路径（{视频名}_at_{序号}.{格式}）；超出视频末尾的时间点被跳过
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        self._require_sequence_format(image_format, 'extract_at')
+
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        if output_dir is None:
+            output_dir = os.path.join(self.settings.OUTPUT_DIR, 'frames', video_name)
+        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(self.settings.TEMP_DIR, exist_ok=True)
+
+        targets = sorted(set(max(0.0, float(t)) for t in timestamps))
+        if not targets:
+            return []
+        groups = [[targets[0]]]
+        for t in targets[1:]:
+            if t - groups[-1][-1] > self.settings.EXTRACT_AT_GROUP_GAP:
+                groups.append([t])
+            else:
+                groups[-1].append(t)
+
+        workers = workers or self.settings.SPARSE_EXTRACT_WORKERS
+        quality_args = self._quality_args(image_format, quality)
+        # 目标时间 -> 选中帧的临时图片；区段序号 -> 写出的临时图片数（失败区段为 None）
+        frame_of = {}
+        produced = {}
+        lock = threading.Lock()
+
+        def extract_group(g, group):
+            # 起点前留 1 秒余量，保证目标所在帧不会被 seek 截掉；输出时间戳相对于起点
+            start = max(0.0, group[0] - 1.0)
+            span = group[-1] - start + 1.0
+            expr = '+'.join(
+                f"gte(t,{t - start:.6f})*(isnan(prev_t)+lt(prev_t,{t - start:.6f}))" for t in group
+            )
+            pattern = os.path.join(output_dir, f".{video_name}_at_g{g}_%06d.{image_format}")
+            fd, list_path = tempfile.mkstemp(prefix='extract_at_', suffix='.txt', dir=self.settings.TEMP_DIR)
+            os.close(fd)
+            cmd = [
+                'ffmpeg', '-y', '-ss', f"{start:.3f}", '-t', f"{span:.3f}",
+                '-an', '-sn', '-dn', '-i', video_path,
+                '-filter_complex', f"[0:v:0]select='{expr}',split=2[img][log]",
+                '-map', '[img]', '-vsync', 'passthrough'
+            ] + quality_args + [
+                pattern,
+                '-map', '[log]', '-vsync', 'passthrough', '-enc_time_base', '-1', '-f', 'framecrc', list_path
+            ]
+            try:
+                self.runner.run(cmd)
+                with open(list_path, 'r', encoding='utf-8') as f:
+                    lines = f.read().splitlines()
+            finally:
+                if os.path.exists(list_path):
+                    os.remove(list_path)
+
+            # 日志时间相对于区段起点，与 select 表达式中的 t - start 同基准比较
+            selected = parse_frame_log(lines)
+            relative = {t - start: t for t in group}
+            mapping = {}
+            for rel, k in map_to_selected(selected, relative).items():
+                frame_path = pattern % (k + 1)
+                if os.path.exists(frame_path):
+                    mapping[relative[rel]] = frame_path
+            with lock:
+                frame_of.update(mapping)
+                produced[g] = len(selected)
+            return len(group)
+
+        done = 0
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                futures = {executor.submit(extract_group, g, group): group for g, group in enumerate(groups)}
+                try:
+                    for future in as_completed(futures):
+                        group = futures[future]
+                        try:
+                            done += future.result()
+                        except subprocess.CalledProcessError as e:
+                            print(f"抽帧区段失败 ({group[0]:.1f}s-{group[-1]:.1f}s): {e.stderr}")
+                            done += len(group)
+                        if progress_callback:
+                            progress_callback(done / len(targets) * 100, f"已处理 {done}/{len(targets)} 个时间点")
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+            # 按请求顺序命名；多个请求落在同一帧时前几次复制，最后一次直接重命名
+            requested = [frame_of.get(max(0.0, float(t))) for t in timestamps]
+            remaining = {}
+            for frame_path in requested:
+                if frame_path is not None:
+                    remaining[frame_path] = remaining.get(frame_path, 0) + 1
+            extracted_files = []
+            for i, (t, frame_path) in enumerate(zip(timestamps, requested)):
+                if frame_path is None:
+                    print(f"时间点 {t}s 超出视频范围，已跳过")
+                    continue
+                output_path = os.path.join(output_dir, f"{video_name}_at_{i:04d}.{image_format}")
+                remaining[frame_path] -= 1
+                if remaining[frame_path]:
+                    shutil.copyfile(frame_path, output_path)
+                else:
+                    os.replace(frame_path, output_path)
+                extracted_files.append(output_path)
+        finally:
+            # 清理未被认领的临时图片（失败区段写出的数量未知，逐个探测）
+            for g in range(len(groups)):
+                pattern = os.path.join(output_dir, f".{video_name}_at_g{g}_%06d.{image_format}")
+                count = produced.get(g)
+                k = 1
+                while (count is not None and k <= count) or (count is None and os.path.exists(pattern % k)):
+                    if os.path.exists(pattern % k):
+                        os.remove(pattern % k)
+                    k += 1
+
+        print(f"指定时间点抽帧完成! 共 {len(extracted_files)}/{len(timestamps)} 帧到: {output_dir}")
+        return extracted_files
+
+    def extract_frames_scene(self,
+                             video_path: str,
+                             output_dir: str,
+                             threshold: float = None,
+                             image_format: str = 'png',
+                             quality: str = 'high',
+                             dedup: bool = True,
+                             max_distance: int = None,
+                             progress_callback: Optional[Callable] = None) -> list:
+        """
+        按镜头切换抽帧：只保留场景变化分数超过阈值的帧，再用感知哈希剔除整体近似重复的帧
+
+        镜头切换点复用 SceneDetector 的缓存结果（代理画面一次解码），帧通过输入端 seek 提取。
+
+        Args:
+            video_path: 输入视频路径
+            output_dir: 输出目录
+            threshold: 场景变化阈值 (0-1)，默认 Settings.SCENE_THRESHOLD
+            image_format: 输出图片格式
+            quality: 输出质量 ('high', 'medium', 'low')
+            dedup: 是否按 dHash 去重
+            max_distance: 视为重复的最大汉明距离，默认 Settings.FRAME_DEDUP_DISTANCE
+            progress_callback: 进度回调函数
+
+        Returns:
+            list: 输出的图片文件路径列表（按时间排序）
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        duration = self.vutils.get_video_duration(video_path)
+
+        # 镜头检测占前 40% 进度，取帧占其余部分
+        detect_progress = None
+        extract_progress = None
+        if progress_callback:
+            def detect_progress(percent, message):
+                progress_callback(percent * 0.4, f"镜头检测 {message}")
+
+            def extract_progress(percent, message):
+                progress_callback(40 + percent * 0.6, message)
+
+        boundaries = self.scenes.detect(video_path, threshold, duration, detect_progress)
+        # 每个镜头取其起点稍后的一帧，避开转场的混合帧
+        timestamps = [0.0] + [t for t in boundaries if t < duration]
+        jobs = [
+            (min(t + 0.1, max(0.0, duration - 0.05)),
+             os.path.join(output_dir, f"{video_name}_scene_{i:04d}_t{t:.1f}s.{image_format}"))
+            for i, t in enumerate(timestamps)
+        ]
+        print(f"开始按镜头抽帧: {video_path}")
+        print(f"检测到 {len(boundaries)} 个镜头切换, 将提取 {len(jobs)} 帧")
+        extracted_files = self._extract_at_seek(video_path, jobs, image_format, quality, None, extract_progress)
+
+        if dedup and extracted_files:
+            if not HAS_NUMPY:
+                print("提示: numpy 未安装，跳过感知哈希去重")
+            elif not pil_can_read(extracted_files[0]):
+                print(f"提示: 当前 Pillow 无法读取 {image_format} 图片，跳过感知哈希去重")
+            else:
+                max_distance = max_distance if max_distance is not None else self.settings.FRAME_DEDUP_DISTANCE
+                hashes = dhash_images(extracted_files, self.settings.FRAME_HASH_SIZE)
+                keep = set(dedup_indices(hashes, max_distance))
+                for i, path in enumerate(extracted_files):
+                    if i not in keep:
+                        os.remove(path)
+                print(f"感知哈希去重: 移除 {len(extracted_files) - len(keep)} 张近似重复帧")
+                extracted_files = [path for i, path in enumerate(extracted_files) if i in keep]
+
+        print(f"按镜头抽帧完成! 共提取 {len(extracted_files)} 帧到: {output_dir}")
+        return extracted_files
+
+    def _shard_boundaries(self, video_path: str, duration: float, shards: int) -> List[float]:
+        """
+        把时间轴均分为 shards 段，分界点对齐到最近的关键帧（无索引时保持均分）
+
+        时间相对于容器 start_time（与关键帧索引、输入端 -ss 及整段解码的输出时间轴一致）。
+        """
+        targets = [duration * i / shards for i in range(1, shards)]
+        if self.keyframes is not None:
+            try:
+                targets = [self.keyframes.snap(video_path, t, 'nearest') for t in targets]
+            except (subprocess.CalledProcessError, OSError) as e:
+                print(f"关键帧索引不可用，分片不对齐关键帧: {e}")
+        return [0.0] + sorted(t for t in set(targets) if 0 < t < duration) + [duration]
+
+    def extract_frames_sharded(self,
                                video_path: str,
                                output_dir: str,
                                interval: float = 1.0,
                                image_format: str = 'png',
+                               quality: str = 'high',
+                               progress_callback: Optional[Callable] = None,
+                               shards: int = None) -> list:
+        """
+        分片并行抽帧：时间轴按关键帧切成若干段，每段一个 ffmpeg 进程（输入端 seek），
+        结果按全局序号与时间戳合并，适合长视频多核机器
+
+        每段把时间戳平移回整段时间轴（setpts 加上分片起点），再用 fps 滤镜的 start_time
+        从该段第一个采样槽开始取帧，采样与取整规则与整段 fps=1/interval 解码完全一致
+        （第 k 帧对应 k × interval 秒）。
+
+        Args:
+            video_path: 输入视频路径
+            output_dir: 输出目录
+            interval: 提取间隔（秒）
+            image_format: 输出图片格式
+            quality: 输出质量 ('high', 'medium', 'low')
+            progress_callback: 进度回调函数
+            shards: 分片数（并行进程数），默认 Settings.EXTRACT_SHARDS
+
+        Returns:
+            list: 输出的图片文件路径列表（按时间排序）
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        self._require_sequence_format(image_format, 'sharded')
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        duration = self.vutils.get_video_duration(video_path)
+        total = len([i for i in range(int(duration // interval) + 1) if i * interval < duration])
+        shards = max(1, min(shards or self.settings.EXTRACT_SHARDS, total))
+        bounds = self._shard_boundaries(video_path, duration, shards)
+        threads = max(1, self.settings.ENCODE_CPU_BUDGET // (len(bounds) - 1))
+        quality_args = self._quality_args(image_format, quality)
+
+        # (分片起点, 第一个采样序号, 采样数)
+        jobs = []
+        # fps 滤镜为采样槽 n 输出时间戳取整后 <= n 的最后一帧，即 t < (n + 0.5) × interval 的最后一帧；
+        # 分片从关键帧 start 起解码，能完整得到的第一个槽是 ceil(start / interval - 0.5)
+        def first_slot(t):
+            return max(0, math.ceil(t / interval - 0.5 - 1e-9))
+
+        for i in range(len(bounds) - 1):
+            first = first_slot(bounds[i])
+            last = total if i == len(bounds) - 2 else first_slot(bounds[i + 1])
+            if last > first:
+                jobs.append((bounds[i], first, last - first))
+
+        shard_progress = [0.0] * len(jobs)
+        progress_lock = threading.Lock()
+
+        def extract_shard(s):
+            start, first, count = jobs[s]
+            tmp_pattern = os.path.join(output_dir, f".{video_name}_shard_%06d.{image_format}")
+            cmd = [
+                'ffmpeg', '-y', '-threads', str(threads), '-ss', f"{start:.6f}", '-i', video_path,
+                '-an', '-sn',
+                '-vf', f"setpts=PTS+{start:.6f}/TB,fps=fps=1/{interval}:start_time={first * interval:.6f}",
+                '-frames:v', str(count), '-start_number', str(first)
+            ] + quality_args + [tmp_pattern]
+
+            shard_cb = None
+            if progress_callback:
+                def shard_cb(percent, message):
+                    with progress_lock:
+                        shard_progress[s] = percent
+                        overall = sum(shard_progress) / len(jobs)
+                    progress_callback(overall, f"分片 {s + 1}/{len(jobs)} {message}")
+            self.runner.run(cmd, duration=max(0.0, first * interval - start) + count * interval,
+                            progress_callback=shard_cb)
+
+            outputs = []
+            for k in range(first, first + count):
+                tmp_path = os.path.join(output_dir, f".{video_name}_shard_{k:06d}.{image_format}")
+                if not os.path.exists(tmp_path):
+                    continue
+                output_path = os.path.join(output_dir, f"{video_name}_frame_{k:04d}_t{k * interval:.1f}s.{image_format}")
+                os.replace(tmp_path, output_path)
+                outputs.append(output_path)
+            return outputs
+
+        print(f"开始分片抽帧: {video_path}")
+        print(f"视频时长: {duration:.2f}秒, 将提取 {total} 帧, {len(jobs)} 个分片 × {threads} 线程")
+
+        extracted_files = []
+        with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as executor:
+            futures = {executor.submit(extract_shard, s): s for s in range(len(jobs))}
+            try:
+                for future in as_completed(futures):
+                    try:
+                        extracted_files.extend(future.result())
+                    except subprocess.CalledProcessError as e:
+                        s = futures[future]
+                        print(f"分片抽帧失败 (分片 {s + 1}, 起点 {jobs[s][0]:.1f}s): {e.stderr}")
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        extracted_files.sort()
+        print(f"分片抽帧完成! 共提取 {len(extracted_files)} 帧到: {output_dir}")
+        return extracted_files
+
+    def extract_contact_sheets(self,
+                               video_path: str,
+                               output_dir: str,
+                               interval: float = 1.0,
+                               grid: Tuple[int, int] = None,
+                               tile_width: int = None,
+                               image_format: str = 'jpg',
+                               quality: str = 'high',
                                progress_callback: Optional[Callable] = None) -> list:
         """
-        使用 MoviePy 提取视频帧
+        生成缩略图拼图：每 interval 秒取一帧，缩小后按 列×行 由 tile 滤镜拼成一张图，
+        同时写出 JSON 索引（{视频名}_sheets.json），记录每个格子对应的时间戳
+
+        Args:
+            video_path: 输入视频路径
+            output_dir: 输出目录
+            interval: 取帧间隔（秒）
+            grid: (列数, 行数)，默认 Settings.CONTACT_SHEET_GRID
+            tile_width: 单格宽度（像素），默认 Settings.CONTACT_SHEET_TILE_WIDTH
+            image_format: 输出图片格式
+            quality: 输出质量 ('high', 'medium', 'low')
+            progress_callback: 进度回调函数
+
+        Returns:
+            list: 输出的拼图文件路径列表
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        self._require_sequence_format(image_format, 'contact_sheet')
+
+        cols, rows = grid or self.settings.CONTACT_SHEET_GRID
+        tile_w, tile_h = self._output_size(video_path, (tile_width or self.settings.CONTACT_SHEET_TILE_WIDTH, -1))
+        duration = self.vutils.get_video_duration(video_path)
+        os.makedirs(output_dir, exist_ok=True)
+
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        output_pattern = os.path.join(output_dir, f"{video_name}_sheet_%04d.{image_format}")
+        cmd = [
+            'ffmpeg', '-an', '-sn', '-dn', '-i', video_path,
+            '-vf', f'fps=1/{interval},scale={tile_w}:{tile_h},tile={cols}x{rows}',
+            '-start_number', '0', '-y'
+        ]
+        cmd.extend(self._quality_args(image_format, quality))
+        cmd.append(output_pattern)
+
+        print(f"执行 FFmpeg 命令: {' '.join(cmd)}")
+        try:
+            self.runner.run(cmd, duration=duration, progress_callback=progress_callback)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"拼图生成失败: {e.stderr}")
+
+        sheets = self._collect_numbered(output_pattern, start=0)
+
+        # fps 滤镜输出的第 k 帧对应时间 k * interval（按就近取整，共约 duration/interval 帧）；
+        # 最后一张图可能只填了部分格子
+        per_sheet = cols * rows
+        total = max(1, int(duration / interval + 0.5)) if duration else len(sheets) * per_sheet
+        index = {
+            'source': os.path.abspath(video_path),
+            'interval': interval,
+            'grid': [cols, rows],
+            'tile_size': [tile_w, tile_h],
+            'sheets': []
+        }
+        for n, sheet in enumerate(sheets):
+            cells = []
+            for cell in range(per_sheet):
+                k = n * per_sheet + cell
+                if k >= total:
+                    break
+                cells.append({
+                    'row': cell // cols,
+                    'col': cell % cols,
+                    'index': k,
+                    'timestamp': round(k * interval, 3)
+                })
+            index['sheets'].append({'file': os.path.basename(sheet), 'cells': cells})
+
+        index_path = os.path.join(output_dir, f"{video_name}_sheets.json")
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+
+        print(f"共生成 {len(sheets)} 张拼图到: {output_dir}（索引: {index_path}）")
+        return sheets
+
+    def _prefer_sparse(self, video_path: str, interval: float) -> bool:
+        """间隔远大于平均 GOP 时，逐点 seek 比整段解码更省（GOP 由开头一段的包标志估计）"""
+        if self.keyframes is None:
+            return False
+        try:
+            mean_gop = self.keyframes.estimate_gop(video_path)
+        except (subprocess.CalledProcessError, OSError) as e:
+            print(f"无法估计 GOP，使用整段解码: {e}")
+            return False
+        return mean_gop > 0 and interval >= mean_gop * self.settings.SPARSE_SEEK_GOP_RATIO
+
+    # rawvideo 像素格式 -> 每像素字节数（均为 8 位分量）
+    RAW_PIX_FMTS = {'rgb24': 3, 'bgr24': 3, 'rgba': 4, 'bgra': 4, 'gray': 1}
+
+    def _output_size(self, video_path: str, size: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+        """计算解码输出尺寸；size 中某一边为 -1 时按源宽高比推算（取偶数）"""
+        src_w, src_h = self.vutils.get_video_resolution(video_path)
+        if not size:
+            return src_w, src_h
+        width, height = size
+        if (width <= 0 and height <= 0) or not src_w or not src_h:
+            return (width, height) if width > 0 and height > 0 else (src_w, src_h)
+        if height <= 0:
+            height = max(2, int(round(width * src_h / src_w / 2)) * 2)
+        elif width <= 0:
+            width = max(2, int(round(height * src_w / src_h / 2)) * 2)
+        return width, height
+
+    def _rawvideo_cmd(self,
+                      video_path: str,
+                      interval: Optional[float],
+                      size: Optional[Tuple[int, int]],
+                      pix_fmt: str) -> Tuple[List[str], int, int, int, float]:
+        """
+        构建输出 rawvideo 到 stdout 的 ffmpeg 命令
+
+        Returns:
+            Tuple: (命令, 宽, 高, 通道数, 相邻输出帧的时间间隔)
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        if pix_fmt not in self.RAW_PIX_FMTS:
+            raise ValueError(f"不支持的像素格式: {pix_fmt}，可选: {', '.join(self.RAW_PIX_FMTS)}")
+
+        channels = self.RAW_PIX_FMTS[pix_fmt]
+        width, height = self._output_size(video_path, size)
+        if width <= 0 or height <= 0:
+            raise RuntimeError(f"无法获取视频分辨率: {video_path}")
+        filters = []
+        if interval and interval > 0:
+            filters.append(f'fps=1/{interval}')
+            step = interval
+        else:
+            fields = self.vutils.probe_fields(video_path, ('fps',))
+            fps = (fields.fps if fields else 0) or 25.0
+            step = 1.0 / fps
+        if size:
+            filters.append(f'scale={width}:{height}')
+
+        cmd = ['ffmpeg', '-v', 'error', '-i', video_path, '-an', '-sn', '-dn']
+        if filters:
+            cmd.extend(['-vf', ','.join(filters)])
+        if not interval:
+            cmd.extend(['-vsync', 'passthrough'])
+        cmd.extend(['-f', 'rawvideo', '-pix_fmt', pix_fmt, 'pipe:1'])
+        return cmd, width, height, channels, step
+
+    def iter_frames(self,
+                    video_path: str,
+                    interval: Optional[float] = None,
+                    size: Optional[Tuple[int, int]] = None,
+                    pix_fmt: str = 'rgb24') -> Iterator[Tuple[float, 'np.ndarray']]:
+        """
+        流式读取视频帧为 numpy 数组（不落盘）
+
+        ffmpeg 以 rawvideo 输出到 stdout，逐帧读入同一块预分配缓冲区并返回其零拷贝视图。
+        注意：每次迭代都会覆盖上一帧的内容，需要保留时请自行 frame.copy()。
+
+        Args:
+            video_path: 输入视频路径
+            interval: 采样间隔（秒）；为 None 时输出全部帧
+            size: 输出尺寸 (宽, 高)，在解码端缩放；某一边为 -1 时按宽高比推算
+            pix_fmt: 像素格式，见 RAW_PIX_FMTS
+
+        Yields:
+            Tuple[float, np.ndarray]: (时间戳秒, 形状为 (高, 宽, 通道) 的 uint8 数组)；
+            时间戳按输出帧序号与帧率推算
+        """
+        if not HAS_NUMPY:
+            raise RuntimeError("numpy 未安装，无法使用 iter_frames。")
+        cmd, width, height, channels, step = self._rawvideo_cmd(video_path, interval, size, pix_fmt)
+
+        frame_bytes = width * height * channels
+        buffer = bytearray(frame_bytes)
+        view = memoryview(buffer)
+        frame = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, channels)
+
+        with self.runner.open_stream(cmd) as proc:
+            index = 0
+            while True:
+                filled = 0
+                while filled < frame_bytes:
+                    n = proc.stdout.readinto(view[filled:])
+                    if not n:
+                        break
+                    filled += n
+                if filled < frame_bytes:
+                    break
+                yield index * step, frame
+                index += 1
+
+    @staticmethod
+    def _resize_npy(path: str, shape: Tuple[int, ...]) -> None:
+        """
+        原地修改 .npy 的形状：改写头部中的 shape（头部总长不变，以空格补齐），并截断/扩展数据区
+
+        只支持 uint8、C 顺序的数组；新头部放不下时抛出 ValueError。
+        """
+        with open(path, 'r+b') as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                np.lib.format.read_array_header_1_0(f)
+            else:
+                np.lib.format.read_array_header_2_0(f)
+            data_offset = f.tell()
+            prefix = 10 if version == (1, 0) else 12
+            header = repr({'descr': '|u1', 'fortran_order': False, 'shape': tuple(shape)})
+            room = data_offset - prefix - 1
+            if len(header) > room:
+                raise ValueError(f".npy 头部空间不足，无法改写形状: {path}")
+            f.seek(prefix)
+            f.write((header + ' ' * (room - len(header)) + '\n').encode('latin1'))
+            f.truncate(data_offset + int(np.prod(shape, dtype=np.int64)))
+
+    def export_frames_npy(self,
+                          video_path: str,
+                          output_path: str = None,
+                          interval: float = 1.0,
+                          size: Optional[Tuple[int, int]] = None,
+                          pix_fmt: str = 'rgb24',
+                          progress_callback: Optional[Callable] = None) -> Tuple[str, str]:
+        """
+        把采样帧直接写入一个 .npy 张量文件（N×H×W×C，uint8），并写出时间戳旁车文件
+
+        按时长预分配 np.lib.format.open_memmap，ffmpeg rawvideo 管道的数据直接读入
+        每一帧对应的内存映射行，不生成中间图片。实际帧数与预估不同时只改写头部并截断/扩展文件，
+        不复制已写入的数据。读取方可用 np.load(path, mmap_mode='r')
+        即时打开，只有访问到的帧才会被换入内存。
+
+        Args:
+            video_path: 输入视频路径
+            output_path: 输出 .npy 路径，默认 OUTPUT_DIR/frames/{视频名}_frames.npy
+            interval: 采样间隔（秒）；为 None 时输出全部帧
+            size: 输出尺寸 (宽, 高)，某一边为 -1 时按宽高比推算
+            pix_fmt: 像素格式，见 RAW_PIX_FMTS
+            progress_callback: 进度回调函数
+
+        Returns:
+            Tuple[str, str]: (帧张量路径, 时间戳路径)；时间戳为 float64 秒，与帧一一对应
+        """
+        if not HAS_NUMPY:
+            raise RuntimeError("numpy 未安装，无法导出 .npy。")
+        cmd, width, height, channels, step = self._rawvideo_cmd(video_path, interval, size, pix_fmt)
+
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        if output_path is None:
+            output_path = os.path.join(self.settings.OUTPUT_DIR, 'frames', f"{video_name}_frames.npy")
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        stem = os.path.splitext(output_path)[0]
+        timestamps_path = f"{stem}_timestamps.npy"
+
+        # 预分配容量：fps 滤镜按就近取整输出约 duration/step 帧；实际帧数不同时原地改写头部
+        duration = self.vutils.get_video_duration(video_path)
+        capacity = max(1, int(duration / step + 0.5)) if duration else 1
+        tmp_path = f"{stem}.part.npy"
+        frames = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8,
+                                           shape=(capacity, height, width, channels))
+
+        frame_bytes = width * height * channels
+        count = 0
+        view = None
+        try:
+            with self.runner.open_stream(cmd) as proc:
+                while True:
+                    if count == capacity:
+                        # 超出预估（时长探测偏短）：容量翻倍，扩展文件并重新映射，已写入的帧不动
+                        capacity *= 2
+                        frames.flush()
+                        del frames
+                        self._resize_npy(tmp_path, (capacity, height, width, channels))
+                        frames = np.load(tmp_path, mmap_mode='r+')
+                    view = memoryview(frames[count]).cast('B')
+                    filled = 0
+                    while filled < frame_bytes:
+                        n = proc.stdout.readinto(view[filled:])
+                        if not n:
+                            break
+                        filled += n
+                    view.release()
+                    view = None
+                    if filled < frame_bytes:
+                        break
+                    count += 1
+                    if progress_callback and duration:
+                        progress_callback(min(99.0, count * step / duration * 100), f"已写入 {count} 帧")
+
+            # 释放映射后再改写头部/重命名（Windows 下映射中的文件不能被替换或截断）
+            frames.flush()
+            del frames
+            if count != capacity:
+                self._resize_npy(tmp_path, (count, height, width, channels))
+            os.replace(tmp_path, output_path)
+        finally:
+            if view is not None:
+                view.release()
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+        np.save(timestamps_path, np.arange(count, dtype=np.float64) * step)
+        if progress_callback:
+            progress_callback(100.0, f"导出完成: {count} 帧")
+        print(f"共导出 {count} 帧 ({height}×{width}×{channels}) 到: {output_path}")
+        return output_path, timestamps_path
+
+    def extract_frames_moviepy(self,
+                               video_path: str,
+                               output_dir: str,
+                               interval: float = 1.0,
+                               image_format: str = 'png',
+                               progress_callback: Optional[Callable] = None,
+                               quality: str = 'high') -> list:
+        """
+        使用 MoviePy 提取视频帧（单次顺序解码，图片编码在线程池中与解码并行）
 
         Args:
             video_path: 输入视频路径
@@ -102,6 +1013,9 @@ class FrameExtractor:
         """
         if not HAS_MOVIEPY:
             raise RuntimeError("MoviePy 未安装，无法使用 MoviePy 方法。请安装 moviepy 包。")
+        if image_format.lower() in self.SINGLE_FRAME_FORMATS:
+            # 依赖的 Pillow 版本没有 AVIF 编码器，逐帧保存会全部失败
+            raise ValueError(f"MoviePy 方法不支持 {image_format} 输出，请改用 'sparse' 方法")
 
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"视频文件不存在: {video_path}")
@@ -113,36 +1027,58 @@ class FrameExtractor:
         with VideoFileClip(video_path) as clip:
             duration = clip.duration
             timestamps = [i * interval for i in range(int(duration // interval) + 1) if i * interval < duration]
+            half_frame = 0.5 / (clip.fps or 25.0)
 
             extracted_files = []
             total_frames = len(timestamps)
+            done = [0]
+            lock = threading.Lock()
+            # 限制排队中的帧数，避免解码快于编码时占用过多内存
+            workers = max(1, self.settings.FRAME_ENCODE_WORKERS)
+            slots = threading.BoundedSemaphore(workers * 2)
 
             print(f"开始使用 MoviePy 提取帧: {video_path}")
             print(f"视频时长: {duration:.2f}秒, 将提取 {total_frames} 帧")
 
-            for i, timestamp in enumerate(timestamps):
-                try:
-                    frame = clip.get_frame(timestamp)
-                    output_filename = f"{video_name}_frame_{i:04d}_t{timestamp:.1f}s.{image_format}"
-                    output_path = os.path.join(output_dir, output_filename)
-
-                    # 使用 Pillow 保存 (MoviePy 的 frame 是 numpy 数组)
-                    from PIL import Image
-                    img = Image.fromarray(frame)
-                    img.save(output_path)
-
-                    extracted_files.append(output_path)
-                    print(f"提取帧: {output_filename}")
+            save_kwargs = {}
+            if image_format.lower() in ('jpg', 'jpeg', 'webp'):
+                save_kwargs['quality'] = self.PIL_QUALITY.get(quality, 90)
 
-                    # 进度回调
+            def save(frame, output_path, timestamp):
+                try:
+                    Image.fromarray(frame).save(output_path, **save_kwargs)
+                    with lock:
+                        extracted_files.append(output_path)
+                        done[0] += 1
+                        count = done[0]
+                    print(f"提取帧: {os.path.basename(output_path)}")
                     if progress_callback:
-                        progress = (i + 1) / total_frames * 100
-                        progress_callback(progress, f"已提取 {i + 1}/{total_frames} 帧")
-
+                        progress_callback(count / total_frames * 100, f"已提取 {count}/{total_frames} 帧")
                 except Exception as e:
                     print(f"提取帧失败 (时间: {timestamp:.1f}s): {e}")
-                    continue
+                finally:
+                    slots.release()
+
+            # 单次顺序解码：每个目标时间点取距离最近的一帧，图片编码交给线程池
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                k = 0
+                frame = None
+                for t, frame in clip.iter_frames(with_times=True, dtype='uint8'):
+                    while k < total_frames and timestamps[k] < t + half_frame:
+                        output_filename = f"{video_name}_frame_{k:04d}_t{timestamps[k]:.1f}s.{image_format}"
+                        slots.acquire()
+                        executor.submit(save, frame, os.path.join(output_dir, output_filename), timestamps[k])
+                        k += 1
+                    if k >= total_frames:
+                        break
+                # 末尾时间点超出最后一帧时使用最后一帧（与 get_frame 的行为一致）
+                while frame is not None and k < total_frames:
+                    output_filename = f"{video_name}_frame_{k:04d}_t{timestamps[k]:.1f}s.{image_format}"
+                    slots.acquire()
+                    executor.submit(save, frame, os.path.join(output_dir, output_filename), timestamps[k])
+                    k += 1
 
+            extracted_files.sort()
             print(f"MoviePy 提取完成! 共提取 {len(extracted_files)} 帧到: {output_dir}")
             return extracted_files
 
@@ -153,34 +1089,105 @@ class FrameExtractor:
                        image_format: str = 'png',
                        method: str = 'auto',
                        quality: str = 'high',
-                       progress_callback: Optional[Callable] = None) -> list:
+                       progress_callback: Optional[Callable] = None,
+                       resume: bool = True) -> list:
         """
-        统一的视频抽帧接口（支持 'auto' | 'ffmpeg' | 'moviepy'）
+        统一的视频抽帧接口（支持 'auto' | 'ffmpeg' | 'moviepy' | 'keyframes' | 'sparse' | 'scene' | 'sharded'
+        | 'contact_sheet'）
+
+        'keyframes' 只解码关键帧，每个 interval 取一个关键帧，速度快但时间点为近似值。
+        'sparse' 对每个时间点做输入端 seek，只解码所在 GOP；'auto' 在间隔远大于 GOP 时自动选用。
+        'scene' 每个镜头取一帧并按感知哈希去重（忽略 interval）。
+        'sharded' 把时间轴分片后多进程并行解码，适合长视频。
+        'contact_sheet' 把抽出的帧缩小后按 Settings.CONTACT_SHEET_GRID 拼成缩略图，并写出时间戳索引。
+        image_format 支持 png/jpg/webp/avif，quality 控制有损格式的压缩档位；
+        image_format='npy' 时不输出图片，而是导出单个帧张量文件（见 export_frames_npy），
+        返回 [帧张量路径, 时间戳路径]。
+
+        输出目录中记录任务清单（源文件身份、方法、间隔、格式、质量及输出列表）：
+        resume=True 且参数一致时，已完成的任务直接返回清单中的文件列表，不再解码也不扫描目录；
+        中断的 'sparse' 任务只补齐缺少的帧。
         """
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
         if output_dir is None:
-            video_name = os.path.splitext(os.path.basename(video_path))[0]
             output_dir = os.path.join(self.settings.OUTPUT_DIR, 'frames', video_name)
 
-        # 自动选择最佳方法
+        if image_format.lower() == 'npy':
+            return list(self.export_frames_npy(video_path, os.path.join(output_dir, f"{video_name}_frames.npy"),
+                                               interval, progress_callback=progress_callback))
+
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        # 清单按调用方请求的方法（含 'auto'）记录
+        manifest = JobManifest(output_dir, f"{video_name}_frames", {
+            'source': JobManifest.source_identity(video_path),
+            'method': method,
+            'interval': interval,
+            'format': image_format,
+            'quality': quality
+        }, resume=resume)
+        if manifest.is_complete():
+            files = manifest.completed()
+            if len(files) == len(manifest.data['items']):
+                print(f"清单显示已完成，跳过抽帧: {len(files)} 帧 ({output_dir})")
+                if progress_callback:
+                    progress_callback(100.0, f"已完成（清单）: {len(files)} 帧")
+                return files
+            print("清单中的部分输出已丢失，重新抽帧")
+
+        # 清单未完成时才选择方法，重跑已完成的任务不做 GOP 探测
         if method == 'auto':
-            # 优先级: ffmpeg > moviepy
-            method = 'ffmpeg'
+            # 优先级: sparse（大间隔） > ffmpeg > moviepy
+            method = 'sparse' if self._prefer_sparse(video_path, interval) else 'ffmpeg'
             if not HAS_MOVIEPY:
                 print("提示: MoviePy 未安装，将使用 FFmpeg 方法")
+        if image_format.lower() in self.SINGLE_FRAME_FORMATS and method in ('ffmpeg', 'sharded', 'moviepy'):
+            # 按间隔抽帧的逐帧格式输出改由逐点 seek 完成（每帧一个 -frames:v 1 输出）；
+            # MoviePy 经 Pillow 保存，依赖的 Pillow 版本不能写 AVIF
+            print(f"提示: {image_format} 只能逐帧写出，{method} 方法改为 sparse")
+            method = 'sparse'
+
+        if method == 'sparse':
+            return self.extract_frames_sparse(video_path, output_dir, interval, image_format, quality,
+                                              progress_callback, manifest=manifest)
+        files = self._dispatch_extract(video_path, output_dir, interval, image_format, method, quality,
+                                       progress_callback)
+        manifest.record({os.path.basename(path): path for path in files}, complete=True)
+        return files
 
-        # 根据方法调用对应函数
+    def _dispatch_extract(self,
+                          video_path: str,
+                          output_dir: str,
+                          interval: float,
+                          image_format: str,
+                          method: str,
+                          quality: str,
+                          progress_callback: Optional[Callable]) -> list:
+        """按方法名调用对应的抽帧实现"""
+        if method == 'keyframes':
+            return self.extract_frames_keyframes(video_path, output_dir, interval, image_format, quality, progress_callback)
+        if method == 'scene':
+            return self.extract_frames_scene(video_path, output_dir, image_format=image_format, quality=quality,
+                                             progress_callback=progress_callback)
+        if method == 'contact_sheet':
+            return self.extract_contact_sheets(video_path, output_dir, interval, image_format=image_format,
+                                               quality=quality, progress_callback=progress_callback)
+        if method == 'sharded':
+            return self.extract_frames_sharded(video_path, output_dir, interval, image_format, quality, progress_callback)
+        if method == 'sparse':
+            return self.extract_frames_sparse(video_path, output_dir, interval, image_format, quality, progress_callback)
         if method == 'ffmpeg':
-            return self.extract_frames_ffmpeg(video_path, output_dir, interval, image_format, quality)
+            return self.extract_frames_ffmpeg(video_path, output_dir, interval, image_format, quality, progress_callback)
         elif method == 'moviepy' and HAS_MOVIEPY:
-            return self.extract_frames_moviepy(video_path, output_dir, interval, image_format, progress_callback)
+            return self.extract_frames_moviepy(video_path, output_dir, interval, image_format, progress_callback, quality)
         else:
             # 回退到可用的方法
             if HAS_MOVIEPY:
                 print(f"提示: {method} 方法不可用，回退到 MoviePy 方法")
-                return self.extract_frames_moviepy(video_path, output_dir, interval, image_format, progress_callback)
+                return self.extract_frames_moviepy(video_path, output_dir, interval, image_format, progress_callback, quality)
             else:
                 print(f"提示: {method} 方法不可用，回退到 FFmpeg 方法")
-                return self.extract_frames_ffmpeg(video_path, output_dir, interval, image_format, quality)
+                return self.extract_frames_ffmpeg(video_path, output_dir, interval, image_format, quality, progress_callback)
 
 
 # 命令行测试
@@ -8,6 +8,9 @@ import random
 from typing import List, Tuple, Optional, Callable
 from moviepy.editor import VideoFileClip, clips_array, CompositeVideoClip
 from config.settings import Settings
+from utils.video_utils import VideoUtils
+from utils.ffmpeg_runner import FFmpegRunner, FFmpegCancelled
+from utils.job_manifest import JobManifest
 
 
 class GridComposer:
@@ -15,6 +18,8 @@ class GridComposer:
     
     def __init__(self):
         self.settings = Settings()
+        self.vutils = VideoUtils()
+        self.runner = FFmpegRunner()
     
     def _get_grid_dimensions(self, layout: str) -> Tuple[int, int]:
         """
@@ -60,13 +65,7 @@ class GridComposer:
             return video_paths[:grid_size]
         elif selection_method == 'duration':
             # 按时长选择（选择时长相近的视频）
-            video_durations = []
-            for path in video_paths:
-                try:
-                    with VideoFileClip(path) as clip:
-                        video_durations.append((path, clip.duration))
-                except:
-                    video_durations.append((path, 0))
+            video_durations = [(path, self.vutils.get_video_duration(path)) for path in video_paths]
             
             # 按时长排序
             video_durations.sort(key=lambda x: x[1])
@@ -236,7 +235,8 @@ class GridComposer:
                           layout: str = '2×2',
                           output_path: str = None,
                           duration: float = None,
-                          selection_method: str = 'random') -> str:
+                          selection_method: str = 'random',
+                          progress_callback: Optional[Callable] = None) -> str:
         """
         使用FFmpeg创建宫格视频 (更高效)
         
@@ -246,6 +246,7 @@ class GridComposer:
             output_path: 输出文件路径
             duration: 输出视频时长
             selection_method: 视频选择方法
+            progress_callback: 进度回调函数
             
         Returns:
             str: 输出文件路径
@@ -328,8 +329,11 @@ class GridComposer:
         
         print(f"执行FFmpeg宫格命令: {' '.join(cmd[:10])}...")
         
+        # xstack 默认以最长输入为准
+        expected_duration = duration or max(self.vutils.get_video_duration(v) for v in selected_videos)
+        
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            self.runner.run(cmd, duration=expected_duration, progress_callback=progress_callback)
             print(f"FFmpeg宫格视频创建成功: {output_path}")
             return output_path
             
@@ -365,7 +369,7 @@ class GridComposer:
         """
         if method == 'ffmpeg':
             return self.create_grid_ffmpeg(
-                video_paths, layout, output_path, duration, selection_method
+                video_paths, layout, output_path, duration, selection_method, progress_callback
             )
         else:  # moviepy
             return self.create_grid_moviepy(
@@ -378,16 +382,20 @@ class GridComposer:
                           layouts: List[str] = ['2×2', '3×1', '2×3'],
                           output_dir: str = None,
                           num_variations: int = 3,
-                          progress_callback: Optional[Callable] = None) -> List[str]:
+                          progress_callback: Optional[Callable] = None,
+                          resume: bool = True) -> List[str]:
         """
         批量创建多种宫格布局的视频
         
+        输出目录中维护任务清单，中断后以相同参数重跑会跳过已完成的变体。
+        
         Args:
             video_paths: 输入视频路径列表
             layouts: 要创建的布局列表
             output_dir: 输出目录
             num_variations: 每种布局创建的变体数量
             progress_callback: 进度回调函数
+            resume: 是否按任务清单跳过已完成的变体
             
         Returns:
             List[str]: 输出文件路径列表
@@ -401,19 +409,35 @@ class GridComposer:
         total_tasks = len(layouts) * num_variations
         completed = 0
         
+        manifest = JobManifest(output_dir, 'batch_grids', {
+            'sources': [JobManifest.source_identity(p) for p in video_paths],
+            'layouts': list(layouts),
+            'num_variations': num_variations
+        }, resume=resume)
+        manifest.plan({
+            f"grid_{layout}_v{variation + 1}.mp4": os.path.join(output_dir, f"grid_{layout}_v{variation + 1}.mp4")
+            for layout in layouts for variation in range(num_variations)
+        })
+        
         for layout in layouts:
             for variation in range(num_variations):
+                output_filename = f"grid_{layout}_v{variation + 1}.mp4"
+                output_path = os.path.join(output_dir, output_filename)
+                if manifest.is_done(output_filename):
+                    output_files.append(output_path)
+                    completed += 1
+                    print(f"跳过已完成: {output_filename}")
+                    continue
+                tmp_path = JobManifest.temp_path(output_path)
                 try:
-                    output_filename = f"grid_{layout}_v{variation + 1}.mp4"
-                    output_path = os.path.join(output_dir, output_filename)
-                    
-                    result = self.create_grid_video(
+                    self.create_grid_video(
                         video_paths=video_paths,
                         layout=layout,
-                        output_path=output_path,
+                        output_path=tmp_path,
                         selection_method='random'  # 每个变体随机选择
                     )
                     
+                    result = manifest.commit(output_filename, tmp_path, output_path)
                     output_files.append(result)
                     completed += 1
                     
@@ -421,10 +445,16 @@ class GridComposer:
                         progress = (completed / total_tasks) * 100
                         progress_callback(progress, f"完成 {layout} 变体 {variation + 1}")
                     
+                except FFmpegCancelled:
+                    JobManifest.discard_temp(tmp_path)
+                    manifest.flush()
+                    raise
                 except Exception as e:
+                    JobManifest.discard_temp(tmp_path)
                     print(f"创建宫格失败 [{layout} 变体 {variation + 1}]: {e}")
                     continue
         
+        manifest.flush()
         print(f"批量创建宫格视频完成! 共生成 {len(output_files)} 个文件到: {output_dir}")
         return output_files
 
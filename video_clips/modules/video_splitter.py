@@ -3,33 +3,240 @@
 将长视频切割为5-10秒的短片段，支持自定义时长和切割策略
 """
 import os
+import json
+import math
 import subprocess
-from typing import List, Optional, Callable
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Callable, Tuple
 from moviepy.editor import VideoFileClip
 from config.settings import Settings
+from utils.video_utils import VideoUtils
+from utils.ffmpeg_runner import FFmpegRunner, FFmpegCancelled
+from utils.keyframe_index import get_keyframe_index
+from utils.scene_detector import get_scene_detector
+from utils.audio_envelope import get_audio_envelope
+from utils.job_manifest import JobManifest
+
+
+class _CpuTokens:
+    """进程内共享的编码线程预算：同时切割多个文件时，所有并行编码共用同一组令牌"""
+    
+    def __init__(self, total: int):
+        self.total = max(1, total)
+        self._free = self.total
+        self._cond = threading.Condition()
+    
+    def acquire(self, count: int, stop: threading.Event = None) -> int:
+        """
+        等待并取得 count 个令牌（超过总数时按总数取）
+        
+        Returns:
+            int: 实际取得的令牌数；stop 被设置时抛出 FFmpegCancelled
+        """
+        count = max(1, min(count, self.total))
+        with self._cond:
+            while self._free < count:
+                if stop is not None and stop.is_set():
+                    raise FFmpegCancelled("编码任务已取消")
+                self._cond.wait(0.2)
+            self._free -= count
+        return count
+    
+    def release(self, count: int) -> None:
+        with self._cond:
+            self._free += count
+            self._cond.notify_all()
+
+
+_ENCODE_TOKENS = _CpuTokens(Settings.ENCODE_CPU_BUDGET)
 
 
 class VideoSplitter:
     """视频切割器"""
     
+    # ffprobe profile 名（小写）-> 编码器 profile 名；不在表中的 profile 不指定（由编码器自选）
+    _SMART_CUT_PROFILES = {
+        'h264': {
+            'baseline': 'baseline',
+            'constrained baseline': 'baseline',
+            'main': 'main',
+            'high': 'high',
+            'high 10': 'high10',
+            'high 4:2:2': 'high422',
+            'high 4:4:4 predictive': 'high444',
+        },
+        'hevc': {
+            'main': 'main',
+            'main 10': 'main10',
+            'main still picture': 'mainstillpicture',
+        },
+    }
+    
+    # 参数集随码流传输（in-band）的 MP4 编码标签：拼接的各部分 SPS/PPS 可以不同
+    _SMART_CUT_INBAND_TAGS = {'h264': 'avc3', 'hevc': 'hev1'}
+    
+    # 切割方法 -> 渲染后端
+    _PLAN_BACKENDS = {
+        'ffmpeg': 'copy',
+        'segment': 'copy',
+        'smart': 'smart',
+        'equal': 'reencode',
+        'random': 'reencode',
+        'random_single': 'reencode',
+        'scene': 'reencode',
+        'silence': 'reencode',
+    }
+    
     def __init__(self):
         self.settings = Settings()
+        self.vutils = VideoUtils()
+        self.runner = FFmpegRunner()
+        self.keyframes = get_keyframe_index()
+        self.scenes = get_scene_detector()
+        self.envelope = get_audio_envelope()
+    
+    def _plan_equal_segments(self,
+                             total_duration: float,
+                             segment_duration: float,
+                             overlap: float) -> List[Tuple[float, float, int]]:
+        """计算等时长切割区间（剩余过短时并入上一段）"""
+        step = segment_duration - overlap  # 实际步长
+        segments = []
+        start_time = 0
+        segment_index = 0
+        
+        while start_time < total_duration:
+            end_time = min(start_time + segment_duration, total_duration)
+            
+            # 如果剩余时间太短，合并到上一段
+            if total_duration - start_time < segment_duration * 0.3:
+                if segments:  # 如果已有片段，扩展最后一个片段
+                    segments[-1] = (segments[-1][0], total_duration, segments[-1][2])
+                    break
+            
+            segments.append((start_time, end_time, segment_index))
+            start_time += step
+            segment_index += 1
+        return segments
+    
+    def _encode_segments_parallel(self,
+                                  video_path: str,
+                                  jobs: List[Tuple[float, float, str]],
+                                  workers: int,
+                                  progress_callback: Optional[Callable] = None,
+                                  manifest: Optional[JobManifest] = None) -> List[str]:
+        """
+        并行重编码片段：每个片段由独立的 ffmpeg 进程编码，总线程数受 CPU 预算约束
+        
+        编码线程从进程内共享的令牌池中领取，多个文件同时切割时合计仍不超过
+        Settings.ENCODE_CPU_BUDGET。
+        
+        Args:
+            video_path: 输入视频路径
+            jobs: [(开始, 结束, 输出路径)]
+            workers: 同时运行的 ffmpeg 进程数
+            progress_callback: 进度回调函数
+            manifest: 任务清单；清单中已完成的片段直接跳过，新完成的片段记入清单
+            
+        Returns:
+            List[str]: 成功的输出路径，按 jobs 顺序排列
+        """
+        budget = max(1, self.settings.ENCODE_CPU_BUDGET)
+        workers = max(1, min(workers, budget, len(jobs)))
+        threads = max(1, budget // workers)
+        # 独立运行器：出错时只终止本批次的进程
+        runner = FFmpegRunner()
+        stop = threading.Event()
+        
+        def encode(job):
+            start, end, output_path = job
+            # 先写临时文件，完成后再重命名，中断时不会留下残缺的片段
+            tmp_path = JobManifest.temp_path(output_path)
+            cmd = [
+                'ffmpeg', '-y', '-ss', str(start), '-i', video_path,
+                '-t', str(end - start),
+                '-c:v', self.settings.VIDEO_CODEC, '-c:a', self.settings.AUDIO_CODEC,
+                '-threads', str(threads),
+                tmp_path
+            ]
+            tokens = _ENCODE_TOKENS.acquire(threads, stop)
+            try:
+                if stop.is_set():
+                    raise FFmpegCancelled("编码任务已取消")
+                runner.run(cmd)
+            except BaseException:
+                JobManifest.discard_temp(tmp_path)
+                raise
+            finally:
+                _ENCODE_TOKENS.release(tokens)
+            if manifest is not None:
+                return manifest.commit(os.path.basename(output_path), tmp_path, output_path)
+            os.replace(tmp_path, output_path)
+            return output_path
+        
+        results = [None] * len(jobs)
+        pending = []
+        for i, (_, _, output_path) in enumerate(jobs):
+            if manifest is not None and manifest.is_done(os.path.basename(output_path)):
+                results[i] = output_path
+            else:
+                pending.append(i)
+        done = len(jobs) - len(pending)
+        if done:
+            print(f"跳过已完成的 {done} 个片段")
+        
+        print(f"并行编码 {len(pending)} 个片段: {workers} 个进程 × {threads} 线程")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(encode, jobs[i]): i for i in pending}
+            try:
+                for future in as_completed(futures):
+                    i = futures[future]
+                    start, end, output_path = jobs[i]
+                    try:
+                        results[i] = future.result()
+                        print(f"切割完成: {os.path.basename(output_path)} ({end-start:.1f}s)")
+                    except subprocess.CalledProcessError as e:
+                        print(f"切割片段失败 [{start:.1f}s-{end:.1f}s]: {e.stderr}")
+                    done += 1
+                    if progress_callback:
+                        progress = done / len(jobs) * 100
+                        progress_callback(progress, f"已切割 {done}/{len(jobs)} 个片段")
+            except BaseException:
+                # 取消/异常时不再启动排队中的片段，并终止正在编码的进程
+                stop.set()
+                for future in futures:
+                    future.cancel()
+                runner.cancel()
+                raise
+            finally:
+                if manifest is not None:
+                    manifest.flush()
+        
+        return [path for path in results if path is not None]
     
     def split_video_equal(self,
                          video_path: str,
                          segment_duration: float = 8.0,
                          output_dir: str = None,
                          overlap: float = 0.0,
-                         progress_callback: Optional[Callable] = None) -> List[str]:
+                         progress_callback: Optional[Callable] = None,
+                         workers: int = 1,
+                         resume: bool = True) -> List[str]:
         """
         等时长切割视频
         
+        输出目录中维护任务清单，中断后以相同参数重跑会跳过已完成的片段。
+        
         Args:
             video_path: 输入视频路径
             segment_duration: 每段时长（秒）
             output_dir: 输出目录
             overlap: 片段重叠时间（秒）
             progress_callback: 进度回调函数
+            workers: 并行编码进程数；大于 1 时每个片段由独立 ffmpeg 进程重编码
+            resume: 是否按任务清单跳过已完成的片段
             
         Returns:
             List[str]: 输出的视频片段路径列表
@@ -46,6 +253,28 @@ class VideoSplitter:
         
         video_name = os.path.splitext(os.path.basename(video_path))[0]
         output_files = []
+        manifest = JobManifest(output_dir, f"{video_name}_equal", {
+            'source': JobManifest.source_identity(video_path),
+            'segment_duration': segment_duration,
+            'overlap': overlap,
+            'video_codec': self.settings.VIDEO_CODEC,
+            'audio_codec': self.settings.AUDIO_CODEC
+        }, resume=resume)
+        
+        if workers > 1:
+            total_duration = self.vutils.get_video_duration(video_path)
+            print(f"开始并行切割视频: {video_path}")
+            print(f"总时长: {total_duration:.2f}秒, 切割时长: {segment_duration}秒")
+            segments = self._plan_equal_segments(total_duration, segment_duration, overlap)
+            print(f"计划切割 {len(segments)} 个片段")
+            jobs = [
+                (start, end, os.path.join(output_dir, f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"))
+                for start, end, idx in segments
+            ]
+            manifest.plan({os.path.basename(path): path for _, _, path in jobs})
+            output_files = self._encode_segments_parallel(video_path, jobs, workers, progress_callback, manifest)
+            print(f"视频切割完成! 共生成 {len(output_files)} 个片段到: {output_dir}")
+            return output_files
         
         with VideoFileClip(video_path) as clip:
             total_duration = clip.duration
@@ -53,36 +282,29 @@ class VideoSplitter:
             print(f"总时长: {total_duration:.2f}秒, 切割时长: {segment_duration}秒")
             
             # 计算切割点
-            step = segment_duration - overlap  # 实际步长
-            segments = []
-            start_time = 0
-            segment_index = 0
-            
-            while start_time < total_duration:
-                end_time = min(start_time + segment_duration, total_duration)
-                
-                # 如果剩余时间太短，合并到上一段
-                if total_duration - start_time < segment_duration * 0.3:
-                    if segments:  # 如果已有片段，扩展最后一个片段
-                        segments[-1] = (segments[-1][0], total_duration, segments[-1][2])
-                        break
-                
-                segments.append((start_time, end_time, segment_index))
-                start_time += step
-                segment_index += 1
+            segments = self._plan_equal_segments(total_duration, segment_duration, overlap)
             
             print(f"计划切割 {len(segments)} 个片段")
+            manifest.plan({
+                f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4":
+                    os.path.join(output_dir, f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4")
+                for start, end, idx in segments
+            })
             
             # 执行切割
             for i, (start, end, idx) in enumerate(segments):
+                output_filename = f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"
+                output_path = os.path.join(output_dir, output_filename)
+                tmp_path = JobManifest.temp_path(output_path)
+                if manifest.is_done(output_filename):
+                    output_files.append(output_path)
+                    print(f"跳过已完成: {output_filename}")
+                    continue
                 try:
-                    output_filename = f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"
-                    output_path = os.path.join(output_dir, output_filename)
-                    
-                    # 切割片段
+                    # 切割片段（先写临时文件）
                     segment_clip = clip.subclip(start, end)
                     segment_clip.write_videofile(
-                        output_path,
+                        tmp_path,
                         codec=self.settings.VIDEO_CODEC,
                         audio_codec=self.settings.AUDIO_CODEC,
                         verbose=False,
@@ -90,6 +312,7 @@ class VideoSplitter:
                     )
                     segment_clip.close()
                     
+                    manifest.commit(output_filename, tmp_path, output_path)
                     output_files.append(output_path)
                     print(f"切割完成: {output_filename} ({end-start:.1f}s)")
                     
@@ -98,44 +321,93 @@ class VideoSplitter:
                         progress = (i + 1) / len(segments) * 100
                         progress_callback(progress, f"已切割 {i + 1}/{len(segments)} 个片段")
                         
+                except FFmpegCancelled:
+                    JobManifest.discard_temp(tmp_path)
+                    manifest.flush()
+                    raise
                 except Exception as e:
                     print(f"切割片段失败 [{start:.1f}s-{end:.1f}s]: {e}")
                     # 回退方案：使用 FFmpeg 无重编码拷贝切割该片段
                     try:
-                        ff_output_filename = f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"
-                        ff_output_path = os.path.join(output_dir, ff_output_filename)
+                        ff_output_filename = output_filename
+                        ff_output_path = output_path
                         cmd = [
                             'ffmpeg', '-y',
                             '-ss', str(start), '-to', str(end),
                             '-i', video_path,
-                            '-c', 'copy', ff_output_path
+                            '-c', 'copy', tmp_path
                         ]
                         print(f"回退FFmpeg切割: {' '.join(cmd)}")
-                        subprocess.run(cmd, capture_output=True, text=True, check=True)
+                        self.runner.run(cmd)
+                        manifest.commit(ff_output_filename, tmp_path, ff_output_path)
                         output_files.append(ff_output_path)
                         print(f"回退切割成功: {ff_output_filename} ({end-start:.1f}s)")
                         if progress_callback:
                             progress = (i + 1) / len(segments) * 100
                             progress_callback(progress, f"(回退FFmpeg) 已切割 {i + 1}/{len(segments)} 个片段")
                     except subprocess.CalledProcessError as ee:
+                        JobManifest.discard_temp(tmp_path)
                         print(f"回退FFmpeg切割失败 [{start:.1f}s-{end:.1f}s]: {ee.stderr}")
                         continue
+                    except FFmpegCancelled:
+                        JobManifest.discard_temp(tmp_path)
+                        manifest.flush()
+                        raise
         
+        manifest.flush()
         print(f"视频切割完成! 共生成 {len(output_files)} 个片段到: {output_dir}")
         return output_files
     
+    def _plan_copy_segments(self,
+                            video_path: str,
+                            segment_duration: float,
+                            overlap: float,
+                            snap_to_keyframes: bool) -> Tuple[List[Tuple[float, float, int]], bool]:
+        """
+        计算无重编码切割的片段区间（支持重叠，可对齐关键帧）
+        
+        Returns:
+            Tuple[List[Tuple[float, float, int]], bool]: ([(开始, 结束, 序号)], 是否已对齐关键帧)
+        """
+        total_duration = self.vutils.get_video_duration(video_path)
+        step = segment_duration - overlap if segment_duration > overlap else segment_duration
+        ranges = []
+        start_time = 0
+        while start_time < total_duration:
+            end_time = min(start_time + segment_duration, total_duration)
+            # 如果最后一个片段长度不足 segment_duration 的 80%，则不切割
+            if end_time - start_time < segment_duration * 0.8:
+                break
+            ranges.append((start_time, end_time))
+            start_time += step
+        
+        # 切点对齐关键帧：拷贝模式下片段从关键帧开始，输入端 seek 可直接定位
+        snapped = False
+        if snap_to_keyframes and ranges:
+            try:
+                ranges = self.keyframes.snap_ranges(video_path, ranges, total_duration)
+                snapped = True
+            except subprocess.CalledProcessError as e:
+                print(f"关键帧索引构建失败，使用原始切点: {e.stderr}")
+        return [(start, end, idx) for idx, (start, end) in enumerate(ranges)], snapped
+    
     def split_video_ffmpeg(self,
                           video_path: str,
                           segment_duration: float = 8.0,
                           overlap: float = 0.0,
-                          output_dir: str = None) -> List[str]:
+                          output_dir: str = None,
+                          progress_callback: Optional[Callable] = None,
+                          snap_to_keyframes: bool = True) -> List[str]:
         """
         使用FFmpeg进行高效切割 (无重编码)
         
         Args:
             video_path: 输入视频路径
             segment_duration: 每段时长（秒）
+            overlap: 片段重叠时间（秒）
             output_dir: 输出目录
+            progress_callback: 进度回调函数
+            snap_to_keyframes: 是否将切点对齐到最近的关键帧（避免片段开头定格/花屏）
             
         Returns:
             List[str]: 输出的视频片段路径列表
@@ -151,53 +423,742 @@ class VideoSplitter:
         os.makedirs(output_dir, exist_ok=True)
         
         video_name = os.path.splitext(os.path.basename(video_path))[0]
-        output_pattern = os.path.join(output_dir, f"{video_name}_segment_%03d.mp4")
-        
-        # 计算切割区间，支持重叠
-        import math
-        from moviepy.editor import VideoFileClip
-        with VideoFileClip(video_path) as clip:
-            total_duration = clip.duration
-        step = segment_duration - overlap if segment_duration > overlap else segment_duration
-        segments = []
-        start_time = 0
-        idx = 0
-        while start_time < total_duration:
-            end_time = min(start_time + segment_duration, total_duration)
-            # 如果最后一个片段长度不足 segment_duration 的 80%，则不切割
-            if end_time - start_time < segment_duration * 0.8:
-                break
-            segments.append((start_time, end_time, idx))
-            start_time += step
-            idx += 1
+        segments, snapped = self._plan_copy_segments(video_path, segment_duration, overlap, snap_to_keyframes)
+        jobs = [
+            (start, end, os.path.join(output_dir, f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"))
+            for start, end, idx in segments
+        ]
+        output_files = self._copy_segments(video_path, jobs, snapped, progress_callback)
+        print(f"视频切割完成! 共生成 {len(output_files)} 个片段到: {output_dir}")
+        return output_files
+    
+    def _copy_segments(self,
+                       video_path: str,
+                       jobs: List[Tuple[float, float, str]],
+                       snapped: bool,
+                       progress_callback: Optional[Callable] = None) -> List[str]:
+        """逐段无重编码拷贝；snapped 为 True 时切点已在关键帧上，可用输入端 seek"""
         output_files = []
-        for start, end, idx in segments:
-            output_filename = f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"
-            output_path = os.path.join(output_dir, output_filename)
+        for i, (start, end, output_path) in enumerate(jobs):
+            output_filename = os.path.basename(output_path)
             # 构建FFmpeg命令，精确区间切割
-            cmd = [
-                'ffmpeg', '-y', '-i', video_path,
-                '-ss', str(start), '-to', str(end),
-                '-c', 'copy', output_path
-            ]
+            if snapped:
+                cmd = [
+                    'ffmpeg', '-y', '-ss', str(start), '-i', video_path,
+                    '-t', str(end - start), '-c', 'copy',
+                    '-avoid_negative_ts', 'make_zero', output_path
+                ]
+            else:
+                cmd = [
+                    'ffmpeg', '-y', '-i', video_path,
+                    '-ss', str(start), '-to', str(end),
+                    '-c', 'copy', output_path
+                ]
             print(f"执行FFmpeg切割: {' '.join(cmd)}")
+            # 单段进度映射到整体进度
+            segment_progress = None
+            if progress_callback:
+                def segment_progress(percent, message, i=i):
+                    overall = (i + percent / 100) / len(jobs) * 100
+                    progress_callback(overall, f"切割 {i + 1}/{len(jobs)} {message}")
             try:
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+                self.runner.run(cmd, duration=end - start, progress_callback=segment_progress)
                 output_files.append(output_path)
                 print(f"切割完成: {output_filename} ({end-start:.1f}s)")
             except subprocess.CalledProcessError as e:
                 print(f"切割片段失败 [{start:.1f}s-{end:.1f}s]: {e.stderr}")
                 continue
+        return output_files
+    
+    def split_video_single_pass(self,
+                                video_path: str,
+                                segment_duration: float = 8.0,
+                                overlap: float = 0.0,
+                                output_dir: str = None,
+                                progress_callback: Optional[Callable] = None,
+                                snap_to_keyframes: bool = True) -> List[str]:
+        """
+        单进程无重编码切割：输入只解复用一遍
+        
+        无重叠时使用 segment 复用器一次输出全部片段；有重叠时在同一进程内为每个片段
+        建立一个输出（输出端 -ss/-t），按 Settings.SPLIT_MAX_OUTPUTS_PER_PASS 分批。
+        输出命名与 split_video_ffmpeg 相同。
+        
+        Args:
+            video_path: 输入视频路径
+            segment_duration: 每段时长（秒）
+            overlap: 片段重叠时间（秒）
+            output_dir: 输出目录
+            progress_callback: 进度回调函数
+            snap_to_keyframes: 是否将切点对齐到最近的关键帧
+            
+        Returns:
+            List[str]: 输出的视频片段路径列表
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        if output_dir is None:
+            output_dir = os.path.join(self.settings.OUTPUT_DIR, 'segments', video_name)
+        os.makedirs(output_dir, exist_ok=True)
+        
+        segments, _ = self._plan_copy_segments(video_path, segment_duration, overlap, snap_to_keyframes)
+        if not segments:
+            print(f"视频时长不足，未生成片段: {video_path}")
+            return []
+        
+        if overlap <= 0:
+            output_files = self._split_with_segment_muxer(video_path, video_name, segments, output_dir, progress_callback)
+        else:
+            output_files = self._split_with_multi_output(video_path, video_name, segments, output_dir, progress_callback)
+        
+        print(f"视频切割完成! 共生成 {len(output_files)} 个片段到: {output_dir}")
+        return output_files
+    
+    def _split_with_segment_muxer(self,
+                                  video_path: str,
+                                  video_name: str,
+                                  segments: List[Tuple[float, float, int]],
+                                  output_dir: str,
+                                  progress_callback: Optional[Callable] = None,
+                                  output_paths: Optional[List[str]] = None) -> List[str]:
+        """
+        使用 segment 复用器一次切出连续片段，并按计划切点命名
+        
+        segment 复用器只在关键帧处切开：切点未对齐关键帧或间隔小于一个 GOP 时，
+        实际片段与计划不符，此时删除临时文件并改用 _split_with_multi_output。
+        
+        Args:
+            output_paths: 与 segments 一一对应的输出路径（如切割计划中承诺的路径）；
+                为 None 时按计划切点命名
+        """
+        first_start = segments[0][0]
+        last_end = segments[-1][1]
+        # 切点相对于 -ss 之后的时间轴
+        cut_points = [start - first_start for start, _, _ in segments[1:]] + [last_end - first_start]
+        
+        tmp_pattern = os.path.join(output_dir, f".{video_name}_segtmp_%03d.mp4")
+        list_path = os.path.join(output_dir, f".{video_name}_segments.csv")
+        cmd = [
+            'ffmpeg', '-y', '-ss', str(first_start), '-i', video_path,
+            # 只取主视频流与音频流：MOV/相机素材的时间码/数据轨（tmcd、mebx）无法拷贝进 MP4
+            '-map', '0:v:0', '-map', '0:a?', '-c', 'copy',
+            '-f', 'segment',
+            '-segment_times', ','.join(f"{t:.6f}" for t in cut_points),
+            '-reset_timestamps', '1',
+            '-segment_list', list_path, '-segment_list_type', 'csv',
+            tmp_pattern
+        ]
+        print(f"执行FFmpeg单次切割: {len(segments)} 个片段")
+        
+        try:
+            self.runner.run(cmd, duration=last_end - first_start, progress_callback=progress_callback)
+            with open(list_path, 'r', encoding='utf-8') as f:
+                entries = [line.strip().rsplit(',', 2) for line in f if line.strip()]
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"FFmpeg 单次切割失败: {e.stderr}")
+        finally:
+            if os.path.exists(list_path):
+                os.remove(list_path)
+        
+        tmp_paths = [os.path.join(output_dir, os.path.basename(tmp_name)) for tmp_name, _, _ in entries]
+        # 列表中的时间带有流的起始偏移，以首个片段的起点为 0 与计划切点比较
+        offset = float(entries[0][1]) if entries else 0.0
+        tolerance = self.settings.SEGMENT_CUT_TOLERANCE
+        matched = len(entries) >= len(segments) and all(
+            abs(float(rel_start) - offset - (start - first_start)) <= tolerance
+            for (_, rel_start, _), (start, _, _) in zip(entries, segments)
+        ) and abs(float(entries[len(segments) - 1][2]) - offset - (last_end - first_start)) <= tolerance
+        if not matched:
+            for tmp_path in tmp_paths:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            print(f"segment 复用器实际切出 {len(entries)} 段，与计划的 {len(segments)} 段不符，改用单进程多输出切割")
+            return self._split_with_multi_output(video_path, video_name, segments, output_dir,
+                                                 progress_callback, output_paths)
+        
+        output_files = []
+        for i, tmp_path in enumerate(tmp_paths):
+            if i >= len(segments):
+                # 最后一个切点之后的尾段不足 80% 时长，与 split_video_ffmpeg 一致丢弃
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                continue
+            start, end, idx = segments[i]
+            if output_paths is not None:
+                output_path = output_paths[i]
+                output_filename = os.path.basename(output_path)
+            else:
+                output_filename = f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"
+                output_path = os.path.join(output_dir, output_filename)
+            os.replace(tmp_path, output_path)
+            output_files.append(output_path)
+            print(f"切割完成: {output_filename} ({end-start:.1f}s)")
+        return output_files
+    
+    def _split_with_multi_output(self,
+                                 video_path: str,
+                                 video_name: str,
+                                 segments: List[Tuple[float, float, int]],
+                                 output_dir: str,
+                                 progress_callback: Optional[Callable] = None,
+                                 output_paths: Optional[List[str]] = None) -> List[str]:
+        """
+        单进程多输出：一次解复用同时写出多个（可重叠的）片段
+        
+        Args:
+            output_paths: 与 segments 一一对应的输出路径；为 None 时按片段区间命名
+        """
+        batch_size = max(1, self.settings.SPLIT_MAX_OUTPUTS_PER_PASS)
+        batches = [segments[i:i + batch_size] for i in range(0, len(segments), batch_size)]
+        output_files = []
+        
+        for b, batch in enumerate(batches):
+            batch_start = batch[0][0]
+            batch_end = max(end for _, end, _ in batch)
+            cmd = ['ffmpeg', '-y', '-ss', str(batch_start), '-i', video_path]
+            paths = []
+            for k, (start, end, idx) in enumerate(batch):
+                if output_paths is not None:
+                    output_path = output_paths[b * batch_size + k]
+                else:
+                    output_filename = f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"
+                    output_path = os.path.join(output_dir, output_filename)
+                cmd.extend([
+                    '-map', '0:v:0', '-map', '0:a?', '-c', 'copy',
+                    '-ss', f"{start - batch_start:.6f}", '-t', f"{end - start:.6f}",
+                    '-avoid_negative_ts', 'make_zero',
+                    output_path
+                ])
+                paths.append(output_path)
+            
+            batch_progress = None
+            if progress_callback:
+                def batch_progress(percent, message, b=b):
+                    overall = (b + percent / 100) / len(batches) * 100
+                    progress_callback(overall, f"批次 {b + 1}/{len(batches)} {message}")
+            
+            print(f"执行FFmpeg多输出切割: 批次 {b + 1}/{len(batches)}, {len(batch)} 个片段")
+            try:
+                self.runner.run(cmd, duration=batch_end - batch_start, progress_callback=batch_progress)
+                output_files.extend(paths)
+            except subprocess.CalledProcessError as e:
+                print(f"多输出切割批次失败 [{batch_start:.1f}s-{batch_end:.1f}s]: {e.stderr}")
+                continue
+        return output_files
+    
+    def _encode_segments_filtergraph(self,
+                                     video_path: str,
+                                     jobs: List[Tuple[float, float, str]],
+                                     progress_callback: Optional[Callable] = None) -> List[str]:
+        """
+        单次解码多输出重编码：用 split/asplit 把解码后的画面复制给每个输出，
+        各分支 trim/atrim + setpts 截取自己的区间，源视频只解码一遍
+        
+        Args:
+            video_path: 输入视频路径
+            jobs: [(开始, 结束, 输出路径)]，按开始时间排序
+            progress_callback: 进度回调函数
+            
+        Returns:
+            List[str]: 成功的输出路径
+        """
+        info = self.vutils.get_video_info(video_path) or {}
+        has_audio = info.get('audio') is not None
+        batch_size = max(1, self.settings.SPLIT_MAX_OUTPUTS_PER_PASS)
+        batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+        output_files = []
+        
+        for b, batch in enumerate(batches):
+            batch_start = min(start for start, _, _ in batch)
+            batch_end = max(end for _, end, _ in batch)
+            n = len(batch)
+            
+            # 输入端 -ss/-t 只解码覆盖所有片段的区间，trim 时间相对于 batch_start
+            filters = ['[0:v]split=' + str(n) + ''.join(f'[v{i}]' for i in range(n))]
+            if has_audio:
+                filters.append('[0:a]asplit=' + str(n) + ''.join(f'[a{i}]' for i in range(n)))
+            for i, (start, end, _) in enumerate(batch):
+                rel_start, rel_end = start - batch_start, end - batch_start
+                filters.append(f'[v{i}]trim=start={rel_start:.6f}:end={rel_end:.6f},setpts=PTS-STARTPTS[ov{i}]')
+                if has_audio:
+                    filters.append(f'[a{i}]atrim=start={rel_start:.6f}:end={rel_end:.6f},asetpts=PTS-STARTPTS[oa{i}]')
+            
+            cmd = [
+                'ffmpeg', '-y', '-ss', str(batch_start), '-t', str(batch_end - batch_start),
+                '-i', video_path, '-filter_complex', ';'.join(filters)
+            ]
+            for i, (_, _, output_path) in enumerate(batch):
+                cmd.extend(['-map', f'[ov{i}]'])
+                if has_audio:
+                    cmd.extend(['-map', f'[oa{i}]', '-c:a', self.settings.AUDIO_CODEC])
+                cmd.extend(['-c:v', self.settings.VIDEO_CODEC, output_path])
+            
+            batch_progress = None
+            if progress_callback:
+                def batch_progress(percent, message, b=b):
+                    overall = (b + percent / 100) / len(batches) * 100
+                    progress_callback(overall, f"批次 {b + 1}/{len(batches)} {message}")
+            
+            print(f"执行FFmpeg单次解码多输出: 批次 {b + 1}/{len(batches)}, {n} 个片段")
+            try:
+                self.runner.run(cmd, duration=batch_end - batch_start, progress_callback=batch_progress)
+                output_files.extend(path for _, _, path in batch)
+            except subprocess.CalledProcessError as e:
+                print(f"多输出编码批次失败 [{batch_start:.1f}s-{batch_end:.1f}s]: {e.stderr}")
+                continue
+        return output_files
+    
+    def _probe_smart_cut_params(self, video_path: str) -> Optional[dict]:
+        """
+        读取源视频流的编码参数，用于让重编码的边界片段与拷贝部分一致
+        
+        Returns:
+            Optional[dict]: 包含 encoder/tag/inband_tag/pix_fmt/profile/level/refs/timescale/bitrate/
+            frame_tolerance；编码器不支持时为 None
+        """
+        cmd = [
+            'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries',
+            'stream=codec_name,codec_tag_string,profile,level,refs,pix_fmt,time_base,bit_rate,avg_frame_rate',
+            '-of', 'json', video_path
+        ]
+        result = self.runner.run(cmd, capture_stdout=True)
+        streams = json.loads(result.stdout or '{}').get('streams') or []
+        if not streams:
+            return None
+        stream = streams[0]
+        codec = stream.get('codec_name')
+        encoder = self.settings.SMART_CUT_ENCODERS.get(codec)
+        if encoder is None:
+            return None
+        
+        # ffprobe 的 profile 名（如 "High 4:2:2"）映射为编码器可接受的名字，不在表中的不指定
+        profile = self._SMART_CUT_PROFILES.get(codec, {}).get((stream.get('profile') or '').lower(), '')
+        # h264 的 level 为 10×级别（41 -> 4.1），hevc 为 30×级别（123 -> 4.1）
+        level = stream.get('level')
+        level = level / (10 if codec == 'h264' else 30) if isinstance(level, int) and level > 0 else 0
+        refs = stream.get('refs')
+        time_base = stream.get('time_base') or ''
+        timescale = time_base.split('/')[1] if '/' in time_base else ''
+        bitrate = stream.get('bit_rate') or ''
+        tag = stream.get('codec_tag_string') or ''
+        num, _, den = (stream.get('avg_frame_rate') or '').partition('/')
+        fps = int(num) / int(den) if num.isdigit() and den.isdigit() and int(den) else 0
+        return {
+            'codec': codec,
+            'encoder': encoder,
+            'tag': tag if tag.isalnum() else '',
+            'inband_tag': self._SMART_CUT_INBAND_TAGS.get(codec, ''),
+            'pix_fmt': stream.get('pix_fmt') or '',
+            'profile': profile,
+            'level': f"{level:.1f}" if level else '',
+            'refs': str(refs) if isinstance(refs, int) and refs > 0 else '',
+            'timescale': timescale if timescale.isdigit() else '',
+            'bitrate': bitrate if bitrate.isdigit() else '',
+            # 判断切点是否落在关键帧上的容差：半帧
+            'frame_tolerance': 0.5 / fps if fps > 0 else 0.02
+        }
+    
+    def _smart_cut_encode_args(self, params: dict) -> List[str]:
+        """重编码首尾 GOP 的编码参数（编码器、像素格式、profile/level/参考帧数、码率与源一致）"""
+        args = ['-c:v', params['encoder']]
+        if params['pix_fmt']:
+            args += ['-pix_fmt', params['pix_fmt']]
+        if params['profile']:
+            args += ['-profile:v', params['profile']]
+        if params['bitrate']:
+            args += ['-b:v', params['bitrate']]
+        if params['codec'] == 'hevc':
+            x265_params = []
+            if params['level']:
+                x265_params.append(f"level-idc={params['level']}")
+            if params['refs']:
+                x265_params.append(f"ref={params['refs']}")
+            if x265_params:
+                args += ['-x265-params', ':'.join(x265_params)]
+        else:
+            if params['level']:
+                args += ['-level:v', params['level']]
+            if params['refs']:
+                args += ['-refs', params['refs']]
+        return args
+    
+    def _smart_cut_segment(self,
+                           video_path: str,
+                           start: float,
+                           end: float,
+                           output_path: str,
+                           params: dict,
+                           progress_callback: Optional[Callable] = None) -> None:
+        """
+        精确切割单个片段：首尾不完整的 GOP 重编码，中间整 GOP 直接拷贝，再用 concat 拼接
+        
+        多个部分先写成 MPEG-TS（参数集随码流写入每个关键帧前），再拼接为 MP4 并标记为
+        avc3/hev1，使重编码部分与拷贝部分各自的 SPS/PPS 都能被解码器使用。
+        切点（在半帧容差内）已落在关键帧上时，对应一侧不再重编码。
+        """
+        eps = 1e-3
+        tol = params['frame_tolerance']
+        # 起点就是关键帧时从起点直接拷贝
+        first_key = self.keyframes.snap(video_path, start, 'nearest')
+        if abs(first_key - start) > tol:
+            first_key = self.keyframes.snap(video_path, start, 'after')
+        if first_key < start - tol or first_key >= end - eps:
+            first_key = end
+        # 终点就是关键帧时拷贝到终点为止
+        last_key = self.keyframes.snap(video_path, end, 'nearest')
+        if abs(last_key - end) <= tol:
+            last_key = end
+        else:
+            last_key = self.keyframes.snap(video_path, end, 'before')
+        if last_key < first_key + eps:
+            last_key = first_key
+        first_key = min(max(first_key, start), end)
+        last_key = min(max(last_key, first_key), end)
+        
+        encode_args = self._smart_cut_encode_args(params)
+        
+        # (开始, 结束, 是否拷贝)
+        pieces = []
+        if first_key - start > eps:
+            pieces.append((start, first_key, False))
+        if last_key - first_key > eps:
+            pieces.append((first_key, last_key, True))
+        if end - last_key > eps:
+            # 起点即关键帧且片段内没有下一个关键帧：整段从关键帧起直接拷贝，无需重编码尾部
+            pieces.append((last_key, end, not pieces and last_key == start))
+        
+        base, _ = os.path.splitext(output_path)
+        tmp_dir, tmp_name = os.path.split(base)
+        piece_paths = []
+        done = 0.0
+        try:
+            for k, (p_start, p_end, copy) in enumerate(pieces):
+                single = len(pieces) == 1
+                piece_path = output_path if single else os.path.join(tmp_dir, f".{tmp_name}_part{k}.ts")
+                cmd = ['ffmpeg', '-y', '-ss', str(p_start), '-i', video_path, '-t', str(p_end - p_start), '-map', '0:v:0', '-map', '0:a?']
+                if copy:
+                    cmd += ['-c', 'copy', '-avoid_negative_ts', 'make_zero']
+                else:
+                    cmd += encode_args + ['-c:a', 'copy']
+                if single:
+                    if not copy and params['tag']:
+                        cmd += ['-tag:v', params['tag']]
+                    if params['timescale']:
+                        cmd += ['-video_track_timescale', params['timescale']]
+                else:
+                    cmd += ['-f', 'mpegts']
+                cmd.append(piece_path)
+                
+                piece_progress = None
+                if progress_callback:
+                    def piece_progress(percent, message, offset=done, span=p_end - p_start):
+                        progress_callback((offset + span * percent / 100) / (end - start) * 100, message)
+                self.runner.run(cmd, duration=p_end - p_start, progress_callback=piece_progress)
+                piece_paths.append(piece_path)
+                done += p_end - p_start
+            
+            if len(pieces) > 1:
+                list_path = os.path.join(tmp_dir, f".{tmp_name}_concat.txt")
+                with open(list_path, 'w', encoding='utf-8') as f:
+                    for piece_path in piece_paths:
+                        escaped = os.path.abspath(piece_path).replace("'", "'\\''")
+                        f.write(f"file '{escaped}'\n")
+                piece_paths.append(list_path)
+                cmd = [
+                    'ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_path,
+                    '-map', '0', '-c', 'copy'
+                ]
+                if params['inband_tag']:
+                    cmd += ['-tag:v', params['inband_tag']]
+                if params['timescale']:
+                    cmd += ['-video_track_timescale', params['timescale']]
+                cmd.append(output_path)
+                self.runner.run(cmd)
+        finally:
+            for piece_path in piece_paths:
+                if piece_path != output_path and os.path.exists(piece_path):
+                    os.remove(piece_path)
+    
+    def split_video_smart(self,
+                          video_path: str,
+                          segment_duration: float = 8.0,
+                          overlap: float = 0.0,
+                          output_dir: str = None,
+                          progress_callback: Optional[Callable] = None) -> List[str]:
+        """
+        智能切割：切点精确到帧，只重编码每段首尾不完整的 GOP，其余部分直接拷贝
+        
+        重编码部分使用与源视频相同的编码器、像素格式、profile 与时间基，
+        以便与拷贝部分用 concat 复用器无损拼接。源编码不在 Settings.SMART_CUT_ENCODERS
+        中时回退到 split_video_equal 的并行重编码。
+        
+        Args:
+            video_path: 输入视频路径
+            segment_duration: 每段时长（秒）
+            overlap: 片段重叠时间（秒）
+            output_dir: 输出目录
+            progress_callback: 进度回调函数
+            
+        Returns:
+            List[str]: 输出的视频片段路径列表
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        if output_dir is None:
+            output_dir = os.path.join(self.settings.OUTPUT_DIR, 'segments', video_name)
+        os.makedirs(output_dir, exist_ok=True)
+        
+        params = self._probe_smart_cut_params(video_path)
+        if params is None:
+            print(f"源视频编码不支持智能切割，改为重编码切割: {video_path}")
+            return self.split_video_equal(video_path, segment_duration, output_dir, overlap,
+                                          progress_callback, self.settings.SPLIT_WORKERS)
+        
+        total_duration = self.vutils.get_video_duration(video_path)
+        segments = self._plan_equal_segments(total_duration, segment_duration, overlap)
+        print(f"开始智能切割视频: {video_path}")
+        print(f"总时长: {total_duration:.2f}秒, 片段时长: {segment_duration}秒, 重叠: {overlap}秒")
+        
+        jobs = [
+            (start, end, os.path.join(output_dir, f"{video_name}_segment_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"))
+            for start, end, idx in segments
+        ]
+        output_files = self._smart_cut_segments(video_path, jobs, params, progress_callback)
         print(f"视频切割完成! 共生成 {len(output_files)} 个片段到: {output_dir}")
         return output_files
     
+    def _smart_cut_segments(self,
+                            video_path: str,
+                            jobs: List[Tuple[float, float, str]],
+                            params: dict,
+                            progress_callback: Optional[Callable] = None) -> List[str]:
+        """逐段智能切割，失败的片段跳过"""
+        output_files = []
+        for i, (start, end, output_path) in enumerate(jobs):
+            segment_progress = None
+            if progress_callback:
+                def segment_progress(percent, message, i=i):
+                    overall = (i + percent / 100) / len(jobs) * 100
+                    progress_callback(overall, f"切割 {i + 1}/{len(jobs)} {message}")
+            try:
+                self._smart_cut_segment(video_path, start, end, output_path, params, segment_progress)
+                output_files.append(output_path)
+                print(f"切割完成: {os.path.basename(output_path)} ({end-start:.1f}s)")
+            except subprocess.CalledProcessError as e:
+                print(f"切割片段失败 [{start:.1f}s-{end:.1f}s]: {e.stderr}")
+                continue
+        return output_files
+    
+    def _plan_scene_segments(self,
+                             boundaries: List[float],
+                             total_duration: float,
+                             min_duration: float,
+                             max_duration: float) -> List[Tuple[float, float, int]]:
+        """
+        根据镜头切换点生成片段：短于 min_duration 的镜头并入下一段，
+        长于 max_duration 的镜头均分为多段
+        """
+        cuts = [t for t in boundaries if 0 < t < total_duration] + [total_duration]
+        ranges = []
+        start = 0.0
+        for cut in cuts:
+            if cut - start < min_duration:
+                if cut < total_duration:
+                    continue
+                # 结尾过短：并入上一段
+                if ranges:
+                    ranges[-1] = (ranges[-1][0], total_duration)
+                    break
+            ranges.append((start, cut))
+            start = cut
+        
+        segments = []
+        for start, end in ranges:
+            parts = max(1, math.ceil((end - start) / max_duration)) if max_duration > 0 else 1
+            step = (end - start) / parts
+            for k in range(parts):
+                seg_end = end if k == parts - 1 else start + step * (k + 1)
+                segments.append((start + step * k, seg_end, len(segments)))
+        return segments
+    
+    def split_video_scene(self,
+                          video_path: str,
+                          output_dir: str = None,
+                          threshold: float = None,
+                          min_duration: float = None,
+                          max_duration: float = None,
+                          progress_callback: Optional[Callable] = None,
+                          workers: int = None) -> List[str]:
+        """
+        按镜头切换切割视频：切点落在镜头边界上，片段时长限制在 [min_duration, max_duration]
+        
+        镜头检测只在缩小的代理画面上解码一次，结果按文件缓存；切割使用并行重编码以保证切点精确。
+        
+        Args:
+            video_path: 输入视频路径
+            output_dir: 输出目录
+            threshold: 场景变化阈值 (0-1)，默认 Settings.SCENE_THRESHOLD
+            min_duration: 最短片段时长（秒），默认 Settings.SCENE_MIN_DURATION
+            max_duration: 最长片段时长（秒），默认 Settings.SCENE_MAX_DURATION
+            progress_callback: 进度回调函数
+            workers: 并行编码进程数，默认 Settings.SPLIT_WORKERS
+            
+        Returns:
+            List[str]: 输出的视频片段路径列表
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        if output_dir is None:
+            output_dir = os.path.join(self.settings.OUTPUT_DIR, 'segments_scene', video_name)
+        os.makedirs(output_dir, exist_ok=True)
+        
+        min_duration = min_duration if min_duration is not None else self.settings.SCENE_MIN_DURATION
+        max_duration = max_duration if max_duration is not None else self.settings.SCENE_MAX_DURATION
+        workers = workers or self.settings.SPLIT_WORKERS
+        
+        total_duration = self.vutils.get_video_duration(video_path)
+        print(f"开始按镜头切割视频: {video_path}")
+        
+        # 检测占前 30% 进度，编码占其余部分
+        detect_progress = None
+        encode_progress = None
+        if progress_callback:
+            def detect_progress(percent, message):
+                progress_callback(percent * 0.3, f"镜头检测 {message}")
+            
+            def encode_progress(percent, message):
+                progress_callback(30 + percent * 0.7, message)
+        
+        boundaries = self.scenes.detect(video_path, threshold, total_duration, detect_progress)
+        segments = self._plan_scene_segments(boundaries, total_duration, min_duration, max_duration)
+        print(f"检测到 {len(boundaries)} 个镜头切换, 计划切割 {len(segments)} 个片段")
+        
+        jobs = [
+            (start, end, os.path.join(output_dir, f"{video_name}_scene_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"))
+            for start, end, idx in segments
+        ]
+        output_files = self._encode_segments_parallel(video_path, jobs, workers, encode_progress)
+        print(f"镜头切割完成! 共生成 {len(output_files)} 个片段到: {output_dir}")
+        return output_files
+    
+    def _plan_silence_segments(self,
+                               video_path: str,
+                               total_duration: float,
+                               segment_duration: float,
+                               tolerance: float = None,
+                               threshold_db: float = None) -> List[Tuple[float, float, int]]:
+        """按目标时长逐段寻找附近的静音点作为切点；没有音频流时按时长等分"""
+        if not self.envelope.has_audio(video_path):
+            print(f"提示: 视频没有音频流，改为按时长切割: {video_path}")
+            return self._plan_equal_segments(total_duration, segment_duration, 0.0)
+        tolerance = tolerance if tolerance is not None else self.settings.SILENCE_TOLERANCE
+        threshold_db = threshold_db if threshold_db is not None else self.settings.SILENCE_THRESHOLD_DB
+        tolerance = min(tolerance, segment_duration / 2)
+        db = self.envelope.get_db(video_path)
+        
+        segments = []
+        start = 0.0
+        while total_duration - start > segment_duration + tolerance:
+            cut = self.envelope.find_cut(db, start + segment_duration, tolerance, threshold_db)
+            if cut is None or cut <= start:
+                cut = start + segment_duration
+            segments.append((start, cut, len(segments)))
+            start = cut
+        if total_duration - start > 0:
+            segments.append((start, total_duration, len(segments)))
+        return segments
+    
+    def split_video_silence(self,
+                            video_path: str,
+                            segment_duration: float = 8.0,
+                            output_dir: str = None,
+                            tolerance: float = None,
+                            threshold_db: float = None,
+                            progress_callback: Optional[Callable] = None,
+                            workers: int = None) -> List[str]:
+        """
+        静音感知切割：在目标时长附近（±tolerance）选择最近的静音点作为切点，避免切断语音
+        
+        音轨只解码一次并缓存能量包络，换用不同参数重新切割时无需再次解码。
+        
+        Args:
+            video_path: 输入视频路径
+            segment_duration: 目标片段时长（秒）
+            output_dir: 输出目录
+            tolerance: 切点允许偏离目标的秒数，默认 Settings.SILENCE_TOLERANCE
+            threshold_db: 静音电平阈值（dBFS），默认 Settings.SILENCE_THRESHOLD_DB
+            progress_callback: 进度回调函数
+            workers: 并行编码进程数，默认 Settings.SPLIT_WORKERS
+            
+        Returns:
+            List[str]: 输出的视频片段路径列表
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        if output_dir is None:
+            output_dir = os.path.join(self.settings.OUTPUT_DIR, 'segments_silence', video_name)
+        os.makedirs(output_dir, exist_ok=True)
+        
+        workers = workers or self.settings.SPLIT_WORKERS
+        
+        total_duration = self.vutils.get_video_duration(video_path)
+        print(f"开始静音感知切割视频: {video_path}")
+        if progress_callback:
+            progress_callback(0, "分析音频能量...")
+        segments = self._plan_silence_segments(video_path, total_duration, segment_duration, tolerance, threshold_db)
+        print(f"总时长: {total_duration:.2f}秒, 计划切割 {len(segments)} 个片段")
+        
+        jobs = [
+            (start, end, os.path.join(output_dir, f"{video_name}_silence_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"))
+            for start, end, idx in segments
+        ]
+        output_files = self._encode_segments_parallel(video_path, jobs, workers, progress_callback)
+        print(f"静音感知切割完成! 共生成 {len(output_files)} 个片段到: {output_dir}")
+        return output_files
+    
+    def _plan_random_segments(self,
+                              total_duration: float,
+                              num_segments: int,
+                              min_duration: float,
+                              max_duration: float) -> List[Tuple[float, float, int]]:
+        """生成随机切割区间（按开始时间排序）"""
+        segments = []
+        for i in range(num_segments):
+            # 随机时长
+            duration = random.uniform(min_duration, max_duration)
+            
+            # 随机开始时间
+            max_start = max(0, total_duration - duration)
+            if max_start <= 0:
+                continue
+                
+            start_time = random.uniform(0, max_start)
+            end_time = min(start_time + duration, total_duration)
+            
+            segments.append((start_time, end_time, i))
+        
+        # 按开始时间排序
+        segments.sort(key=lambda x: x[0])
+        return segments
+    
     def split_video_random(self,
                           video_path: str,
                           num_segments: int = 10,
                           min_duration: float = 5.0,
                           max_duration: float = 10.0,
                           output_dir: str = None,
-                          progress_callback: Optional[Callable] = None) -> List[str]:
+                          progress_callback: Optional[Callable] = None,
+                          workers: int = 1,
+                          single_pass: bool = False) -> List[str]:
         """
         随机时长切割视频
         
@@ -208,12 +1169,12 @@ class VideoSplitter:
             max_duration: 最大片段时长（秒）
             output_dir: 输出目录
             progress_callback: 进度回调函数
+            workers: 并行编码进程数；大于 1 时每个片段由独立 ffmpeg 进程重编码
+            single_pass: 是否用单个 ffmpeg 滤镜图一次解码输出全部片段（优先于 workers）
             
         Returns:
             List[str]: 输出的视频片段路径列表
         """
-        import random
-        
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"视频文件不存在: {video_path}")
         
@@ -227,29 +1188,30 @@ class VideoSplitter:
         video_name = os.path.splitext(os.path.basename(video_path))[0]
         output_files = []
         
+        if single_pass or workers > 1:
+            total_duration = self.vutils.get_video_duration(video_path)
+            print(f"开始{'单次解码' if single_pass else '并行'}随机切割视频: {video_path}")
+            print(f"总时长: {total_duration:.2f}秒, 目标片段数: {num_segments}")
+            segments = self._plan_random_segments(total_duration, num_segments, min_duration, max_duration)
+            print(f"计划随机切割 {len(segments)} 个片段")
+            jobs = [
+                (start, end, os.path.join(output_dir, f"{video_name}_random_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4"))
+                for start, end, idx in segments
+            ]
+            if single_pass:
+                output_files = self._encode_segments_filtergraph(video_path, jobs, progress_callback)
+            else:
+                output_files = self._encode_segments_parallel(video_path, jobs, workers, progress_callback)
+            print(f"随机视频切割完成! 共生成 {len(output_files)} 个片段到: {output_dir}")
+            return output_files
+        
         with VideoFileClip(video_path) as clip:
             total_duration = clip.duration
             print(f"开始随机切割视频: {video_path}")
             print(f"总时长: {total_duration:.2f}秒, 目标片段数: {num_segments}")
             
             # 生成随机切割点
-            segments = []
-            for i in range(num_segments):
-                # 随机时长
-                duration = random.uniform(min_duration, max_duration)
-                
-                # 随机开始时间
-                max_start = max(0, total_duration - duration)
-                if max_start <= 0:
-                    continue
-                    
-                start_time = random.uniform(0, max_start)
-                end_time = min(start_time + duration, total_duration)
-                
-                segments.append((start_time, end_time, i))
-            
-            # 按开始时间排序
-            segments.sort(key=lambda x: x[0])
+            segments = self._plan_random_segments(total_duration, num_segments, min_duration, max_duration)
             
             print(f"计划随机切割 {len(segments)} 个片段")
             
@@ -294,7 +1256,8 @@ class VideoSplitter:
                    num_segments: int = 10,
                    min_duration: float = 5.0,
                    max_duration: float = 10.0,
-                   progress_callback: Optional[Callable] = None) -> List[str]:
+                   progress_callback: Optional[Callable] = None,
+                   workers: int = 1) -> List[str]:
         """
         统一的视频切割接口
         
@@ -302,28 +1265,217 @@ class VideoSplitter:
             video_path: 输入视频路径
             segment_duration: 切割时长（秒）
             output_dir: 输出目录
-            method: 切割方法 ('equal', 'ffmpeg', 'random')
+            method: 切割方法 ('equal', 'ffmpeg', 'segment', 'smart', 'scene', 'silence', 'random', 'random_single')
             overlap: 重叠时间（秒）
             num_segments: 随机切割的目标片段数
             min_duration: 随机切割最小时长
             max_duration: 随机切割最大时长
             progress_callback: 进度回调函数
+            workers: 重编码方法（equal/random）的并行进程数
             
         Returns:
             List[str]: 输出的视频片段路径列表
         """
         if method == 'ffmpeg':
-            return self.split_video_ffmpeg(video_path, segment_duration, output_dir)
-        elif method == 'random':
+            return self.split_video_ffmpeg(video_path, segment_duration, overlap, output_dir, progress_callback)
+        elif method == 'segment':
+            return self.split_video_single_pass(video_path, segment_duration, overlap, output_dir, progress_callback)
+        elif method == 'smart':
+            return self.split_video_smart(video_path, segment_duration, overlap, output_dir, progress_callback)
+        elif method == 'scene':
+            return self.split_video_scene(video_path, output_dir, progress_callback=progress_callback, workers=workers)
+        elif method == 'silence':
+            return self.split_video_silence(video_path, segment_duration, output_dir,
+                                            progress_callback=progress_callback, workers=workers)
+        elif method in ('random', 'random_single'):
             return self.split_video_random(
                 video_path, num_segments, min_duration, max_duration, 
-                output_dir, progress_callback
+                output_dir, progress_callback, workers, single_pass=method == 'random_single'
             )
         else:  # 默认等时长切割
             return self.split_video_equal(
-                video_path, segment_duration, output_dir, overlap, progress_callback
+                video_path, segment_duration, output_dir, overlap, progress_callback, workers
             )
     
+    def _estimate_plan_cost(self,
+                            video_path: str,
+                            backend: str,
+                            ranges: List[Tuple[float, float]]) -> dict:
+        """
+        根据探测信息估算渲染成本
+        
+        Returns:
+            dict: {'output_seconds', 'output_bytes', 'cpu_seconds'}
+        """
+        info = self.vutils.get_video_info(video_path) or {}
+        video = info.get('video') or {}
+        bitrate = info.get('bitrate') or 0
+        mpix_per_second = (video.get('width', 0) * video.get('height', 0) / 1e6) * (video.get('fps') or 0)
+        encode_rate = mpix_per_second * self.settings.SPLIT_COST_ENCODE_CPU_PER_MPIX_FRAME
+        
+        output_seconds = sum(end - start for start, end in ranges)
+        output_bytes = int(output_seconds * bitrate / 8)
+        copy_cpu = output_bytes / self.settings.SPLIT_COST_COPY_BYTES_PER_CPU_SECOND
+        
+        if backend == 'copy':
+            cpu_seconds = copy_cpu
+        elif backend == 'smart':
+            # 每段平均约重编码一个 GOP（首尾两个不完整 GOP 之和）
+            mean_gop, _ = self.keyframes.gop_stats(video_path)
+            encoded = sum(min(end - start, mean_gop) for start, end in ranges)
+            cpu_seconds = encoded * encode_rate + copy_cpu
+        else:
+            cpu_seconds = output_seconds * encode_rate
+        
+        return {
+            'output_seconds': round(output_seconds, 3),
+            'output_bytes': output_bytes,
+            'cpu_seconds': round(cpu_seconds, 2)
+        }
+    
+    def plan_split(self,
+                   video_path: str,
+                   method: str = 'equal',
+                   segment_duration: float = 8.0,
+                   output_dir: str = None,
+                   overlap: float = 0.0,
+                   num_segments: int = 10,
+                   min_duration: float = 5.0,
+                   max_duration: float = 10.0,
+                   snap_to_keyframes: bool = True,
+                   threshold: float = None) -> dict:
+        """
+        生成切割计划（不渲染），可 JSON 序列化，用于预览/估算/跨机器调度
+        
+        Args:
+            video_path: 输入视频路径
+            method: 切割方法，与 split_video 相同
+            segment_duration: 切割时长（秒）
+            output_dir: 输出目录
+            overlap: 重叠时间（秒）
+            num_segments: 随机切割的目标片段数
+            min_duration: 随机切割最小时长
+            max_duration: 随机切割最大时长
+            snap_to_keyframes: 拷贝方法是否对齐关键帧
+            threshold: scene 方法的场景变化阈值
+            
+        Returns:
+            dict: {'source', 'method', 'backend', 'duration', 'output_dir', 'segments': [{'index', 'start', 'end', 'output'}],
+                   'estimate': {'output_seconds', 'output_bytes', 'cpu_seconds'}, ...}
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        if method not in self._PLAN_BACKENDS:
+            raise ValueError(f"不支持的切割方法: {method}")
+        
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        backend = self._PLAN_BACKENDS[method]
+        total_duration = self.vutils.get_video_duration(video_path)
+        snapped = False
+        
+        if method in ('ffmpeg', 'segment'):
+            segments, snapped = self._plan_copy_segments(video_path, segment_duration, overlap, snap_to_keyframes)
+            prefix, subdir = 'segment', 'segments'
+        elif method in ('random', 'random_single'):
+            segments = self._plan_random_segments(total_duration, num_segments, min_duration, max_duration)
+            prefix, subdir = 'random', 'segments_random'
+        elif method == 'scene':
+            boundaries = self.scenes.detect(video_path, threshold, total_duration)
+            segments = self._plan_scene_segments(boundaries, total_duration,
+                                                 self.settings.SCENE_MIN_DURATION, self.settings.SCENE_MAX_DURATION)
+            prefix, subdir = 'scene', 'segments_scene'
+        elif method == 'silence':
+            segments = self._plan_silence_segments(video_path, total_duration, segment_duration)
+            prefix, subdir = 'silence', 'segments_silence'
+        else:
+            segments = self._plan_equal_segments(total_duration, segment_duration, overlap)
+            prefix, subdir = 'segment', 'segments'
+        
+        if method == 'smart' and self._probe_smart_cut_params(video_path) is None:
+            backend = 'reencode'
+        
+        if output_dir is None:
+            output_dir = os.path.join(self.settings.OUTPUT_DIR, subdir, video_name)
+        
+        plan = {
+            'source': os.path.abspath(video_path),
+            'method': method,
+            'backend': backend,
+            'duration': total_duration,
+            'overlap': overlap,
+            'snapped': snapped,
+            'single_pass': method == 'random_single',
+            'output_dir': output_dir,
+            'segments': [
+                {
+                    'index': idx,
+                    'start': start,
+                    'end': end,
+                    'output': os.path.join(output_dir, f"{video_name}_{prefix}_{idx:03d}_{start:.1f}s-{end:.1f}s.mp4")
+                }
+                for start, end, idx in segments
+            ],
+            'estimate': self._estimate_plan_cost(video_path, backend, [(s, e) for s, e, _ in segments])
+        }
+        estimate = plan['estimate']
+        print(f"切割计划: {video_name} [{method}/{backend}] {len(segments)} 个片段, "
+              f"约 {estimate['cpu_seconds']:.1f} CPU秒, 输出约 {estimate['output_bytes'] / 1024 / 1024:.1f}MB")
+        return plan
+    
+    def execute_plan(self,
+                     plan: dict,
+                     workers: int = 1,
+                     progress_callback: Optional[Callable] = None) -> List[str]:
+        """
+        按 plan_split 生成的计划渲染片段
+        
+        Args:
+            plan: 切割计划
+            workers: 重编码后端的并行进程数
+            progress_callback: 进度回调函数
+            
+        Returns:
+            List[str]: 输出的视频片段路径列表
+        """
+        video_path = plan['source']
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        output_dir = plan['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+        
+        jobs = [(seg['start'], seg['end'], seg['output']) for seg in plan['segments']]
+        if not jobs:
+            print(f"切割计划为空: {video_path}")
+            return []
+        
+        backend = plan['backend']
+        if backend == 'smart':
+            params = self._probe_smart_cut_params(video_path)
+            if params is not None:
+                output_files = self._smart_cut_segments(video_path, jobs, params, progress_callback)
+            else:
+                output_files = self._encode_segments_parallel(video_path, jobs, workers, progress_callback)
+        elif backend == 'copy' and plan['method'] == 'segment':
+            video_name = os.path.splitext(os.path.basename(video_path))[0]
+            segments = [(seg['start'], seg['end'], seg['index']) for seg in plan['segments']]
+            # 输出到计划中承诺的路径，而不是按实际切点重新命名
+            output_paths = [seg['output'] for seg in plan['segments']]
+            if plan.get('overlap', 0) <= 0:
+                output_files = self._split_with_segment_muxer(video_path, video_name, segments, output_dir,
+                                                              progress_callback, output_paths)
+            else:
+                output_files = self._split_with_multi_output(video_path, video_name, segments, output_dir,
+                                                             progress_callback, output_paths)
+        elif backend == 'copy':
+            output_files = self._copy_segments(video_path, jobs, plan.get('snapped', False), progress_callback)
+        elif plan.get('single_pass'):
+            output_files = self._encode_segments_filtergraph(video_path, jobs, progress_callback)
+        else:
+            output_files = self._encode_segments_parallel(video_path, jobs, workers, progress_callback)
+        
+        print(f"按计划切割完成! 共生成 {len(output_files)} 个片段到: {output_dir}")
+        return output_files
+    
     def get_video_info(self, video_path: str) -> dict:
         """
         获取视频基本信息
@@ -0,0 +1,80 @@
+"""FrameExtractor 端到端测试（需要 ffmpeg、numpy 与 moviepy，缺失时跳过）"""
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from modules.frame_extractor import FrameExtractor
+    HAS_MODULES = True
+except ImportError:
+    HAS_MODULES = False
+
+HAS_FFMPEG = bool(shutil.which('ffmpeg') and shutil.which('ffprobe'))
+
+
+@unittest.skipUnless(HAS_MODULES and HAS_FFMPEG, "需要 ffmpeg 与完整依赖")
+class FrameExtractorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.clip = os.path.join(cls.tmp, 'clip.mp4')
+        # 25fps 恒定帧率测试片源，GOP 2 秒
+        subprocess.run([
+            'ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=25',
+            '-t', '8', '-c:v', 'libx264', '-g', '50', '-pix_fmt', 'yuv420p', cls.clip
+        ], check=True)
+        cls.extractor = FrameExtractor()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def _reference_frame(self, t: float, name: str) -> bytes:
+        """精确 seek 解码得到 t 之后的第一帧"""
+        path = os.path.join(self.tmp, name)
+        subprocess.run([
+            'ffmpeg', '-v', 'error', '-y', '-ss', f"{t:.6f}", '-i', self.clip, '-frames:v', '1', path
+        ], check=True)
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_extract_at_maps_targets_with_non_grid_start(self):
+        # 第一个目标不在帧网格上，区段起点 (t - 1s) 同样不在网格上
+        timestamps = [2.37, 2.39, 5.013, 2.37, 30.0]
+        output_dir = os.path.join(self.tmp, 'at')
+        files = self.extractor.extract_at(self.clip, timestamps, output_dir)
+
+        self.assertEqual([os.path.basename(f) for f in files],
+                         ['clip_at_0000.png', 'clip_at_0001.png', 'clip_at_0002.png', 'clip_at_0003.png'])
+        for i, t in enumerate(timestamps[:4]):
+            with open(files[i], 'rb') as f:
+                self.assertEqual(f.read(), self._reference_frame(t, f'ref_{i}.png'), t)
+
+    def test_sharded_matches_full_decode_with_nonzero_start_time(self):
+        # MPEG-TS 片源的 start_time 非零（默认 1.4s），GOP 1 秒，采样间隔不与帧网格对齐
+        ts_clip = os.path.join(self.tmp, 'clip_ts.ts')
+        subprocess.run([
+            'ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=25',
+            '-t', '8', '-c:v', 'libx264', '-g', '25', '-pix_fmt', 'yuv420p', ts_clip
+        ], check=True)
+        interval = 0.7
+
+        full = self.extractor.extract_frames_ffmpeg(ts_clip, os.path.join(self.tmp, 'full'), interval)
+        sharded = self.extractor.extract_frames_sharded(ts_clip, os.path.join(self.tmp, 'sharded'),
+                                                        interval, shards=3)
+
+        self.assertGreater(len(sharded), 0)
+        self.assertLessEqual(abs(len(full) - len(sharded)), 1)
+        for k, (a, b) in enumerate(zip(full, sharded)):
+            with open(a, 'rb') as fa, open(b, 'rb') as fb:
+                self.assertEqual(fa.read(), fb.read(), f"第 {k} 帧 ({k * interval:.1f}s) 不一致")
+
+
+if __name__ == '__main__':
+    unittest.main()
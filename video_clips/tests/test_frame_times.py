@@ -0,0 +1,50 @@
+"""帧时间戳日志解析与目标映射"""
+import os
+import sys
+import unittest
+from fractions import Fraction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.frame_times import parse_frame_log, map_to_selected
+
+
+class ParseFrameLogTest(unittest.TestCase):
+
+    def test_reads_stream_zero_with_time_base(self):
+        lines = [
+            '#format: frame checksums',
+            '#tb 0: 1/12800',
+            '#media_type 0: video',
+            '0,          0,          0,      512,    57600, 0x1c2d3e4f',
+            '0,        512,        512,      512,    57600, 0x5a6b7c8d',
+            '1,          0,          0,     1024,     4096, 0x00000000',
+        ]
+        self.assertEqual(parse_frame_log(lines), [0.0, 0.04])
+
+
+class MapToSelectedTest(unittest.TestCase):
+
+    def test_cfr_clip_with_non_grid_start(self):
+        # 25fps 恒定帧率，区段起点 2.37s 不在帧网格上；时间基 1/12800（输入流时间基）
+        fps, start, tb = 25, Fraction(237, 100), Fraction(1, 12800)
+        frames = [Fraction(k, fps) for k in range(int(start * fps), 8 * fps)]
+        targets = [2.37, 2.39, 2.41, 3.0, 4.013]
+
+        # select 对每个目标选中 t >= 目标的第一帧；日志记录其相对起点、按时间基取整后的时间
+        chosen = sorted({min(f for f in frames if f - start >= Fraction(t) - start) for t in targets})
+        selected = [float(round((f - start) / tb) * tb) for f in chosen]
+
+        relative = {t - float(start): t for t in targets}
+        mapping = map_to_selected(selected, relative)
+        for rel, k in mapping.items():
+            expected = min(f for f in frames if f >= Fraction(relative[rel]))
+            self.assertEqual(chosen[k], expected, relative[rel])
+        self.assertEqual(len(mapping), len(targets))
+
+    def test_target_after_last_frame_is_dropped(self):
+        self.assertEqual(map_to_selected([0.0, 1.0], [0.5, 1.5]), {0.5: 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,20 @@
 # Utils package
 from .file_handler import FileHandler
-from .video_utils import VideoUtils
+from .video_utils import VideoUtils, ProbeFields
+from .probe_cache import ProbeCache, get_probe_cache
+from .ffmpeg_runner import FFmpegRunner, FFmpegCancelled
+from .scene_detector import SceneDetector, get_scene_detector
+from .job_manifest import JobManifest
 
-__all__ = ['FileHandler', 'VideoUtils']
\ No newline at end of file
+__all__ = [
+    'FileHandler',
+    'VideoUtils',
+    'ProbeFields',
+    'ProbeCache',
+    'get_probe_cache',
+    'FFmpegRunner',
+    'FFmpegCancelled',
+    'SceneDetector',
+    'get_scene_detector',
+    'JobManifest'
+]
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+音频能量包络
+将音轨一次性解码为 16kHz 单声道 PCM（ffmpeg 管道），按固定窗口用 numpy 向量化计算 RMS，
+结果以 .npy 持久化（按 路径+大小+修改时间 识别文件），供静音切割等按不同参数反复使用。
+"""
+import os
+import hashlib
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+from config.settings import Settings
+from utils.probe_cache import ProbeCache
+from utils.ffmpeg_runner import FFmpegRunner
+
+
+class _RmsAccumulator:
+    """把 PCM 数据块累积成按窗口计算的 RMS 序列"""
+
+    def __init__(self, window_samples: int):
+        self.window_bytes = window_samples * 2
+        self._pending = b''
+        self._blocks = []
+
+    def feed(self, chunk: bytes) -> None:
+        data = self._pending + chunk
+        usable = len(data) - len(data) % self.window_bytes
+        self._pending = data[usable:]
+        if usable:
+            self._blocks.append(self._rms(data[:usable]))
+
+    def _rms(self, data: bytes) -> np.ndarray:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+        samples = samples.reshape(-1, self.window_bytes // 2)
+        return np.sqrt(np.mean(np.square(samples), axis=1))
+
+    def result(self) -> np.ndarray:
+        # 末尾不足一个窗口的样本单独成窗
+        tail = self._pending[:len(self._pending) - len(self._pending) % 2]
+        if tail:
+            samples = np.frombuffer(tail, dtype='<i2').astype(np.float32) / 32768.0
+            self._blocks.append(np.array([np.sqrt(np.mean(np.square(samples)))], dtype=np.float32))
+        if not self._blocks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(self._blocks).astype(np.float32)
+
+
+class AudioEnvelope:
+    """音频 RMS 包络（磁盘 .npy 缓存 + 进程内缓存）"""
+
+    def __init__(self, envelope_dir: str = None, runner: FFmpegRunner = None):
+        """
+        Args:
+            envelope_dir: 包络存放目录，默认 Settings.AUDIO_ENVELOPE_DIR
+            runner: 执行 ffmpeg 的运行器
+        """
+        self.settings = Settings()
+        self.envelope_dir = envelope_dir or self.settings.AUDIO_ENVELOPE_DIR
+        self.sample_rate = self.settings.SILENCE_SAMPLE_RATE
+        self.window = self.settings.SILENCE_WINDOW
+        self.runner = runner or FFmpegRunner()
+        self._memory = {}
+        self._has_audio = {}
+        self._lock = threading.Lock()
+
+    def _envelope_path(self, ident: Tuple[str, int, int]) -> str:
+        """由文件身份与窗口参数生成包络文件路径"""
+        key = f"{ident[0]}|{ident[1]}|{ident[2]}|{self.sample_rate}|{self.window}"
+        return os.path.join(self.envelope_dir, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.npy")
+
+    def _build(self, video_path: str) -> np.ndarray:
+        """解码音轨为 PCM 并计算逐窗口 RMS"""
+        window_samples = max(1, int(round(self.sample_rate * self.window)))
+        acc = _RmsAccumulator(window_samples)
+        cmd = [
+            'ffmpeg', '-v', 'error', '-i', video_path,
+            '-vn', '-sn', '-dn', '-map', '0:a:0',
+            '-ac', '1', '-ar', str(self.sample_rate),
+            '-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1'
+        ]
+        self.runner.run(cmd, stdout_callback=acc.feed)
+        return acc.result()
+
+    def has_audio(self, video_path: str) -> bool:
+        """文件是否包含音频流"""
+        ident = ProbeCache.file_identity(video_path)
+        if ident is None:
+            raise FileNotFoundError(f"文件不存在: {video_path}")
+        with self._lock:
+            cached = self._has_audio.get(ident)
+        if cached is not None:
+            return cached
+        cmd = [
+            'ffprobe', '-v', 'error', '-select_streams', 'a',
+            '-show_entries', 'stream=index', '-of', 'csv=p=0', video_path
+        ]
+        result = self.runner.run(cmd, capture_stdout=True)
+        found = bool((result.stdout or '').strip())
+        with self._lock:
+            self._has_audio[ident] = found
+        return found
+
+    def get(self, video_path: str) -> np.ndarray:
+        """
+        获取 RMS 包络（线性幅度 0-1，每个元素对应 Settings.SILENCE_WINDOW 秒）
+
+        Args:
+            video_path: 媒体文件路径
+
+        Returns:
+            np.ndarray: float32 数组；没有音轨时抛出 ValueError（可先用 has_audio 判断）
+        """
+        ident = ProbeCache.file_identity(video_path)
+        if ident is None:
+            raise FileNotFoundError(f"文件不存在: {video_path}")
+
+        with self._lock:
+            cached = self._memory.get(ident)
+        if cached is not None:
+            return cached
+
+        envelope_path = self._envelope_path(ident)
+        envelope = None
+        if os.path.exists(envelope_path):
+            try:
+                envelope = np.load(envelope_path)
+            except (OSError, ValueError) as e:
+                print(f"读取音频包络失败，将重建: {e}")
+
+        if envelope is None:
+            if not self.has_audio(video_path):
+                raise ValueError(f"文件没有音频流: {video_path}")
+            envelope = self._build(video_path)
+            os.makedirs(self.envelope_dir, exist_ok=True)
+            tmp_path = envelope_path + '.tmp.npy'
+            np.save(tmp_path, envelope)
+            os.replace(tmp_path, envelope_path)
+
+        with self._lock:
+            self._memory[ident] = envelope
+        return envelope
+
+    def get_db(self, video_path: str) -> np.ndarray:
+        """获取以 dBFS 表示的包络（静音窗口约为 -inf 时截断到 -120dB）"""
+        envelope = self.get(video_path)
+        return 20 * np.log10(np.maximum(envelope, 1e-6))
+
+    def find_cut(self,
+                 db: np.ndarray,
+                 target: float,
+                 tolerance: float,
+                 threshold_db: float) -> Optional[float]:
+        """
+        在 [target - tolerance, target + tolerance] 内寻找离目标最近的静音窗口
+
+        Args:
+            db: get_db 返回的包络
+            target: 目标切点（秒）
+            tolerance: 允许偏移（秒）
+            threshold_db: 低于该电平视为静音
+
+        Returns:
+            Optional[float]: 静音窗口中心时间；范围内没有静音时返回能量最低的窗口中心，
+            范围超出包络时返回 None
+        """
+        lo = max(0, int((target - tolerance) / self.window))
+        hi = min(db.size, int((target + tolerance) / self.window) + 1)
+        if lo >= hi:
+            return None
+        centers = (np.arange(lo, hi) + 0.5) * self.window
+        window_db = db[lo:hi]
+        silent = np.nonzero(window_db < threshold_db)[0]
+        if silent.size:
+            best = silent[np.argmin(np.abs(centers[silent] - target))]
+        else:
+            best = int(np.argmin(window_db))
+        return float(centers[best])
+
+
+_shared_envelope = None
+_shared_lock = threading.Lock()
+
+
+def get_audio_envelope() -> AudioEnvelope:
+    """获取进程内共享的音频包络实例"""
+    global _shared_envelope
+    with _shared_lock:
+        if _shared_envelope is None:
+            _shared_envelope = AudioEnvelope()
+        return _shared_envelope
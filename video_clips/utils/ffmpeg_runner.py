@@ -0,0 +1,404 @@
+"""
+FFmpeg 进程运行器
+统一执行 ffmpeg/ffprobe 命令：解析 -progress 输出回调进度、仅保留 stderr 末尾若干 KB、
+支持超时与取消（终止整个进程树）。
+"""
+import os
+import sys
+import time
+import signal
+import threading
+import subprocess
+import contextlib
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+from config.settings import Settings
+
+
+class FFmpegCancelled(RuntimeError):
+    """FFmpeg 任务被取消"""
+
+
+class _StderrRing:
+    """只保留最近 limit 字节的 stderr 缓冲"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._chunks = deque()
+        self._size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        while len(self._chunks) > 1 and self._size - len(self._chunks[0]) >= self.limit:
+            self._size -= len(self._chunks.popleft())
+
+    def text(self) -> str:
+        data = b''.join(self._chunks)[-self.limit:]
+        return data.decode('utf-8', errors='replace')
+
+
+class FFmpegRunner:
+    """FFmpeg 命令运行器（可跨线程取消）"""
+
+    # 所有运行器当前在跑的进程 {进程: 运行器}，供 cancel_all 使用
+    _registry = {}
+    _registry_lock = threading.Lock()
+    # 进程级默认取消事件（如 GUI 的停止标志）：未显式传入 cancel_event 的调用也会响应
+    _default_cancel_event: Optional[threading.Event] = None
+
+    def __init__(self, stderr_limit: int = None, timeout: float = None):
+        """
+        Args:
+            stderr_limit: 保留的 stderr 字节数，默认 Settings.FFMPEG_STDERR_LIMIT
+            timeout: 默认超时（秒），None 表示不限制
+        """
+        self.settings = Settings()
+        self.stderr_limit = stderr_limit or self.settings.FFMPEG_STDERR_LIMIT
+        self.timeout = timeout
+        self._active = set()
+        self._cancelled = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def bind_cancel_event(cls, event: Optional[threading.Event]) -> None:
+        """
+        绑定进程级默认取消事件：置位后正在运行的命令被终止，新的命令不再启动
+
+        Args:
+            event: 取消事件，None 表示解除绑定
+        """
+        cls._default_cancel_event = event
+
+    def _check_cancelled(self, cmd: List[str], cancel_event: Optional[threading.Event]) -> None:
+        """启动进程前检查取消事件"""
+        if cancel_event is not None and cancel_event.is_set():
+            raise FFmpegCancelled(f"FFmpeg 任务已取消: {' '.join(cmd[:6])}...")
+
+    @staticmethod
+    def _with_progress(cmd: List[str]) -> List[str]:
+        """为 ffmpeg 命令注入 -progress pipe:1，其它命令原样返回"""
+        if not cmd or os.path.splitext(os.path.basename(cmd[0]))[0].lower() != 'ffmpeg':
+            return list(cmd)
+        if '-progress' in cmd:
+            return list(cmd)
+        return [cmd[0], '-nostats', '-progress', 'pipe:1'] + list(cmd[1:])
+
+    @staticmethod
+    def _parse_out_time(stats: Dict[str, str]) -> Optional[float]:
+        """从进度块中解析已输出时长（秒）"""
+        for key in ('out_time_us', 'out_time_ms'):
+            # ffmpeg 的 out_time_ms 实际单位也是微秒
+            value = stats.get(key)
+            if value and value.lstrip('-').isdigit():
+                return max(0.0, int(value) / 1_000_000)
+        value = stats.get('out_time')
+        if value and ':' in value:
+            try:
+                h, m, s = value.split(':')
+                return max(0.0, int(h) * 3600 + int(m) * 60 + float(s))
+            except ValueError:
+                return None
+        return None
+
+    def _read_progress(self, stream, duration: Optional[float],
+                       progress_callback: Optional[Callable],
+                       stats_callback: Optional[Callable]) -> None:
+        """逐块解析 -progress 输出（key=value，以 progress=... 结束一块）"""
+        stats: Dict[str, str] = {}
+        for raw in iter(stream.readline, b''):
+            line = raw.decode('utf-8', errors='replace').strip()
+            if '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            stats[key] = value.strip()
+            if key != 'progress':
+                continue
+
+            out_time = self._parse_out_time(stats)
+            percent = None
+            if duration and out_time is not None:
+                percent = min(100.0, out_time / duration * 100)
+            if value == 'end':
+                percent = 100.0
+
+            snapshot = {
+                'percent': percent,
+                'out_time': out_time,
+                'fps': stats.get('fps'),
+                'speed': stats.get('speed'),
+                'frame': stats.get('frame'),
+                'done': value == 'end',
+            }
+            if stats_callback:
+                stats_callback(snapshot)
+            if progress_callback and percent is not None:
+                progress_callback(percent, f"fps={snapshot['fps'] or '-'} speed={snapshot['speed'] or '-'}")
+            stats = {}
+
+    @staticmethod
+    def _read_stdout_chunks(stream, callback: Callable, errors: list) -> None:
+        """把 stdout 原始数据块交给回调（如 PCM/rawvideo 管道）"""
+        read = getattr(stream, 'read1', stream.read)
+        try:
+            for chunk in iter(lambda: read(65536), b''):
+                callback(chunk)
+        except Exception as e:
+            errors.append(e)
+            # 继续读空管道，避免 ffmpeg 阻塞在写入上
+            for _ in iter(lambda: read(65536), b''):
+                pass
+
+    @staticmethod
+    def _read_stderr(stream, ring: _StderrRing) -> None:
+        read = getattr(stream, 'read1', stream.read)
+        for chunk in iter(lambda: read(8192), b''):
+            ring.feed(chunk)
+
+    @staticmethod
+    def _popen_kwargs() -> Dict:
+        """让子进程独立成组，便于整体终止"""
+        if sys.platform == 'win32':
+            return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {'start_new_session': True}
+
+    @staticmethod
+    def _kill_tree(proc: subprocess.Popen) -> None:
+        """终止进程及其子进程"""
+        if proc.poll() is not None:
+            return
+        try:
+            if sys.platform == 'win32':
+                subprocess.run(['taskkill', '/F', '/T', '/PID', str(proc.pid)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:
+                os.killpg(proc.pid, signal.SIGTERM)
+                try:
+                    proc.wait(timeout=3)
+                except subprocess.TimeoutExpired:
+                    os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, OSError):
+            proc.kill()
+
+    def run(self,
+            cmd: List[str],
+            duration: float = None,
+            progress_callback: Optional[Callable] = None,
+            stats_callback: Optional[Callable] = None,
+            cancel_event: Optional[threading.Event] = None,
+            timeout: float = None,
+            check: bool = True,
+            capture_stdout: bool = False,
+            stdout_callback: Optional[Callable] = None) -> subprocess.CompletedProcess:
+        """
+        执行命令并等待结束
+
+        Args:
+            cmd: 命令参数列表（ffmpeg 命令会自动注入 -progress pipe:1）
+            duration: 预期输出时长（秒），用于计算百分比
+            progress_callback: 进度回调 (percent, message)，仅在 duration 已知时调用
+            stats_callback: 原始进度回调，参数为包含 percent/out_time/fps/speed/frame/done 的字典
+            cancel_event: 外部取消事件，置位后终止进程（默认使用 bind_cancel_event 绑定的事件）；
+                启动前已置位时不启动进程
+            timeout: 超时（秒），默认使用构造参数
+            check: 非零退出码时是否抛出 subprocess.CalledProcessError
+            capture_stdout: 是否捕获 stdout（如 ffprobe 输出）；开启时不解析进度
+            stdout_callback: 逐块接收 stdout 原始字节的回调（输出到 pipe:1 时使用）；开启时不解析进度，
+                回调抛出的异常会在进程结束后重新抛出
+
+        Returns:
+            subprocess.CompletedProcess: stdout 为捕获内容（文本）或 None，stderr 为末尾若干 KB 文本
+
+        Raises:
+            subprocess.CalledProcessError: check=True 且返回码非零
+            subprocess.TimeoutExpired: 超时
+            FFmpegCancelled: 被取消
+        """
+        raw_stdout = capture_stdout or stdout_callback is not None
+        run_cmd = list(cmd) if raw_stdout else self._with_progress(cmd)
+        timeout = timeout if timeout is not None else self.timeout
+        if cancel_event is None:
+            cancel_event = FFmpegRunner._default_cancel_event
+        self._check_cancelled(cmd, cancel_event)
+
+        proc = subprocess.Popen(
+            run_cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **self._popen_kwargs()
+        )
+        with self._lock:
+            self._active.add(proc)
+        with FFmpegRunner._registry_lock:
+            FFmpegRunner._registry[proc] = self
+
+        ring = _StderrRing(self.stderr_limit)
+        stdout_chunks = []
+        callback_errors = []
+        if capture_stdout:
+            out_reader = threading.Thread(
+                target=lambda: stdout_chunks.append(proc.stdout.read()), daemon=True)
+        elif stdout_callback is not None:
+            out_reader = threading.Thread(
+                target=self._read_stdout_chunks,
+                args=(proc.stdout, stdout_callback, callback_errors),
+                daemon=True)
+        else:
+            out_reader = threading.Thread(
+                target=self._read_progress,
+                args=(proc.stdout, duration, progress_callback, stats_callback),
+                daemon=True)
+        err_reader = threading.Thread(target=self._read_stderr, args=(proc.stderr, ring), daemon=True)
+        out_reader.start()
+        err_reader.start()
+
+        deadline = time.monotonic() + timeout if timeout else None
+        timed_out = False
+        interrupted = True
+        try:
+            while True:
+                try:
+                    proc.wait(timeout=0.1)
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
+                if cancel_event is not None and cancel_event.is_set():
+                    with self._lock:
+                        self._cancelled.add(proc)
+                    self._kill_tree(proc)
+                elif deadline is not None and time.monotonic() > deadline:
+                    timed_out = True
+                    self._kill_tree(proc)
+            interrupted = False
+        except BaseException:
+            # 等待被中断（如 KeyboardInterrupt）：不留下孤儿进程
+            self._kill_tree(proc)
+            raise
+        finally:
+            # 进程已退出时等读取线程读完管道（stdout_callback 的数据不能被截断）；
+            # 异常路径下进程已被终止，只做有限等待
+            join_timeout = 5 if interrupted else None
+            out_reader.join(timeout=join_timeout)
+            err_reader.join(timeout=join_timeout)
+            with self._lock:
+                self._active.discard(proc)
+                cancelled = proc in self._cancelled
+                self._cancelled.discard(proc)
+            with FFmpegRunner._registry_lock:
+                FFmpegRunner._registry.pop(proc, None)
+
+        stderr_text = ring.text()
+        if cancelled:
+            raise FFmpegCancelled(f"FFmpeg 任务已取消: {' '.join(cmd[:6])}...")
+        if timed_out:
+            raise subprocess.TimeoutExpired(cmd, timeout, stderr=stderr_text)
+        if callback_errors:
+            raise callback_errors[0]
+
+        stdout_text = None
+        if capture_stdout and stdout_chunks:
+            stdout_text = stdout_chunks[0].decode('utf-8', errors='replace')
+        result = subprocess.CompletedProcess(cmd, proc.returncode, stdout=stdout_text, stderr=stderr_text)
+        if check and proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, output=stdout_text, stderr=stderr_text)
+        return result
+
+    @contextlib.contextmanager
+    def open_stream(self, cmd: List[str], check: bool = True,
+                    cancel_event: Optional[threading.Event] = None) -> Iterator[subprocess.Popen]:
+        """
+        启动命令并交出进程，由调用方按需从 proc.stdout 读取原始字节（如 rawvideo 管道）
+
+        进程同样登记在取消注册表中；调用方提前退出（含生成器被关闭）时终止进程树。
+        读取期间由后台线程轮询取消事件，置位后终止进程，调用方读到管道结束。
+
+        Args:
+            cmd: 命令参数列表（不注入 -progress）
+            check: 正常读完后返回码非零时是否抛出 subprocess.CalledProcessError
+            cancel_event: 外部取消事件（默认使用 bind_cancel_event 绑定的事件）
+
+        Yields:
+            subprocess.Popen: 运行中的进程
+
+        Raises:
+            subprocess.CalledProcessError: check=True 且返回码非零
+            FFmpegCancelled: 被取消
+        """
+        if cancel_event is None:
+            cancel_event = FFmpegRunner._default_cancel_event
+        self._check_cancelled(cmd, cancel_event)
+        proc = subprocess.Popen(
+            list(cmd),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **self._popen_kwargs()
+        )
+        with self._lock:
+            self._active.add(proc)
+        with FFmpegRunner._registry_lock:
+            FFmpegRunner._registry[proc] = self
+
+        ring = _StderrRing(self.stderr_limit)
+        err_reader = threading.Thread(target=self._read_stderr, args=(proc.stderr, ring), daemon=True)
+        err_reader.start()
+        finished = threading.Event()
+        watcher = None
+        if cancel_event is not None:
+            def watch():
+                while not finished.wait(0.1):
+                    if cancel_event.is_set():
+                        with self._lock:
+                            self._cancelled.add(proc)
+                        self._kill_tree(proc)
+                        return
+            watcher = threading.Thread(target=watch, daemon=True)
+            watcher.start()
+        try:
+            yield proc
+        except BaseException as e:
+            self._kill_tree(proc)
+            with self._lock:
+                cancelled = proc in self._cancelled
+            if cancelled and not isinstance(e, (FFmpegCancelled, GeneratorExit, KeyboardInterrupt)):
+                # 进程被取消导致的读取异常（如末帧不完整）统一报告为取消
+                raise FFmpegCancelled(f"FFmpeg 任务已取消: {' '.join(cmd[:6])}...") from e
+            raise
+        finally:
+            finished.set()
+            proc.stdout.close()
+            proc.wait()
+            if watcher is not None:
+                watcher.join(timeout=5)
+            err_reader.join(timeout=5)
+            with self._lock:
+                self._active.discard(proc)
+                cancelled = proc in self._cancelled
+                self._cancelled.discard(proc)
+            with FFmpegRunner._registry_lock:
+                FFmpegRunner._registry.pop(proc, None)
+
+        if cancelled:
+            raise FFmpegCancelled(f"FFmpeg 任务已取消: {' '.join(cmd[:6])}...")
+        if check and proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=ring.text())
+
+    def cancel(self) -> None:
+        """取消本运行器当前所有在跑的进程"""
+        with self._lock:
+            procs = list(self._active)
+            self._cancelled.update(procs)
+        for proc in procs:
+            self._kill_tree(proc)
+
+    @classmethod
+    def cancel_all(cls) -> None:
+        """取消所有运行器当前在跑的进程（例如 GUI 的“停止”按钮）"""
+        with cls._registry_lock:
+            entries = list(cls._registry.items())
+        for proc, runner in entries:
+            with runner._lock:
+                runner._cancelled.add(proc)
+            cls._kill_tree(proc)
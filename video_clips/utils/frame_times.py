@@ -0,0 +1,53 @@
+"""
+帧时间戳日志
+解析 ffmpeg framemd5/framecrc 复用器写出的逐帧日志，并把请求的时间点映射到被选中的帧。
+"""
+import bisect
+from typing import Dict, Iterable, List
+
+
+def parse_frame_log(lines: Iterable[str]) -> List[float]:
+    """
+    解析 framemd5/framecrc 日志中 0 号流的帧时间戳
+
+    头部形如 "#tb 0: 1/12800"，数据行为 "stream, dts, pts, duration, size, hash"。
+
+    Args:
+        lines: 日志文本行
+
+    Returns:
+        List[float]: 按日志顺序排列的帧时间（秒）
+    """
+    time_base = 0.0
+    times = []
+    for line in lines:
+        if line.startswith('#tb 0:'):
+            num, _, den = line.split(':', 1)[1].strip().partition('/')
+            time_base = int(num) / int(den) if den else 0.0
+            continue
+        if line.startswith('#') or not time_base:
+            continue
+        parts = [p.strip() for p in line.split(',')]
+        if len(parts) >= 3 and parts[0] == '0' and parts[2].lstrip('-').isdigit():
+            times.append(int(parts[2]) * time_base)
+    return times
+
+
+def map_to_selected(selected: List[float], targets: Iterable[float], tolerance: float = 1e-6) -> Dict[float, int]:
+    """
+    把每个目标时间映射到第一个时间不早于它的选中帧
+
+    Args:
+        selected: 选中帧的时间（升序，秒），需与选帧时比较所用的时间戳一致（同一时间基）
+        targets: 目标时间（秒）
+        tolerance: 浮点比较容差（秒）
+
+    Returns:
+        Dict[float, int]: {目标时间: 选中帧下标}；晚于最后一帧的目标不在结果中
+    """
+    mapping = {}
+    for t in targets:
+        k = bisect.bisect_left(selected, t - tolerance)
+        if k < len(selected):
+            mapping[t] = k
+    return mapping
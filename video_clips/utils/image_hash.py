@@ -0,0 +1,76 @@
+"""
+感知哈希
+基于 numpy 向量化计算 dHash（差值哈希），用于在一批帧/图片中剔除近似重复项。
+"""
+import os
+from typing import List, Sequence
+
+import numpy as np
+
+
+def dhash_arrays(gray: np.ndarray) -> np.ndarray:
+    """
+    批量计算 dHash
+
+    Args:
+        gray: 形状为 (N, hash_size, hash_size + 1) 的灰度数组（已缩放）
+
+    Returns:
+        np.ndarray: 形状为 (N, hash_size * hash_size / 8) 的 uint8 位串
+    """
+    gray = np.asarray(gray, dtype=np.int16)
+    bits = gray[:, :, 1:] > gray[:, :, :-1]
+    return np.packbits(bits.reshape(bits.shape[0], -1), axis=1)
+
+
+def pil_can_read(path: str) -> bool:
+    """当前安装的 Pillow 是否能按扩展名读取该图片（如旧版本不支持 .avif）"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+    return os.path.splitext(path)[1].lower() in Image.registered_extensions()
+
+
+def dhash_images(paths: Sequence[str], hash_size: int = 8) -> np.ndarray:
+    """
+    计算图片文件的 dHash
+
+    Args:
+        paths: 图片路径列表
+        hash_size: 哈希边长（位数为 hash_size²）
+
+    Returns:
+        np.ndarray: 与 paths 一一对应的位串数组
+    """
+    from PIL import Image
+
+    gray = np.empty((len(paths), hash_size, hash_size + 1), dtype=np.uint8)
+    for i, path in enumerate(paths):
+        with Image.open(path) as img:
+            gray[i] = np.asarray(img.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR))
+    return dhash_arrays(gray)
+
+
+def hamming_distances(hashes: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """计算 target 与每个哈希的汉明距离"""
+    return np.unpackbits(np.bitwise_xor(hashes, target), axis=1).sum(axis=1)
+
+
+def dedup_indices(hashes: np.ndarray, max_distance: int) -> List[int]:
+    """
+    按顺序贪心去重：与任一已保留项距离 <= max_distance 的项被丢弃
+
+    Args:
+        hashes: dhash_arrays/dhash_images 的结果
+        max_distance: 视为重复的最大汉明距离
+
+    Returns:
+        List[int]: 保留项的下标（升序）
+    """
+    keep: List[int] = []
+    for i in range(len(hashes)):
+        if keep and hamming_distances(hashes[keep], hashes[i]).min() <= max_distance:
+            continue
+        keep.append(i)
+    return keep
@@ -0,0 +1,181 @@
+"""
+任务清单（断点续做）
+在输出目录旁写入 JSON 清单，记录计划的条目、参数哈希与完成状态；
+输出先写临时文件再重命名，清单本身也原子写入。相同参数重跑时跳过已完成的条目。
+逐条完成的写盘按 Settings.JOB_MANIFEST_SAVE_INTERVAL 节流，任务结束时需调用 flush()；
+未写盘的完成状态丢失时只会导致这些条目在续做时重做。
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+from config.settings import Settings
+from utils.probe_cache import ProbeCache
+
+
+class JobManifest:
+    """输出目录中的任务清单"""
+
+    def __init__(self, output_dir: str, job_name: str, params: Dict, resume: bool = True):
+        """
+        Args:
+            output_dir: 输出目录（清单保存在其中）
+            job_name: 任务名，决定清单文件名
+            params: 影响输出内容的参数（需可 JSON 序列化），变化后旧的完成状态作废
+            resume: 是否沿用已有清单中的完成状态
+        """
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, f".{job_name}.manifest.json")
+        self.params_hash = self.hash_params(params)
+        self.save_interval = Settings.JOB_MANIFEST_SAVE_INTERVAL
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self.data = {
+            'job': job_name,
+            'params': params,
+            'params_hash': self.params_hash,
+            'complete': False,
+            'items': {}
+        }
+        if resume:
+            self._load()
+
+    @staticmethod
+    def hash_params(params: Dict) -> str:
+        """参数哈希（键排序后的 JSON 的 SHA1）"""
+        text = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def source_identity(path: str) -> List:
+        """源文件身份（路径/大小/修改时间），放入 params 可使源文件变化时清单失效"""
+        ident = ProbeCache.file_identity(path)
+        return list(ident) if ident else [os.path.abspath(path)]
+
+    @staticmethod
+    def temp_path(output_path: str) -> str:
+        """输出的临时文件路径（保留扩展名，便于编码器识别格式）"""
+        directory, name = os.path.split(output_path)
+        stem, ext = os.path.splitext(name)
+        return os.path.join(directory, f".{stem}.part{ext}")
+
+    @staticmethod
+    def discard_temp(tmp_path: str) -> None:
+        """删除失败或取消的任务留下的临时文件"""
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"删除临时文件失败: {tmp_path}: {e}")
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取任务清单失败，将重新开始: {e}")
+            return
+        if data.get('params_hash') != self.params_hash:
+            print(f"任务参数已变化，忽略旧清单: {self.path}")
+            return
+        self.data['items'] = data.get('items', {})
+        self.data['complete'] = bool(data.get('complete', False))
+
+    def _save(self) -> None:
+        """原子写入清单"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def _save_throttled(self) -> None:
+        """距上次写盘不足 save_interval 时只标记为待写"""
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self._save()
+        else:
+            self._dirty = True
+
+    def flush(self) -> None:
+        """写入尚未落盘的变更"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def plan(self, items: Dict[str, str]) -> None:
+        """
+        登记计划条目
+
+        Args:
+            items: {条目键: 输出路径}
+        """
+        with self._lock:
+            for key, output in items.items():
+                entry = self.data['items'].get(key)
+                if entry is None or entry.get('output') != output:
+                    self.data['items'][key] = {'output': output, 'status': 'pending'}
+                    self.data['complete'] = False
+            self._save()
+
+    def is_done(self, key: str) -> bool:
+        """条目已完成且输出文件仍存在"""
+        with self._lock:
+            entry = self.data['items'].get(key)
+        return bool(entry) and entry.get('status') == 'done' and os.path.exists(entry.get('output', ''))
+
+    def output_of(self, key: str) -> Optional[str]:
+        """条目的输出路径"""
+        with self._lock:
+            entry = self.data['items'].get(key)
+        return entry.get('output') if entry else None
+
+    def commit(self, key: str, temp_path: str, output_path: str) -> str:
+        """
+        把临时输出重命名为最终文件并标记完成
+
+        Returns:
+            str: 最终输出路径
+        """
+        os.replace(temp_path, output_path)
+        with self._lock:
+            self.data['items'][key] = {'output': output_path, 'status': 'done', 'finished_at': time.time()}
+            self._save_throttled()
+        return output_path
+
+    def record(self, items: Dict[str, str], complete: bool = False) -> None:
+        """
+        批量登记已直接写出的输出为完成
+
+        Args:
+            items: {条目键: 输出路径}
+            complete: 是否同时把整个任务标记为完成（立即写盘，否则按节流写盘）
+        """
+        now = time.time()
+        with self._lock:
+            for key, output in items.items():
+                self.data['items'][key] = {'output': output, 'status': 'done', 'finished_at': now}
+            if complete:
+                self.data['complete'] = True
+                self._save()
+            else:
+                self._save_throttled()
+
+    def is_complete(self) -> bool:
+        """任务已标记完成（record(..., complete=True)）"""
+        with self._lock:
+            return bool(self.data.get('complete'))
+
+    def completed(self) -> List[str]:
+        """已完成条目的输出路径（按登记顺序）"""
+        with self._lock:
+            entries = list(self.data['items'].values())
+        return [e['output'] for e in entries if e.get('status') == 'done' and os.path.exists(e['output'])]
@@ -0,0 +1,235 @@
+"""
+关键帧索引
+对每个源文件用 ffprobe 读取视频包标志一次，得到关键帧时间戳数组并以 .npy 持久化，
+按 路径+大小+修改时间 识别文件；供切割/组合时把切点对齐到关键帧，以便保持无重编码拷贝。
+时间戳已减去容器的 start_time，与输入端 -ss 使用同一时间轴。
+"""
+import os
+import hashlib
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import Settings
+from utils.probe_cache import ProbeCache
+from utils.ffmpeg_runner import FFmpegRunner
+
+
+class KeyframeIndex:
+    """关键帧时间戳索引（磁盘 .npy 缓存 + 进程内缓存）"""
+
+    def __init__(self, index_dir: str = None, runner: FFmpegRunner = None):
+        """
+        Args:
+            index_dir: 索引存放目录，默认 Settings.KEYFRAME_INDEX_DIR
+            runner: 执行 ffprobe 的运行器
+        """
+        self.settings = Settings()
+        self.index_dir = index_dir or self.settings.KEYFRAME_INDEX_DIR
+        self.runner = runner or FFmpegRunner()
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _index_path(self, ident: Tuple[str, int, int]) -> str:
+        """由文件身份生成索引文件路径"""
+        # v2：时间戳相对于容器 start_time（旧索引为绝对 pts，不再复用）
+        key = hashlib.sha1(f"{ident[0]}|{ident[1]}|{ident[2]}|v2".encode('utf-8')).hexdigest()
+        return os.path.join(self.index_dir, f"{key}.npy")
+
+    def _start_time(self, video_path: str) -> float:
+        """容器的 start_time（输入端 -ss 以此为 0 点）"""
+        cmd = [
+            'ffprobe', '-v', 'error', '-show_entries', 'format=start_time',
+            '-of', 'csv=p=0', video_path
+        ]
+        result = self.runner.run(cmd, capture_stdout=True)
+        try:
+            return float((result.stdout or '').strip() or 0.0)
+        except ValueError:
+            return 0.0
+
+    def _build(self, video_path: str) -> np.ndarray:
+        """提取全部关键帧时间戳（相对于容器 start_time）"""
+        times, _ = self._read_flags(video_path)
+        start_time = self._start_time(video_path)
+        return np.unique(np.asarray(times, dtype=np.float64) - start_time)
+
+    def _read_flags(self, video_path: str, read_intervals: Optional[str] = None) -> Tuple[List[float], Optional[float]]:
+        """读取视频流的包标志（不解码），返回 (关键帧 pts 列表, 最后一个包的 pts)"""
+        cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0']
+        if read_intervals:
+            cmd += ['-read_intervals', read_intervals]
+        cmd += ['-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', video_path]
+        result = self.runner.run(cmd, capture_stdout=True)
+
+        times = []
+        last_pts = None
+        for line in (result.stdout or '').splitlines():
+            pts, _, flags = line.partition(',')
+            try:
+                value = float(pts)
+            except ValueError:
+                continue
+            last_pts = value if last_pts is None else max(last_pts, value)
+            if 'K' in flags:
+                times.append(value)
+        return times, last_pts
+
+    def get(self, video_path: str) -> np.ndarray:
+        """
+        获取关键帧时间戳（升序，秒）
+
+        Args:
+            video_path: 视频文件路径
+
+        Returns:
+            np.ndarray: float64 时间戳数组；无法识别时为空数组
+        """
+        ident = ProbeCache.file_identity(video_path)
+        if ident is None:
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+
+        with self._lock:
+            cached = self._memory.get(ident)
+        if cached is not None:
+            return cached
+
+        index_path = self._index_path(ident)
+        keyframes = None
+        if os.path.exists(index_path):
+            try:
+                keyframes = np.load(index_path)
+            except (OSError, ValueError) as e:
+                print(f"读取关键帧索引失败，将重建: {e}")
+
+        if keyframes is None:
+            keyframes = self._build(video_path)
+            os.makedirs(self.index_dir, exist_ok=True)
+            tmp_path = index_path + '.tmp.npy'
+            np.save(tmp_path, keyframes)
+            os.replace(tmp_path, index_path)
+
+        with self._lock:
+            self._memory[ident] = keyframes
+        return keyframes
+
+    def snap(self, video_path: str, timestamp: float, mode: str = 'nearest') -> float:
+        """
+        将时间点对齐到关键帧
+
+        Args:
+            video_path: 视频文件路径
+            timestamp: 时间点（秒）
+            mode: 'before'（不晚于该点）、'after'（不早于该点）、'nearest'
+
+        Returns:
+            float: 对齐后的时间点；没有关键帧信息时原样返回
+        """
+        keyframes = self.get(video_path)
+        return self._snap(keyframes, timestamp, mode)
+
+    @staticmethod
+    def _snap(keyframes: np.ndarray, timestamp: float, mode: str) -> float:
+        if keyframes.size == 0:
+            return timestamp
+        pos = int(np.searchsorted(keyframes, timestamp, side='right'))
+        before = keyframes[pos - 1] if pos > 0 else keyframes[0]
+        after = keyframes[pos] if pos < keyframes.size else keyframes[-1]
+        if mode == 'before':
+            return float(before)
+        if mode == 'after':
+            return float(after if before < timestamp else before)
+        return float(before if timestamp - before <= after - timestamp else after)
+
+    def snap_ranges(self,
+                    video_path: str,
+                    ranges: List[Tuple[float, float]],
+                    total_duration: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        将一组 (开始, 结束) 区间的边界对齐到最近的关键帧，丢弃对齐后为空的区间
+
+        GOP 长于区间时多个区间可能对齐到同一关键帧：起点相同的区间只保留最长的一个，
+        起点早于上一个保留区间的被丢弃，结果按起点严格递增。
+
+        Args:
+            video_path: 视频文件路径
+            ranges: 时间区间列表
+            total_duration: 视频总时长；结束点等于总时长时保持不变
+
+        Returns:
+            List[Tuple[float, float]]: 对齐后的区间列表（顺序不变）
+        """
+        keyframes = self.get(video_path)
+        snapped = []
+        for start, end in ranges:
+            new_start = self._snap(keyframes, start, 'nearest')
+            if total_duration is not None and end >= total_duration:
+                new_end = end
+            else:
+                new_end = self._snap(keyframes, end, 'nearest')
+            if new_end <= new_start:
+                continue
+            if snapped and new_start <= snapped[-1][0]:
+                if new_start == snapped[-1][0] and new_end > snapped[-1][1]:
+                    snapped[-1] = (new_start, new_end)
+                continue
+            snapped.append((new_start, new_end))
+        return snapped
+
+    def gop_stats(self, video_path: str) -> Tuple[float, float]:
+        """
+        统计关键帧间隔
+
+        Returns:
+            Tuple[float, float]: (平均间隔, 最大间隔)，关键帧不足两个时为 (0, 0)
+        """
+        keyframes = self.get(video_path)
+        if keyframes.size < 2:
+            return (0.0, 0.0)
+        gaps = np.diff(keyframes)
+        return (float(gaps.mean()), float(gaps.max()))
+
+    def estimate_gop(self, video_path: str, window: float = None) -> float:
+        """
+        估计平均关键帧间隔，不为此建立完整索引
+
+        已有完整索引（内存或磁盘）时直接统计；否则只读取开头 window 秒的包标志。
+        窗口内只有一个关键帧时返回其后已读到的时长（GOP 的下限）。
+
+        Args:
+            video_path: 视频文件路径
+            window: 读取的时长（秒），默认 Settings.KEYFRAME_GOP_PROBE_WINDOW
+
+        Returns:
+            float: 平均间隔（秒），无法估计时为 0
+        """
+        ident = ProbeCache.file_identity(video_path)
+        if ident is None:
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        with self._lock:
+            indexed = ident in self._memory
+        if indexed or os.path.exists(self._index_path(ident)):
+            return self.gop_stats(video_path)[0]
+
+        window = window or self.settings.KEYFRAME_GOP_PROBE_WINDOW
+        times, last_pts = self._read_flags(video_path, f"%+{window:g}")
+        times = sorted(set(times))
+        if len(times) >= 2:
+            return (times[-1] - times[0]) / (len(times) - 1)
+        if times and last_pts is not None:
+            return max(0.0, last_pts - times[0])
+        return 0.0
+
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+
+def get_keyframe_index() -> KeyframeIndex:
+    """获取进程内共享的关键帧索引实例"""
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = KeyframeIndex()
+        return _shared_index
@@ -0,0 +1,251 @@
+"""
+MP4/MOV 进程内探测
+通过 mmap 直接读取 moov/mvhd/trak(tkhd/mdhd/hdlr/stsd/stts/stsz) 原子，
+获取时长、分辨率、帧率、编码器等信息，无需启动 ffprobe 子进程。
+返回结构与 VideoUtils.get_video_info_ffprobe 一致；无法解析时返回 None，由调用方回退 ffprobe。
+"""
+import os
+import mmap
+import struct
+from array import array
+import sys
+from typing import Dict, Iterator, Optional, Tuple
+
+
+# 与 ffprobe 对 ISO BMFF 家族容器报告的 format_name 保持一致
+MP4_FORMAT_NAME = 'mov,mp4,m4a,3gp,3g2,mj2'
+
+# 需要下钻的容器原子
+_CONTAINER_BOXES = (b'moov', b'trak', b'mdia', b'minf', b'stbl')
+
+# sample entry 四字码 -> ffprobe codec_name
+_CODEC_NAMES = {
+    b'avc1': 'h264', b'avc3': 'h264',
+    b'hvc1': 'hevc', b'hev1': 'hevc',
+    b'av01': 'av1', b'vp09': 'vp9', b'vp08': 'vp8',
+    b'mp4v': 'mpeg4', b'jpeg': 'mjpeg', b'mjpa': 'mjpeg',
+    b'apch': 'prores', b'apcn': 'prores', b'apcs': 'prores',
+    b'apco': 'prores', b'ap4h': 'prores', b'ap4x': 'prores',
+    b'mp4a': 'aac', b'ac-3': 'ac3', b'ec-3': 'eac3',
+    b'Opus': 'opus', b'fLaC': 'flac', b'alac': 'alac',
+    b'sowt': 'pcm_s16le', b'twos': 'pcm_s16be', b'lpcm': 'pcm_s16le',
+    b'.mp3': 'mp3',
+}
+
+
+def _iter_boxes(buf, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """
+    遍历 [start, end) 区间内的原子
+
+    Yields:
+        Tuple[bytes, int, int]: (原子类型, 负载起始偏移, 原子结束偏移)
+    """
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', buf, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            size = struct.unpack_from('>Q', buf, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _find_box(buf, start: int, end: int, box_type: bytes) -> Optional[Tuple[int, int]]:
+    """在区间内查找第一个指定类型的原子，返回 (负载起始, 结束)"""
+    for t, payload, box_end in _iter_boxes(buf, start, end):
+        if t == box_type:
+            return payload, box_end
+    return None
+
+
+def _parse_time_header(buf, payload: int) -> Tuple[int, int]:
+    """解析 mvhd/mdhd 的 (timescale, duration)"""
+    version = buf[payload]
+    if version == 1:
+        return struct.unpack_from('>IQ', buf, payload + 20)
+    return struct.unpack_from('>II', buf, payload + 12)
+
+
+def _parse_tkhd_size(buf, payload: int) -> Tuple[int, int]:
+    """解析 tkhd 中的显示宽高（16.16 定点数）"""
+    version = buf[payload]
+    offset = payload + (88 if version == 1 else 76)
+    width, height = struct.unpack_from('>II', buf, offset)
+    return width >> 16, height >> 16
+
+
+def _parse_stts_fps(buf, payload: int, timescale: int) -> float:
+    """根据 stts 中占比最多的采样间隔计算帧率（对应 ffprobe r_frame_rate）"""
+    entry_count = struct.unpack_from('>I', buf, payload + 4)[0]
+    best_count, best_delta = 0, 0
+    offset = payload + 8
+    for _ in range(entry_count):
+        count, delta = struct.unpack_from('>II', buf, offset)
+        if count > best_count and delta > 0:
+            best_count, best_delta = count, delta
+        offset += 8
+    if not best_delta or not timescale:
+        return 0.0
+    return timescale / best_delta
+
+
+def _parse_stsz_total(buf, payload: int, box_end: int) -> int:
+    """累加 stsz 中所有采样大小（字节）"""
+    sample_size, sample_count = struct.unpack_from('>II', buf, payload + 4)
+    if sample_size:
+        return sample_size * sample_count
+    table_start = payload + 12
+    table_end = min(table_start + sample_count * 4, box_end)
+    sizes = array('I')
+    sizes.frombytes(buf[table_start:table_end])
+    if sys.byteorder == 'little':
+        sizes.byteswap()
+    return sum(sizes)
+
+
+def _parse_track(buf, start: int, end: int) -> Optional[Dict]:
+    """解析单个 trak 原子"""
+    track: Dict = {}
+    tkhd = _find_box(buf, start, end, b'tkhd')
+    if tkhd:
+        track['width'], track['height'] = _parse_tkhd_size(buf, tkhd[0])
+
+    mdia = _find_box(buf, start, end, b'mdia')
+    if not mdia:
+        return None
+    mdhd = _find_box(buf, mdia[0], mdia[1], b'mdhd')
+    hdlr = _find_box(buf, mdia[0], mdia[1], b'hdlr')
+    if not mdhd or not hdlr:
+        return None
+    track['timescale'], track['duration'] = _parse_time_header(buf, mdhd[0])
+    track['handler'] = bytes(buf[hdlr[0] + 8:hdlr[0] + 12])
+
+    minf = _find_box(buf, mdia[0], mdia[1], b'minf')
+    stbl = _find_box(buf, minf[0], minf[1], b'stbl') if minf else None
+    if not stbl:
+        return track
+
+    stsd = _find_box(buf, stbl[0], stbl[1], b'stsd')
+    if stsd and struct.unpack_from('>I', buf, stsd[0] + 4)[0] > 0:
+        entry = stsd[0] + 8
+        fourcc = bytes(buf[entry + 4:entry + 8])
+        track['fourcc'] = fourcc
+        fields = entry + 16  # 跳过 size/format/reserved(6)/data_reference_index(2)
+        if track['handler'] == b'vide':
+            w, h = struct.unpack_from('>HH', buf, fields + 16)
+            track['coded_width'], track['coded_height'] = w, h
+        elif track['handler'] == b'soun':
+            version = struct.unpack_from('>H', buf, fields)[0]
+            channels = struct.unpack_from('>H', buf, fields + 8)[0]
+            sample_rate = struct.unpack_from('>I', buf, fields + 16)[0] >> 16
+            if version == 2:
+                # QuickTime SoundDescriptionV2: 实际采样率为 float64，声道数在其后
+                sample_rate = int(struct.unpack_from('>d', buf, fields + 24)[0])
+                channels = struct.unpack_from('>I', buf, fields + 32)[0]
+            track['channels'], track['sample_rate'] = channels, sample_rate
+
+    stts = _find_box(buf, stbl[0], stbl[1], b'stts')
+    if stts and track['handler'] == b'vide':
+        track['fps'] = _parse_stts_fps(buf, stts[0], track['timescale'])
+
+    stsz = _find_box(buf, stbl[0], stbl[1], b'stsz')
+    if stsz:
+        track['bytes'] = _parse_stsz_total(buf, stsz[0], stsz[1])
+    return track
+
+
+def _stream_bitrate(track: Dict) -> int:
+    """由采样总字节数与轨道时长估算码率"""
+    if not track.get('bytes') or not track.get('duration') or not track.get('timescale'):
+        return 0
+    seconds = track['duration'] / track['timescale']
+    return int(track['bytes'] * 8 / seconds) if seconds > 0 else 0
+
+
+def probe_mp4(path: str) -> Optional[Dict]:
+    """
+    进程内解析 MP4/MOV 文件信息
+
+    Args:
+        path: 媒体文件路径
+
+    Returns:
+        Optional[Dict]: 与 ffprobe 后端相同结构的信息字典；非 ISO BMFF、碎片化 MP4
+        或结构异常时返回 None
+    """
+    try:
+        filesize = os.path.getsize(path)
+        if filesize < 16:
+            return None
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            moov = _find_box(buf, 0, filesize, b'moov')
+            if not moov:
+                return None
+            mvhd = _find_box(buf, moov[0], moov[1], b'mvhd')
+            if not mvhd:
+                return None
+            timescale, duration = _parse_time_header(buf, mvhd[0])
+            if not timescale or not duration:
+                # 碎片化 MP4 的时长在 moof 中，交给 ffprobe
+                return None
+
+            video_track = None
+            audio_track = None
+            for box_type, payload, box_end in _iter_boxes(buf, moov[0], moov[1]):
+                if box_type != b'trak':
+                    continue
+                track = _parse_track(buf, payload, box_end)
+                if track is None:
+                    continue
+                if track['handler'] == b'vide' and video_track is None:
+                    video_track = track
+                elif track['handler'] == b'soun' and audio_track is None:
+                    audio_track = track
+    except (OSError, ValueError, struct.error, IndexError):
+        return None
+
+    if video_track is None and audio_track is None:
+        return None
+
+    duration_s = duration / timescale
+    info: Dict = {
+        'filename': os.path.basename(path),
+        'filepath': path,
+        'filesize': filesize,
+        'duration': duration_s,
+        'bitrate': int(filesize * 8 / duration_s) if duration_s > 0 else 0,
+        'format_name': MP4_FORMAT_NAME
+    }
+
+    if video_track is not None:
+        fourcc = video_track.get('fourcc', b'')
+        info['video'] = {
+            'codec': _CODEC_NAMES.get(fourcc, fourcc.decode('latin-1').strip().lower()),
+            'width': video_track.get('coded_width') or video_track.get('width', 0),
+            'height': video_track.get('coded_height') or video_track.get('height', 0),
+            'fps': video_track.get('fps', 0.0),
+            'bitrate': _stream_bitrate(video_track),
+            'pixel_format': ''
+        }
+    else:
+        info['video'] = None
+
+    if audio_track is not None:
+        fourcc = audio_track.get('fourcc', b'')
+        info['audio'] = {
+            'codec': _CODEC_NAMES.get(fourcc, fourcc.decode('latin-1').strip().lower()),
+            'sample_rate': audio_track.get('sample_rate', 0),
+            'channels': audio_track.get('channels', 0),
+            'bitrate': _stream_bitrate(audio_track)
+        }
+    else:
+        info['audio'] = None
+
+    return info
@@ -0,0 +1,185 @@
+"""
+媒体探测缓存
+将 ffprobe / MoviePy 的探测结果持久化到 SQLite，按 路径+大小+修改时间 作为文件身份，
+避免列表刷新、重新扫描、组合选片时对同一文件反复探测。
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+from config.settings import Settings
+
+
+class ProbeCache:
+    """基于 SQLite 的媒体探测结果缓存（线程安全）"""
+
+    def __init__(self, db_path: str = None, max_entries: int = None):
+        """
+        Args:
+            db_path: 数据库文件路径，默认 Settings.PROBE_CACHE_PATH
+            max_entries: 最大缓存条目数，超出后按最近访问时间淘汰
+        """
+        self.settings = Settings()
+        self.db_path = db_path or self.settings.PROBE_CACHE_PATH
+        self.max_entries = max_entries if max_entries is not None else self.settings.PROBE_CACHE_MAX_ENTRIES
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """延迟打开数据库连接并建表"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS probe ('
+                ' path TEXT NOT NULL,'
+                ' kind TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' mtime_ns INTEGER NOT NULL,'
+                ' data TEXT NOT NULL,'
+                ' last_access REAL NOT NULL,'
+                ' PRIMARY KEY (path, kind))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_probe_access ON probe(last_access)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def file_identity(path: str) -> Optional[Tuple[str, int, int]]:
+        """
+        获取文件身份 (绝对路径, 大小, 修改时间ns)
+
+        Returns:
+            Optional[Tuple[str, int, int]]: 文件不存在时返回 None
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+    def get(self, path: str, kind: str = 'ffprobe') -> Optional[Dict]:
+        """
+        读取缓存；文件大小或修改时间变化时视为失效并删除旧记录
+
+        Args:
+            path: 媒体文件路径
+            kind: 结果类别（如 'ffprobe', 'native', 'moviepy'）
+
+        Returns:
+            Optional[Dict]: 缓存的信息字典，未命中返回 None
+        """
+        ident = self.file_identity(path)
+        if ident is None:
+            return None
+        abspath, size, mtime_ns = ident
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    'SELECT size, mtime_ns, data FROM probe WHERE path=? AND kind=?',
+                    (abspath, kind)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[0] != size or row[1] != mtime_ns:
+                    conn.execute('DELETE FROM probe WHERE path=? AND kind=?', (abspath, kind))
+                    conn.commit()
+                    return None
+                conn.execute(
+                    'UPDATE probe SET last_access=? WHERE path=? AND kind=?',
+                    (time.time(), abspath, kind)
+                )
+                conn.commit()
+            return json.loads(row[2])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"读取探测缓存失败: {e}")
+            return None
+
+    def put(self, path: str, info: Dict, kind: str = 'ffprobe') -> None:
+        """
+        写入缓存
+
+        Args:
+            path: 媒体文件路径
+            info: 探测得到的信息字典（需可 JSON 序列化）
+            kind: 结果类别
+        """
+        ident = self.file_identity(path)
+        if ident is None or info is None:
+            return
+        abspath, size, mtime_ns = ident
+
+        try:
+            data = json.dumps(info, ensure_ascii=False)
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO probe (path, kind, size, mtime_ns, data, last_access) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (abspath, kind, size, mtime_ns, data, time.time())
+                )
+                self._enforce_limit(conn)
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"写入探测缓存失败: {e}")
+
+    def _enforce_limit(self, conn: sqlite3.Connection) -> None:
+        """超出容量上限时淘汰最久未访问的条目"""
+        if not self.max_entries or self.max_entries <= 0:
+            return
+        count = conn.execute('SELECT COUNT(*) FROM probe').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                'DELETE FROM probe WHERE rowid IN '
+                '(SELECT rowid FROM probe ORDER BY last_access ASC LIMIT ?)',
+                (overflow,)
+            )
+
+    def invalidate(self, path: str) -> None:
+        """删除某个文件的全部缓存记录"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute('DELETE FROM probe WHERE path=?', (os.path.abspath(path),))
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"清除探测缓存失败: {e}")
+
+    def clear(self) -> None:
+        """清空全部缓存"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute('DELETE FROM probe')
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"清空探测缓存失败: {e}")
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_probe_cache() -> ProbeCache:
+    """获取进程内共享的探测缓存实例"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ProbeCache()
+        return _shared_cache
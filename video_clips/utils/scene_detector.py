@@ -0,0 +1,110 @@
+"""
+镜头切换检测
+对缩小后的代理画面做一次解码，用 ffmpeg 的 select='gt(scene,T)' 找出镜头切换时间点，
+结果按 文件身份+阈值 存入探测缓存，重复切割同一文件时无需再次解码。
+"""
+import os
+import tempfile
+import threading
+from typing import Callable, List, Optional
+
+from config.settings import Settings
+from utils.probe_cache import ProbeCache, get_probe_cache
+from utils.ffmpeg_runner import FFmpegRunner
+from utils.frame_times import parse_frame_log
+
+
+class SceneDetector:
+    """镜头切换点检测（结果缓存于 ProbeCache）"""
+
+    def __init__(self, probe_cache: Optional[ProbeCache] = None, runner: FFmpegRunner = None):
+        """
+        Args:
+            probe_cache: 结果缓存，默认使用共享探测缓存（Settings.PROBE_CACHE_ENABLED 关闭时不缓存）
+            runner: 执行 ffmpeg 的运行器
+        """
+        self.settings = Settings()
+        if probe_cache is None and self.settings.PROBE_CACHE_ENABLED:
+            probe_cache = get_probe_cache()
+        self.probe_cache = probe_cache
+        self.runner = runner or FFmpegRunner()
+
+    @staticmethod
+    def _cache_kind(threshold: float) -> str:
+        return f"scene:{threshold:.3f}"
+
+    def _detect(self, video_path: str, threshold: float, duration: float = None,
+                progress_callback: Optional[Callable] = None) -> List[float]:
+        """
+        解码代理画面并输出被选中帧的时间戳
+
+        选中帧通过 framemd5 复用器写到临时文件（每帧一行、带时间基），
+        避免依赖 stderr 日志（运行器只保留末尾若干 KB）。
+        """
+        os.makedirs(self.settings.TEMP_DIR, exist_ok=True)
+        fd, list_path = tempfile.mkstemp(prefix='scenes_', suffix='.txt', dir=self.settings.TEMP_DIR)
+        os.close(fd)
+        cmd = [
+            'ffmpeg', '-y', '-an', '-sn', '-dn', '-i', video_path,
+            '-vf', f"scale={self.settings.SCENE_PROXY_WIDTH}:-2,select='gt(scene,{threshold})'",
+            '-vsync', 'vfr', '-f', 'framemd5', list_path
+        ]
+        try:
+            self.runner.run(cmd, duration=duration, progress_callback=progress_callback)
+            with open(list_path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        finally:
+            if os.path.exists(list_path):
+                os.remove(list_path)
+
+        boundaries = parse_frame_log(lines)
+        return sorted(t for t in set(boundaries) if t > 0)
+
+    def detect(self,
+               video_path: str,
+               threshold: float = None,
+               duration: float = None,
+               progress_callback: Optional[Callable] = None,
+               use_cache: bool = True) -> List[float]:
+        """
+        获取镜头切换时间点
+
+        Args:
+            video_path: 视频文件路径
+            threshold: 场景变化阈值 (0-1)，默认 Settings.SCENE_THRESHOLD
+            duration: 视频时长（秒），用于进度百分比
+            progress_callback: 进度回调函数
+            use_cache: 是否读写缓存
+
+        Returns:
+            List[float]: 升序的切换时间点（秒），不含 0
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        threshold = threshold if threshold is not None else self.settings.SCENE_THRESHOLD
+        kind = self._cache_kind(threshold)
+
+        cache = self.probe_cache if use_cache else None
+        if cache is not None:
+            cached = cache.get(video_path, kind)
+            if cached is not None:
+                return list(cached.get('boundaries', []))
+
+        print(f"检测镜头切换: {video_path} (阈值 {threshold})")
+        boundaries = self._detect(video_path, threshold, duration, progress_callback)
+        if cache is not None:
+            cache.put(video_path, {'boundaries': boundaries}, kind)
+        return boundaries
+
+
+_shared_detector = None
+_shared_lock = threading.Lock()
+
+
+def get_scene_detector() -> SceneDetector:
+    """获取进程内共享的镜头检测实例"""
+    global _shared_detector
+    with _shared_lock:
+        if _shared_detector is None:
+            _shared_detector = SceneDetector()
+        return _shared_detector
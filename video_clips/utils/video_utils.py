@@ -3,8 +3,12 @@
 提供视频信息获取、格式转换等功能
 """
 import os
+import time
+import threading
 import subprocess
-from typing import Dict, Optional, Tuple, List
+import itertools
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Optional, Tuple, List, Callable, Iterator
 import json
 try:
     from moviepy.editor import VideoFileClip
@@ -13,13 +17,53 @@ except ImportError:
     HAS_MOVIEPY = False
     
 from config.settings import Settings
+from utils.probe_cache import ProbeCache, get_probe_cache
+from utils.mp4_probe import probe_mp4
+from utils.ffmpeg_runner import FFmpegRunner
+
+
+class ProbeFields:
+    """轻量探测结果（仅包含按需探测的字段）"""
+    
+    __slots__ = ('path', 'duration', 'width', 'height', 'fps', 'codec')
+    
+    # 可选字段 -> ffprobe -show_entries 项
+    FIELD_ENTRIES = {
+        'duration': ('format', 'duration'),
+        'width': ('stream', 'width'),
+        'height': ('stream', 'height'),
+        'fps': ('stream', 'r_frame_rate'),
+        'codec': ('stream', 'codec_name'),
+    }
+    
+    def __init__(self, path: str, duration: float = 0.0, width: int = 0, height: int = 0,
+                 fps: float = 0.0, codec: str = ''):
+        self.path = path
+        self.duration = duration
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.codec = codec
+    
+    def __repr__(self) -> str:
+        return (f"ProbeFields(path={self.path!r}, duration={self.duration}, width={self.width}, "
+                f"height={self.height}, fps={self.fps}, codec={self.codec!r})")
+
+
+# 同一文件短时间内的按需探测合并：{(绝对路径, 大小, mtime_ns): (时间戳, 字段值)}
+_field_memo: Dict[Tuple[str, int, int], Tuple[float, Dict]] = {}
+_field_memo_lock = threading.Lock()
 
 
 class VideoUtils:
     """视频处理工具类"""
     
-    def __init__(self):
+    def __init__(self, probe_cache: Optional[ProbeCache] = None):
         self.settings = Settings()
+        if probe_cache is None and self.settings.PROBE_CACHE_ENABLED:
+            probe_cache = get_probe_cache()
+        self.probe_cache = probe_cache
+        self.runner = FFmpegRunner()
     
     def get_video_info_ffprobe(self, video_path: str) -> Optional[Dict]:
         """
@@ -137,21 +181,80 @@ class VideoUtils:
             print(f"获取视频信息失败 (MoviePy): {e}")
             return None
     
-    def get_video_info(self, video_path: str, method: str = 'ffprobe') -> Optional[Dict]:
+    def get_video_info_native(self, video_path: str) -> Optional[Dict]:
         """
-        获取视频信息的统一接口
+        进程内解析 MP4/MOV 容器获取视频信息（不启动 ffprobe），无法解析时回退 ffprobe
         
         Args:
             video_path: 视频文件路径
-            method: 获取方法 ('ffprobe', 'moviepy')
             
         Returns:
             Optional[Dict]: 视频信息字典
         """
+        if not os.path.exists(video_path):
+            return None
+        
+        ext = os.path.splitext(video_path)[1].lower()
+        if ext in self.settings.NATIVE_PROBE_FORMATS:
+            info = probe_mp4(video_path)
+            if info is not None:
+                return info
+        return self.get_video_info_ffprobe(video_path)
+    
+    def get_video_info(self, video_path: str, method: str = 'auto', use_cache: bool = True) -> Optional[Dict]:
+        """
+        获取视频信息的统一接口（优先读取持久化探测缓存）
+        
+        Args:
+            video_path: 视频文件路径
+            method: 获取方法 ('auto', 'native', 'ffprobe', 'moviepy')；
+                    'auto' 与 'native' 对 MP4/MOV 进程内解析，其余容器回退 ffprobe
+            use_cache: 是否使用探测缓存
+            
+        Returns:
+            Optional[Dict]: 视频信息字典
+        """
+        # 进程内解析结果单独缓存，保证 method='ffprobe' 只返回 ffprobe 的探测结果；
+        # 'auto'/'native' 可直接复用已有的 ffprobe 结果
         if method == 'moviepy' and HAS_MOVIEPY:
-            return self.get_video_info_moviepy(video_path)
+            kind, lookup = 'moviepy', ('moviepy',)
+        elif method == 'ffprobe':
+            kind, lookup = 'ffprobe', ('ffprobe',)
         else:
-            return self.get_video_info_ffprobe(video_path)
+            kind, lookup = 'native', ('native', 'ffprobe')
+        cache = self.probe_cache if use_cache else None
+        
+        if cache is not None:
+            for cached_kind in lookup:
+                info = cache.get(video_path, cached_kind)
+                if info is not None:
+                    info['filepath'] = video_path
+                    return info
+        
+        if kind == 'moviepy':
+            info = self.get_video_info_moviepy(video_path)
+        elif kind == 'ffprobe':
+            info = self.get_video_info_ffprobe(video_path)
+        else:
+            info = self.get_video_info_native(video_path)
+        
+        if info is not None and cache is not None:
+            cache.put(video_path, info, kind)
+        return info
+    
+    def invalidate_cache(self, video_path: str = None) -> None:
+        """
+        使探测缓存失效
+        
+        Args:
+            video_path: 指定文件路径；为 None 时清空全部缓存
+        """
+        if self.probe_cache is None:
+            return
+        if video_path is None:
+            self.probe_cache.clear()
+        else:
+            self.probe_cache.invalidate(video_path)
     
     def _parse_fps(self, fps_str: str) -> float:
         """解析帧率字符串"""
@@ -170,7 +273,8 @@ class VideoUtils:
                            target_format: str = 'mp4',
                            video_codec: str = None,
                            audio_codec: str = None,
-                           quality: str = 'medium') -> bool:
+                           quality: str = 'medium',
+                           progress_callback: Optional[Callable] = None) -> bool:
         """
         转换视频格式
         
@@ -181,6 +285,7 @@ class VideoUtils:
             video_codec: 视频编码器
             audio_codec: 音频编码器
             quality: 质量等级 ('low', 'medium', 'high')
+            progress_callback: 进度回调函数
             
         Returns:
             bool: 是否转换成功
@@ -214,7 +319,7 @@ class VideoUtils:
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            self.runner.run(cmd, duration=self.get_video_duration(input_path), progress_callback=progress_callback)
             return True
         except subprocess.CalledProcessError as e:
             print(f"视频格式转换失败: {e}")
@@ -225,7 +330,8 @@ class VideoUtils:
                     output_path: str,
                     width: int,
                     height: int,
-                    maintain_aspect: bool = True) -> bool:
+                    maintain_aspect: bool = True,
+                    progress_callback: Optional[Callable] = None) -> bool:
         """
         调整视频尺寸
         
@@ -235,6 +341,7 @@ class VideoUtils:
             width: 目标宽度
             height: 目标高度
             maintain_aspect: 是否保持宽高比
+            progress_callback: 进度回调函数
             
         Returns:
             bool: 是否调整成功
@@ -257,7 +364,7 @@ class VideoUtils:
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            self.runner.run(cmd, duration=self.get_video_duration(input_path), progress_callback=progress_callback)
             return True
         except subprocess.CalledProcessError as e:
             print(f"视频尺寸调整失败: {e}")
@@ -293,7 +400,7 @@ class VideoUtils:
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            self.runner.run(cmd)
             return True
         except subprocess.CalledProcessError as e:
             print(f"音频提取失败: {e}")
@@ -331,12 +438,126 @@ class VideoUtils:
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            self.runner.run(cmd)
             return True
         except subprocess.CalledProcessError as e:
             print(f"缩略图创建失败: {e}")
             return False
     
+    def _fields_from_info(self, info: Dict) -> Dict:
+        """从完整信息字典中提取 ProbeFields 字段"""
+        video_info = info.get('video') or {}
+        return {
+            'duration': float(info.get('duration', 0.0) or 0.0),
+            'width': int(video_info.get('width', 0) or 0),
+            'height': int(video_info.get('height', 0) or 0),
+            'fps': float(video_info.get('fps', 0.0) or 0.0),
+            'codec': video_info.get('codec', '') or '',
+        }
+    
+    def _probe_fields_ffprobe(self, video_path: str, fields: Tuple[str, ...]) -> Optional[Dict]:
+        """使用 ffprobe -show_entries 仅查询指定字段"""
+        sections: Dict[str, List[str]] = {}
+        for field in fields:
+            section, entry = ProbeFields.FIELD_ENTRIES[field]
+            sections.setdefault(section, []).append(entry)
+        
+        cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json']
+        if 'stream' in sections:
+            cmd.extend(['-select_streams', 'v:0'])
+        cmd.extend([
+            '-show_entries', ':'.join(f"{s}={','.join(e)}" for s, e in sections.items()),
+            video_path
+        ])
+        
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            data = json.loads(result.stdout)
+        except (subprocess.CalledProcessError, json.JSONDecodeError, OSError) as e:
+            print(f"按需探测失败 (ffprobe): {e}")
+            return None
+        
+        fmt = data.get('format', {}) or {}
+        streams = data.get('streams') or [{}]
+        stream = streams[0]
+        values = {}
+        for field in fields:
+            if field == 'duration':
+                values['duration'] = float(fmt.get('duration', 0) or 0)
+            elif field == 'width':
+                values['width'] = int(stream.get('width', 0) or 0)
+            elif field == 'height':
+                values['height'] = int(stream.get('height', 0) or 0)
+            elif field == 'fps':
+                values['fps'] = self._parse_fps(stream.get('r_frame_rate', '0/1'))
+            elif field == 'codec':
+                values['codec'] = stream.get('codec_name', '') or ''
+        return values
+    
+    def probe_fields(self, video_path: str, fields: Tuple[str, ...] = ('duration',)) -> Optional[ProbeFields]:
+        """
+        按需探测指定字段（轻量接口）
+        
+        查找顺序：短时合并缓存 -> 持久化探测缓存 -> MP4/MOV 进程内解析 -> ffprobe -show_entries。
+        同一文件在 Settings.PROBE_COALESCE_WINDOW 秒内的多次调用共享结果，只补查缺失字段。
+        
+        Args:
+            video_path: 视频文件路径
+            fields: 需要的字段，可选 'duration', 'width', 'height', 'fps', 'codec'
+            
+        Returns:
+            Optional[ProbeFields]: 探测结果，文件不存在或探测失败时返回 None
+        """
+        for field in fields:
+            if field not in ProbeFields.FIELD_ENTRIES:
+                raise ValueError(f"不支持的探测字段: {field}")
+        
+        ident = ProbeCache.file_identity(video_path)
+        if ident is None:
+            return None
+        
+        now = time.monotonic()
+        window = self.settings.PROBE_COALESCE_WINDOW
+        values: Dict = {}
+        with _field_memo_lock:
+            memo = _field_memo.get(ident)
+            if memo is not None and now - memo[0] <= window:
+                values.update(memo[1])
+        
+        missing = [f for f in fields if f not in values]
+        if missing and self.probe_cache is not None:
+            full = self.probe_cache.get(video_path, 'ffprobe') or self.probe_cache.get(video_path, 'native')
+            if full is not None:
+                values.update(self._fields_from_info(full))
+            else:
+                values.update(self.probe_cache.get(video_path, 'fields') or {})
+            missing = [f for f in fields if f not in values]
+        
+        if missing:
+            native = None
+            if os.path.splitext(video_path)[1].lower() in self.settings.NATIVE_PROBE_FORMATS:
+                native = probe_mp4(video_path)
+            if native is not None:
+                values.update(self._fields_from_info(native))
+                if self.probe_cache is not None:
+                    self.probe_cache.put(video_path, native, 'native')
+            else:
+                probed = self._probe_fields_ffprobe(video_path, tuple(missing))
+                if probed is None:
+                    return None
+                values.update(probed)
+                if self.probe_cache is not None:
+                    self.probe_cache.put(video_path, values, 'fields')
+        
+        with _field_memo_lock:
+            # 顺带清理过期条目，避免长时间运行时无限增长
+            if len(_field_memo) > 4096:
+                for key in [k for k, (t, _) in _field_memo.items() if now - t > window]:
+                    del _field_memo[key]
+            _field_memo[ident] = (now, dict(values))
+        
+        return ProbeFields(video_path, **{k: v for k, v in values.items() if k in ProbeFields.FIELD_ENTRIES})
+    
     def get_video_duration(self, video_path: str) -> float:
         """
         获取视频时长
@@ -347,10 +568,8 @@ class VideoUtils:
         Returns:
             float: 视频时长（秒）
         """
-        info = self.get_video_info(video_path)
-        if info:
-            return info.get('duration', 0.0)
-        return 0.0
+        record = self.probe_fields(video_path, ('duration',))
+        return record.duration if record else 0.0
     
     def get_video_resolution(self, video_path: str) -> Tuple[int, int]:
         """
@@ -362,10 +581,9 @@ class VideoUtils:
         Returns:
             Tuple[int, int]: (宽度, 高度)
         """
-        info = self.get_video_info(video_path)
-        if info and 'video' in info:
-            video_info = info['video']
-            return (video_info.get('width', 0), video_info.get('height', 0))
+        record = self.probe_fields(video_path, ('width', 'height'))
+        if record:
+            return (record.width, record.height)
         return (0, 0)
     
     def is_video_valid(self, video_path: str) -> bool:
@@ -381,12 +599,109 @@ class VideoUtils:
         info = self.get_video_info(video_path)
         return info is not None and info.get('duration', 0) > 0
     
-    def batch_analyze_videos(self, video_paths: List[str]) -> Dict:
+    def iter_analyze_videos(self,
+                            video_paths: List[str],
+                            max_workers: int = None,
+                            progress_callback: Optional[Callable] = None) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        并发探测视频信息，按完成顺序逐个产出结果
+        
+        Args:
+            video_paths: 视频文件路径列表
+            max_workers: 最大并发数，默认 Settings.PROBE_MAX_WORKERS；为 1 时顺序执行
+            progress_callback: 进度回调函数 (percent, message)
+            
+        Yields:
+            Tuple[str, Optional[Dict]]: (视频路径, 视频信息字典或 None)
+        """
+        total = len(video_paths)
+        if total == 0:
+            return
+        if max_workers is None:
+            max_workers = self.settings.PROBE_MAX_WORKERS
+        max_workers = max(1, min(int(max_workers), total))
+        
+        def report(done: int, path: str):
+            if progress_callback:
+                progress_callback(done / total * 100, f"已分析 {done}/{total}: {os.path.basename(path)}")
+        
+        if max_workers == 1:
+            for i, path in enumerate(video_paths):
+                info = self.get_video_info(path)
+                report(i + 1, path)
+                yield path, info
+            return
+        
+        # 有界提交：同时在途的任务不超过 2 倍并发数，避免一次性为上万文件创建 Future
+        paths_iter = iter(video_paths)
+        done_count = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            for path in itertools.islice(paths_iter, max_workers * 2):
+                pending[executor.submit(self.get_video_info, path)] = path
+            
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    path = pending.pop(future)
+                    try:
+                        info = future.result()
+                    except Exception as e:
+                        print(f"分析视频失败 {path}: {e}")
+                        info = None
+                    done_count += 1
+                    report(done_count, path)
+                    yield path, info
+                
+                for path in itertools.islice(paths_iter, len(finished)):
+                    pending[executor.submit(self.get_video_info, path)] = path
+    
+    def _merge_video_stats(self, results: Dict, info: Optional[Dict]) -> None:
+        """将单个视频信息累加到统计结果中"""
+        if info is None:
+            results['invalid'] += 1
+            return
+        
+        results['valid'] += 1
+        
+        # 统计时长
+        duration = info.get('duration', 0)
+        if duration > 0:
+            results['total_duration'] += duration
+            results['_duration_count'] += 1
+            results['min_duration'] = duration if results['min_duration'] is None else min(results['min_duration'], duration)
+            results['max_duration'] = max(results['max_duration'], duration)
+        
+        # 统计文件大小
+        results['total_size'] += info.get('filesize', 0)
+        
+        # 统计分辨率
+        video_info = info.get('video')
+        if video_info:
+            width = video_info.get('width', 0)
+            height = video_info.get('height', 0)
+            resolution = f"{width}x{height}"
+            results['resolutions'][resolution] = results['resolutions'].get(resolution, 0) + 1
+            
+            # 统计编码器
+            codec = video_info.get('codec', 'unknown')
+            results['codecs'][codec] = results['codecs'].get(codec, 0) + 1
+        
+        # 统计格式
+        format_name = info.get('format_name', 'unknown')
+        results['formats'][format_name] = results['formats'].get(format_name, 0) + 1
+    
+    def batch_analyze_videos(self,
+                             video_paths: List[str],
+                             max_workers: int = 1,
+                             progress_callback: Optional[Callable] = None) -> Dict:
         """
         批量分析视频文件
         
         Args:
             video_paths: 视频文件路径列表
+            max_workers: 最大并发探测数（1 为顺序执行，None 使用 Settings.PROBE_MAX_WORKERS）
+            progress_callback: 进度回调函数
             
         Returns:
             Dict: 分析结果统计
@@ -399,50 +714,19 @@ class VideoUtils:
             'total_size': 0,
             'resolutions': {},
             'formats': {},
-            'codecs': {}
+            'codecs': {},
+            'min_duration': None,
+            'max_duration': 0,
+            '_duration_count': 0
         }
         
-        valid_durations = []
-        
-        for video_path in video_paths:
-            info = self.get_video_info(video_path)
-            
-            if info is None:
-                results['invalid'] += 1
-                continue
-            
-            results['valid'] += 1
-            
-            # 统计时长
-            duration = info.get('duration', 0)
-            if duration > 0:
-                results['total_duration'] += duration
-                valid_durations.append(duration)
-            
-            # 统计文件大小
-            results['total_size'] += info.get('filesize', 0)
-            
-            # 统计分辨率
-            if 'video' in info:
-                video_info = info['video']
-                width = video_info.get('width', 0)
-                height = video_info.get('height', 0)
-                resolution = f"{width}x{height}"
-                results['resolutions'][resolution] = results['resolutions'].get(resolution, 0) + 1
-                
-                # 统计编码器
-                codec = video_info.get('codec', 'unknown')
-                results['codecs'][codec] = results['codecs'].get(codec, 0) + 1
-            
-            # 统计格式
-            format_name = info.get('format_name', 'unknown')
-            results['formats'][format_name] = results['formats'].get(format_name, 0) + 1
+        for _, info in self.iter_analyze_videos(video_paths, max_workers, progress_callback):
+            self._merge_video_stats(results, info)
         
         # 计算平均值
-        if valid_durations:
-            results['avg_duration'] = sum(valid_durations) / len(valid_durations)
-            results['min_duration'] = min(valid_durations)
-            results['max_duration'] = max(valid_durations)
+        count = results.pop('_duration_count')
+        if count:
+            results['avg_duration'] = results['total_duration'] / count
         else:
             results['avg_duration'] = 0
             results['min_duration'] = 0